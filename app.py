@@ -1,20 +1,43 @@
-from flask import Flask, render_template, request, jsonify, session
+from flask import Flask, Response, g, render_template, request, jsonify, session, url_for
 from database.models import initialize_database, add_job_application, add_resume, get_job_application_by_id, get_resume
 from services.resume_matching import ResumeMatchingService
 from services.feedback import FeedbackGenerator
-from services.nvidia_chat import NvidiaChatService
-from services.nvidia_embeddings import NvidiaEmbeddingService
+from services.nvidia_chat import NvidiaChatService, chat_flights
+from services.nvidia_embeddings import NvidiaEmbeddingService, embedding_flights
+from services.chat_prewarm import OpeningResponseCache
+from services.match_explanation import MatchExplainer
+from services.job_import import JobFeedImporter, ImportJobQueue, feed_format
+from services.scheduler import upstream_scheduler, Priority
+from services.resilience import embedding_resilience, chat_resilience
+from services.health_probe import HealthProber
+from utils.pdf_extraction import pdf_extractor
+from utils.ocr import ocr_pipeline
+from utils.docx_extraction import docx_extractor
+from utils.extraction_cache import extraction_cache, PartialText
+from utils.uploads import StreamingUploadRequest, upload_hash, upload_size
+from utils.server_timing import request_timing, add_server_timing_header
+from utils.utils import FileHandler, DOCX_MIME_TYPE, extraction_seconds
+from utils.metrics import metrics_collector, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from werkzeug.exceptions import RequestEntityTooLarge
 from config import Config
-from docx import Document
-import PyPDF2
 import os
 import logging
 import json
+import tempfile
+import time
+import uuid
 import torch  # Import PyTorch for GPU support
 
 # Initialize the Flask app and logging
 app = Flask(__name__)
 app.secret_key = os.urandom(24)
+app.request_class = StreamingUploadRequest
+app.config['MAX_CONTENT_LENGTH'] = Config.MAX_REQUEST_BYTES
+# Job feeds are bulk exports, far larger than a resume
+StreamingUploadRequest.endpoint_file_limits['import_jobs'] = Config.JOB_FEED_MAX_BYTES
+# Per-stage timings of a request are returned in a Server-Timing header
+app.after_request(add_server_timing_header)
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -22,15 +45,79 @@ logger = logging.getLogger(__name__)
 device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 logger.info(f"Using device: {device}")
 
+# Pool workers started with "spawn" (the NLP, PDF and OCR pools) re-import this module as
+# __mp_main__; only the serving process may initialize the database and start probing
+SERVING_PROCESS = __name__ != "__mp_main__"
+
 # Initialize the database and services
-initialize_database()
+if SERVING_PROCESS:
+    initialize_database()
 resume_matcher = ResumeMatchingService(device=device)
 feedback_generator = FeedbackGenerator()
+match_explainer = MatchExplainer(resume_matcher.embedding_service)
+job_importer = JobFeedImporter(
+    resume_matcher.embedding_service,
+    prepare=resume_matcher.truncate_text,
+    keyword_engine=feedback_generator.keyword_engine
+)
+import_queue = ImportJobQueue(job_importer)
 embedding_service = NvidiaEmbeddingService(api_key=Config.NVIDIA_API_KEY)
 chat_service = NvidiaChatService(api_key=Config.NVIDIA_API_KEY_NEW)
+opening_responses = OpeningResponseCache(
+    chat_service,
+    max_workers=Config.CHAT_PREWARM_WORKERS,
+    wait_timeout=Config.CHAT_PREWARM_TIMEOUT
+)
+health_prober = HealthProber(
+    {
+        "embedding": lambda: embedding_service.check_health(timeout=Config.HEALTH_PROBE_TIMEOUT),
+        "chat": lambda: chat_service.check_health(timeout=Config.HEALTH_PROBE_TIMEOUT)
+    },
+    interval=Config.HEALTH_PROBE_INTERVAL
+)
+if SERVING_PROCESS:
+    health_prober.start()
 
 logger.info("NVIDIA services initialized for resume matching, feedback, and chat.")
 
+# Duration and in-flight count of every request, exposed on /metrics
+http_request_seconds = metrics_collector.histogram(
+    "http_request_duration_seconds", "Request handling time by route, method and status.",
+    ("route", "method", "status")
+)
+http_requests_in_progress = metrics_collector.gauge(
+    "http_requests_in_progress", "Requests being handled, by route.", ("route",)
+)
+
+def _route_label():
+    # The URL rule, not the path, so the label set stays bounded
+    return request.url_rule.rule if request.url_rule else "unmatched"
+
+@app.before_request
+def start_request_metrics():
+    g.request_started = time.perf_counter()
+    g.request_route = _route_label()
+    http_requests_in_progress.inc(route=g.request_route)
+
+@app.after_request
+def record_response_status(response):
+    g.response_status = response.status_code
+    return response
+
+@app.teardown_request
+def finish_request_metrics(error=None):
+    if "request_started" not in g:
+        return
+    http_requests_in_progress.dec(route=g.request_route)
+    http_request_seconds.observe(
+        time.perf_counter() - g.request_started,
+        route=g.request_route, method=request.method, status=g.get("response_status", 500)
+    )
+
+@app.errorhandler(RequestEntityTooLarge)
+def upload_too_large(e):
+    return jsonify({"error": e.description}), 413
+
 @app.route('/')
 def home():
     return render_template('index.html')
@@ -38,21 +125,62 @@ def home():
 # Helper functions to read PDF and DOCX files
 def read_pdf(file):
     try:
-        pdf_reader = PyPDF2.PdfReader(file)
-        text = "".join(page.extract_text() for page in pdf_reader.pages if page.extract_text())
-        return text
+        data = file.read()
+        pages = pdf_extractor.extract_pages(data)["pages"]
+        # Pages without a text layer are likely scanned; OCR those
+        pages, ocr_failed = ocr_pipeline.fill_blank_pages(data, pages)
+        text = "\n".join(text for text in pages if text.strip())
+        return PartialText(text) if ocr_failed else text
     except Exception as e:
         logger.error(f"Failed to read PDF file: {e}")
         raise
 
 def read_docx(file):
     try:
-        doc = Document(file)
-        return "\n".join([paragraph.text for paragraph in doc.paragraphs])
+        return docx_extractor.extract(file.stream)
     except Exception as e:
         logger.error(f"Failed to read DOCX file: {e}")
         raise
 
+def read_txt(file):
+    encoding = FileHandler.detect_stream_encoding(file.stream)
+    return file.read().decode(encoding, errors='replace')
+
+RESUME_READERS = {'.pdf': read_pdf, '.docx': read_docx, '.txt': read_txt}
+MIME_READERS = {'application/pdf': read_pdf, DOCX_MIME_TYPE: read_docx, 'text/plain': read_txt}
+READER_FORMATS = {read_pdf: 'pdf', read_docx: 'docx', read_txt: 'txt'}
+
+def read_resume_file(file):
+    """Extract the text of an uploaded resume, reusing the cached text if the same file was seen before."""
+    # Trust the content over the extension (e.g. a PDF saved as .txt)
+    mime_type = FileHandler.get_stream_mime_type(file.stream)
+    reader = MIME_READERS.get(mime_type) or RESUME_READERS[os.path.splitext(file.filename)[1]]
+
+    def extract():
+        with extraction_seconds.time(format=READER_FORMATS[reader]):
+            return reader(file)
+
+    return extraction_cache.get_or_extract(upload_hash(file), extract, source_size=upload_size(file))
+
+def get_session_id():
+    """Return a stable identifier for the current browser session, used for upstream fairness."""
+    if 'session_id' not in session:
+        session['session_id'] = uuid.uuid4().hex
+    return session['session_id']
+
+def build_chat_context(application_id, resume_id):
+    """Load the stored application and resume and shape them into the chat context."""
+    application_data = get_job_application_by_id(application_id)
+    if not application_data:
+        return {}
+    resume_data = get_resume(resume_id)  # Fetch resume data based on resume ID
+
+    # Convert stored JSON strings back to dictionaries/lists and include resume text
+    application_data['feedback'] = json.loads(application_data['feedback'])
+    application_data['suggestions'] = json.loads(application_data['suggestions'])
+    application_data['resume_text'] = resume_data['resume_text'] if resume_data else "N/A"  # Add resume text to context
+    return application_data
+
 @app.route('/submit_application', methods=['POST'])
 def submit_application():
     try:
@@ -69,49 +197,62 @@ def submit_application():
         if not company_name or not job_title:
             return jsonify({"error": "Company name and job title are required."}), 400
 
+        timing = request_timing()
+
         # Read job and resume file if provided
-        if job_file and not job_description:
-            job_description = job_file.read().decode('utf-8', errors='replace')
-        if resume_file:
-            if resume_file.filename.endswith('.pdf'):
-                resume_text = read_pdf(resume_file)
-            elif resume_file.filename.endswith('.docx'):
-                resume_text = read_docx(resume_file)
-            elif resume_file.filename.endswith('.txt'):
-                resume_text = resume_file.read().decode('utf-8', errors='replace')
+        with timing.stage("extract"):
+            if job_file and not job_description:
+                job_description = read_txt(job_file)
+            if resume_file and os.path.splitext(resume_file.filename)[1] in RESUME_READERS:
+                resume_text = read_resume_file(resume_file)
 
         # Ensure job description or resume text is provided
         if not job_description and not resume_text:
             return jsonify({"error": "Job description or resume text must be provided."}), 400
 
         # Calculate match score and generate feedback
-        match_score = resume_matcher.calculate_match_score(job_description, resume_text)
-        feedback = feedback_generator.generate_feedback(job_description, resume_text, match_score)
+        # Embeddings, cleaned text and tokens are computed once and shared for this submission
+        analysis = resume_matcher.new_analysis()
+        with upstream_scheduler.context(Priority.SUBMIT, get_session_id()):
+            with timing.stage("score"):
+                scores = resume_matcher.calculate_section_scores(job_description, resume_text, analysis=analysis)
+            match_score = scores['match_score']
+            with timing.stage("feedback"):
+                feedback = feedback_generator.generate_feedback(job_description, resume_text, match_score, analysis=analysis)
         suggestions = feedback_generator.get_improvement_suggestions(feedback)
 
         # Save job application and resume to database
-        application_id = add_job_application(
-            company_name, job_title, job_description, application_status="Pending", 
-            match_score=match_score, feedback=json.dumps(feedback), suggestions=json.dumps(suggestions)
-        )
-        resume_id = add_resume("User", resume_text)  # Replace "User" with actual user identifier if available
+        with timing.stage("store"):
+            application_id = add_job_application(
+                company_name, job_title, job_description, application_status="Pending", 
+                match_score=match_score, feedback=json.dumps(feedback), suggestions=json.dumps(suggestions)
+            )
+            resume_id = add_resume("User", resume_text)  # Replace "User" with actual user identifier if available
+            feedback_generator.keyword_engine.observe(job_description)  # Update IDF statistics with the stored JD
 
         # Store application and resume IDs in the session
         session['application_id'] = application_id
         session['resume_id'] = resume_id  # Store resume ID as well for future use
         chat_service.clear_memory()  # Clear any previous chat memory
+
+        # Generate the opening chat reply in the background so the auto-initiated chat is instant
+        with upstream_scheduler.context(Priority.INTERACTIVE, get_session_id()), timing.stage("prewarm"):
+            opening_responses.schedule(application_id, build_chat_context(application_id, resume_id))
         logger.info("Application submitted with ID: %s and Resume ID: %s", application_id, resume_id)
 
         # Return response to frontend
         response = {
             'application_id': application_id,
             'match_score': match_score,
+            'section_scores': scores['section_scores'],
             'feedback': feedback,
             'suggestions': suggestions
         }
 
         return jsonify(response)
 
+    except RequestEntityTooLarge:
+        raise
     except Exception as e:
         logger.error(f"Error in /submit_application: {str(e)}", exc_info=True)
         return jsonify({"error": "An unexpected error occurred. Please check the server logs for more details."}), 500
@@ -121,6 +262,9 @@ def clear_all_data():
     """
     Clears the session and resets the chat memory to handle new user submissions.
     """
+    application_id = session.get('application_id')
+    if application_id:
+        opening_responses.discard(application_id)
     session.clear()  # Clear all session data
     chat_service.clear_memory()  # Clear chat memory to reset context
     logger.info("Session and chat memory cleared.")
@@ -137,25 +281,30 @@ def chat():
         # Retrieve application and resume data using session IDs
         application_id = session.get('application_id')
         resume_id = session.get('resume_id')
-        if application_id and resume_id:
-            application_data = get_job_application_by_id(application_id)
-            resume_data = get_resume(resume_id)  # Fetch resume data based on resume ID
 
-            # Convert stored JSON strings back to dictionaries/lists and include resume text
-            application_data['feedback'] = json.loads(application_data['feedback'])
-            application_data['suggestions'] = json.loads(application_data['suggestions'])
-            application_data['resume_text'] = resume_data['resume_text'] if resume_data else "N/A"  # Add resume text to context
+        timing = request_timing()
+
+        # Serve the opening reply pre-generated at submission time, if there is one
+        if request.json.get("auto_initiated") and application_id:
+            with timing.stage("prewarmed"):
+                prepared = opening_responses.pop(application_id, user_query)
+            if prepared is not None:
+                logger.info("Serving pre-generated opening response for application %s", application_id)
+                return jsonify({"response": chat_service.record_exchange(user_query, prepared)})
 
-            context = application_data
-        else:
-            context = {}
+        with timing.stage("context"):
+            if application_id and resume_id:
+                context = build_chat_context(application_id, resume_id)
+            else:
+                context = {}
 
         # Log the user query and context data for debugging
         logger.info("User query: %s", user_query)
         logger.info("Context data for chat: %s", context)
 
         # Pass context to chat service for response generation
-        response = chat_service.get_chat_response(user_query, context=context)
+        with upstream_scheduler.context(Priority.INTERACTIVE, get_session_id()), timing.stage("reply"):
+            response = chat_service.get_chat_response(user_query, context=context)
 
         return jsonify({"response": response})
 
@@ -163,5 +312,109 @@ def chat():
         logger.error(f"Error in /chat: {str(e)}", exc_info=True)
         return jsonify({"error": "An unexpected error occurred. Please check the server logs for more details."}), 500
 
+@app.route('/explain_match', methods=['POST'])
+def explain_match():
+    """
+    Explain the match score requirement by requirement.
+
+    Uses the job description and resume of the current application unless
+    `job_description` / `resume_text` are posted to re-score an edited version.
+    """
+    try:
+        payload = request.get_json(silent=True) or {}
+        job_description = payload.get("job_description")
+        resume_text = payload.get("resume_text")
+
+        application_id = session.get('application_id')
+        resume_id = session.get('resume_id')
+        if not job_description and application_id:
+            application_data = get_job_application_by_id(application_id)
+            job_description = application_data['job_description'] if application_data else None
+        if not resume_text and resume_id:
+            resume_data = get_resume(resume_id)
+            resume_text = resume_data['resume_text'] if resume_data else None
+
+        if not job_description or not resume_text:
+            return jsonify({"error": "A job description and resume are required. Submit an application first."}), 400
+
+        with upstream_scheduler.context(Priority.INTERACTIVE, get_session_id()):
+            explanation = match_explainer.explain(job_description, resume_text)
+        return jsonify(explanation)
+
+    except Exception as e:
+        logger.error(f"Error in /explain_match: {str(e)}", exc_info=True)
+        return jsonify({"error": "An unexpected error occurred. Please check the server logs for more details."}), 500
+
+@app.route('/import_jobs', methods=['POST'])
+def import_jobs():
+    """
+    Queue the import of a CSV or JSONL feed of job postings uploaded as `jobs_file`.
+
+    Returns 202 at once; poll the returned `status_url` for the results.
+    """
+    try:
+        jobs_file = request.files.get('jobs_file')
+        if not jobs_file:
+            return jsonify({"error": "A jobs_file upload is required."}), 400
+        fmt = request.form.get('format') or feed_format(jobs_file.filename)
+        if fmt not in ("csv", "jsonl"):
+            return jsonify({"error": "Feeds must be CSV or JSONL."}), 400
+
+        # The upload buffer is closed with the request, so the import reads its own copy
+        fd, path = tempfile.mkstemp(prefix="job-feed-", suffix=f".{fmt}")
+        os.close(fd)
+        jobs_file.save(path)
+        job = import_queue.submit(path, fmt, source=jobs_file.filename)
+        job['status_url'] = url_for('import_job_status', job_id=job['job_id'])
+        return jsonify(job), 202
+
+    except RequestEntityTooLarge:
+        raise
+    except Exception as e:
+        logger.error(f"Error in /import_jobs: {str(e)}", exc_info=True)
+        return jsonify({"error": "An unexpected error occurred. Please check the server logs for more details."}), 500
+
+@app.route('/import_jobs/<job_id>', methods=['GET'])
+def import_job_status(job_id):
+    """Report the status of a queued feed import and, once done, its results."""
+    job = import_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown import job."}), 404
+    return jsonify(job)
+
+@app.route('/check_embedding_api_status', methods=['GET'])
+def check_embedding_api_status():
+    """Report the embedding API status from the latest background probe."""
+    return jsonify(health_prober.get_status("embedding"))
+
+@app.route('/check_chat_api_status', methods=['GET'])
+def check_chat_api_status():
+    """Report the chat API status from the latest background probe."""
+    return jsonify(health_prober.get_status("chat"))
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Expose request, upstream, extraction, database and cache metrics in the Prometheus text format."""
+    return Response(metrics_collector.render(), content_type=METRICS_CONTENT_TYPE)
+
+@app.route('/stats', methods=['GET'])
+def stats():
+    """Report upstream scheduling and cache statistics."""
+    return jsonify({
+        "scheduler": upstream_scheduler.get_stats(),
+        "embedding_batches": resume_matcher.embedding_service.batcher.get_stats(),
+        "resilience": {
+            "embeddings": embedding_resilience.get_stats(),
+            "chat": chat_resilience.get_stats()
+        },
+        "single_flight": {
+            "embeddings": embedding_flights.get_stats(),
+            "chat": chat_flights.get_stats()
+        },
+        "opening_responses": opening_responses.get_stats(),
+        "match_explanation": match_explainer.get_stats(),
+        "extraction_cache": extraction_cache.get_stats()
+    })
+
 if __name__ == '__main__':
     app.run(debug=True)
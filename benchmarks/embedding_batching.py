@@ -0,0 +1,87 @@
+# benchmarks/embedding_batching.py
+"""
+Throughput of per-call embedding requests versus the cross-request micro-batcher.
+
+Runs offline against a simulated upstream whose latency is a fixed round trip
+plus a small per-input cost, which is how the embeddings endpoint behaves.
+
+    python -m benchmarks.embedding_batching --clients 32 --requests 20
+"""
+import argparse
+import json
+import threading
+import time
+
+from services.embedding_batcher import EmbeddingBatcher
+from services.scheduler import UpstreamScheduler
+
+class SimulatedUpstream:
+    """Fake embeddings endpoint with a fixed round trip and per-input cost."""
+
+    def __init__(self, round_trip_ms: float, per_input_ms: float, scheduler: UpstreamScheduler, dim: int = 1024):
+        self.round_trip = round_trip_ms / 1000.0
+        self.per_input = per_input_ms / 1000.0
+        self.scheduler = scheduler
+        self.dim = dim
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def embed_batch(self, texts):
+        def call():
+            time.sleep(self.round_trip + self.per_input * len(texts))
+            return [[float(len(text))] * self.dim for text in texts]
+
+        with self._lock:
+            self.calls += 1
+        return self.scheduler.run(call)
+
+def _drive(clients: int, requests: int, embed_one) -> float:
+    def client(client_id):
+        for i in range(requests):
+            embed_one(f"client {client_id} request {i}")
+
+    threads = [threading.Thread(target=client, args=(c,)) for c in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+def run(clients: int, requests: int, round_trip_ms: float, per_input_ms: float,
+        concurrency: int, window_ms: float, max_batch_size: int) -> dict:
+    total = clients * requests
+    results = {}
+
+    unbatched = SimulatedUpstream(round_trip_ms, per_input_ms, UpstreamScheduler(max_concurrency=concurrency))
+    elapsed = _drive(clients, requests, lambda text: unbatched.embed_batch([text]))
+    results["unbatched"] = {"seconds": round(elapsed, 3), "texts_per_second": round(total / elapsed, 1),
+                            "upstream_calls": unbatched.calls}
+
+    batched = SimulatedUpstream(round_trip_ms, per_input_ms, UpstreamScheduler(max_concurrency=concurrency))
+    batcher = EmbeddingBatcher(batched.embed_batch, window_ms=window_ms, max_batch_size=max_batch_size,
+                               max_inflight_batches=concurrency)
+    elapsed = _drive(clients, requests, batcher.embed)
+    results["batched"] = {"seconds": round(elapsed, 3), "texts_per_second": round(total / elapsed, 1),
+                          "upstream_calls": batched.calls, **batcher.get_stats()}
+
+    results["speedup"] = round(results["batched"]["texts_per_second"] / results["unbatched"]["texts_per_second"], 2)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=32, help="Concurrent callers")
+    parser.add_argument("--requests", type=int, default=20, help="Embeddings per caller")
+    parser.add_argument("--round-trip-ms", type=float, default=40.0)
+    parser.add_argument("--per-input-ms", type=float, default=0.5)
+    parser.add_argument("--concurrency", type=int, default=8, help="Upstream concurrency cap")
+    parser.add_argument("--window-ms", type=float, default=5.0)
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    results = run(args.clients, args.requests, args.round_trip_ms, args.per_input_ms,
+                  args.concurrency, args.window_ms, args.max_batch_size)
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
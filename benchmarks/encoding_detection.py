@@ -0,0 +1,69 @@
+# benchmarks/encoding_detection.py
+"""
+Encoding detection on large text uploads: whole-file chardet versus
+FileHandler.detect_stream_encoding (strict UTF-8 fast path, sampled chardet fallback).
+
+Each document is generated in memory at the requested size. The legacy
+column runs chardet over the entire buffer, which is what detect_encoding
+used to do, so keep sizes modest or pass --skip-legacy.
+
+    python -m benchmarks.encoding_detection --sizes 1 4 --repeat 3
+"""
+import argparse
+import io
+import json
+import time
+
+import chardet
+
+from utils.utils import FileHandler
+
+RESUME_LINE = "Senior software engineer, built data pipelines in Python and SQL for analytics teams.\n"
+ACCENTED_LINE = "Réalisé la migration des données, coordonné l'équipe à Zürich et à São Paulo.\n"
+
+def documents(size_bytes: int) -> dict:
+    """Text documents of about `size_bytes`, in the encodings uploads typically arrive in."""
+    ascii_body = RESUME_LINE * (size_bytes // len(RESUME_LINE))
+    mixed = ascii_body[:len(ascii_body) // 2] + ACCENTED_LINE * 50 + ascii_body[len(ascii_body) // 2:]
+    return {
+        "ascii": ascii_body.encode("ascii"),
+        "utf-8": mixed.encode("utf-8"),
+        "utf-8-bom": b"\xef\xbb\xbf" + mixed.encode("utf-8"),
+        # Non-ASCII only in the middle of the file, the worst case for a head-only sample
+        "cp1252": mixed.encode("cp1252"),
+    }
+
+def _time(func, repeat: int):
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def run(sizes_mb, repeat: int, skip_legacy: bool) -> dict:
+    results = {}
+    for size_mb in sizes_mb:
+        for name, data in documents(int(size_mb * 1024 * 1024)).items():
+            row = {"bytes": len(data)}
+            seconds, encoding = _time(lambda: FileHandler.detect_stream_encoding(io.BytesIO(data)), repeat)
+            row["buffered"] = {"seconds": round(seconds, 6), "encoding": encoding}
+            if not skip_legacy:
+                seconds, encoding = _time(lambda: chardet.detect(data)["encoding"], 1)
+                row["legacy"] = {"seconds": round(seconds, 6), "encoding": encoding}
+                row["speedup"] = round(row["legacy"]["seconds"] / max(row["buffered"]["seconds"], 1e-6), 1)
+            results[f"{name} {size_mb}MB"] = row
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1.0, 4.0], help="Document sizes in MB")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs of the buffered detector; best time is reported")
+    parser.add_argument("--skip-legacy", action="store_true", help="Do not run whole-file chardet")
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.sizes, args.repeat, args.skip_legacy), indent=2))
+
+if __name__ == "__main__":
+    main()
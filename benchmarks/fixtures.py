@@ -0,0 +1,134 @@
+# benchmarks/fixtures.py
+"""
+Deterministic resume and job-description fixtures for the benchmark suite.
+
+Documents are generated from a fixed seed, so every run (and every machine)
+measures the same input. Resumes are written as TXT, DOCX (python-docx) and
+text-layer PDF at several sizes; the PDF writer emits a minimal single-font
+document, which is all PyPDF2 needs and keeps the fixtures free of extra
+dependencies.
+"""
+import io
+import os
+import random
+
+import docx
+
+LINES_PER_PAGE = 48
+
+# Resume size -> number of roles; each role is about a third of a page
+SIZES = {"small": 3, "medium": 12, "large": 48}
+
+SKILLS = [
+    "Python", "SQL", "Kubernetes", "Docker", "AWS", "Terraform", "React", "TypeScript", "Java", "Go",
+    "Spark", "Airflow", "PostgreSQL", "Redis", "Kafka", "GraphQL", "CI/CD", "Linux", "pandas", "PyTorch",
+    "machine learning", "data pipelines", "REST APIs", "microservices", "observability", "Agile",
+]
+VERBS = ["Built", "Designed", "Led", "Migrated", "Automated", "Scaled", "Optimized", "Delivered", "Owned", "Shipped"]
+OBJECTS = [
+    "a billing service", "the analytics platform", "an ETL pipeline", "the search backend", "a recommendation engine",
+    "the deployment tooling", "an internal developer portal", "the customer dashboard", "a fraud detection model",
+]
+OUTCOMES = [
+    "cutting latency by {n}%", "saving ${n}k per year", "serving {n}M requests a day", "reducing incidents by {n}%",
+    "onboarding {n} teams", "improving conversion by {n}%",
+]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella", "Stark Industries", "Wayne Enterprises", "Hooli"]
+TITLES = ["Software Engineer", "Senior Software Engineer", "Data Engineer", "Platform Engineer", "Tech Lead"]
+
+def _bullet(rng: random.Random) -> str:
+    skills = ", ".join(rng.sample(SKILLS, 2))
+    outcome = rng.choice(OUTCOMES).format(n=rng.randint(5, 90))
+    return f"{rng.choice(VERBS)} {rng.choice(OBJECTS)} with {skills}, {outcome}."
+
+def resume_sections(roles: int, seed: int = 7) -> list:
+    """[(heading, [lines])] of a generated resume with `roles` positions."""
+    rng = random.Random(seed)
+    sections = [
+        ("Jordan Example", ["Senior engineer, jordan@example.com, +1 555 0100"]),
+        ("Summary", [f"Engineer with {roles} roles of experience across {', '.join(rng.sample(SKILLS, 5))}."]),
+    ]
+    for role in range(roles):
+        heading = f"{rng.choice(TITLES)}, {rng.choice(COMPANIES)} ({2024 - role})"
+        sections.append((heading, [_bullet(rng) for _ in range(rng.randint(4, 7))]))
+    sections.append(("Skills", [", ".join(rng.sample(SKILLS, 12))]))
+    sections.append(("Education", ["BSc Computer Science, Example University"]))
+    return sections
+
+def resume_text(roles: int, seed: int = 7) -> str:
+    return "\n".join(line for heading, lines in resume_sections(roles, seed) for line in [heading, *lines])
+
+def job_description(seed: int = 11) -> str:
+    rng = random.Random(seed)
+    required = rng.sample(SKILLS, 8)
+    lines = [
+        f"{rng.choice(TITLES)} at {rng.choice(COMPANIES)}",
+        "We are looking for an engineer to own services end to end.",
+        "Requirements:",
+        *[f"- {rng.randint(2, 6)}+ years of experience with {skill}." for skill in required],
+        "Responsibilities:",
+        *[f"- {_bullet(rng)}" for _ in range(6)],
+        "Nice to have: " + ", ".join(rng.sample(SKILLS, 4)) + ".",
+    ]
+    return "\n".join(lines)
+
+def _pdf_string(text: str) -> str:
+    text = text.encode("latin-1", errors="replace").decode("latin-1")
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+def build_pdf(lines: list) -> bytes:
+    """Minimal PDF with one Helvetica text page per LINES_PER_PAGE lines."""
+    pages = [lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)] or [[]]
+    kids = " ".join(f"{4 + 2 * i} 0 R" for i in range(len(pages)))
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for index, page in enumerate(pages):
+        content = "BT /F1 10 Tf 50 760 Td 14 TL " + " ".join(f"({_pdf_string(line)}) '" for line in page) + " ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * index} 0 R >>".encode()
+        )
+        objects.append(f"<< /Length {len(content)} >>\nstream\n{content}\nendstream".encode("latin-1"))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+def build_docx(sections: list) -> bytes:
+    document = docx.Document()
+    for heading, lines in sections:
+        document.add_heading(heading, level=2)
+        for line in lines:
+            document.add_paragraph(line, style="List Bullet")
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+def write_resume_fixtures(directory: str, sizes: dict = None) -> dict:
+    """Write resume_<size>.{txt,docx,pdf} into `directory`; returns {(format, size): path}."""
+    paths = {}
+    for size, roles in (sizes or SIZES).items():
+        sections = resume_sections(roles)
+        lines = [line for heading, body in sections for line in [heading, *body]]
+        contents = {
+            "txt": "\n".join(lines).encode("utf-8"),
+            "docx": build_docx(sections),
+            "pdf": build_pdf(lines),
+        }
+        for fmt, data in contents.items():
+            path = os.path.join(directory, f"resume_{size}.{fmt}")
+            with open(path, "wb") as f:
+                f.write(data)
+            paths[(fmt, size)] = path
+    return paths
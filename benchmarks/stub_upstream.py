@@ -0,0 +1,93 @@
+# benchmarks/stub_upstream.py
+"""
+Deterministic in-process stand-in for the OpenAI client used by the NVIDIA services.
+
+Embeddings are unit vectors seeded from the SHA-256 of each input, so the same
+text always gets the same vector and similar runs give identical scores; chat
+replies are short markdown built from the last user message. Attach it to the
+services with `install` and nothing leaves the process.
+"""
+import hashlib
+import threading
+import time
+import types
+
+import numpy as np
+
+EMBEDDING_DIM = 1024
+
+def deterministic_embedding(text: str, dim: int = EMBEDDING_DIM) -> list:
+    """Unit vector seeded from the text, identical across runs and machines."""
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8", errors="replace")).digest()[:8], "little")
+    vector = np.random.default_rng(seed).standard_normal(dim)
+    return (vector / np.linalg.norm(vector)).tolist()
+
+def deterministic_reply(messages: list) -> str:
+    """Markdown reply to the last user message, exercising format_response's bold/italic/newline rules."""
+    question = next((m["content"] for m in reversed(messages) if m.get("role") == "user"), "")
+    return (
+        f"**Summary**: here is guidance on *{question[:80]}*.\n"
+        "1. **Tailor** the resume to the *job description*.\n"
+        "2. Quantify results with **metrics**.\n"
+        "3. Mirror the *required skills* where they are true."
+    )
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+class _Embeddings:
+    def __init__(self, owner):
+        self.owner = owner
+
+    def create(self, input, model, **kwargs):
+        self.owner._record("embeddings", len(input))
+        data = [types.SimpleNamespace(embedding=deterministic_embedding(text, self.owner.dim), index=i)
+                for i, text in enumerate(input)]
+        tokens = sum(_tokens(text) for text in input)
+        return types.SimpleNamespace(data=data, model=model,
+                                     usage=types.SimpleNamespace(prompt_tokens=tokens, total_tokens=tokens))
+
+class _Completions:
+    def __init__(self, owner):
+        self.owner = owner
+
+    def create(self, model, messages, **kwargs):
+        self.owner._record("chat", 1)
+        content = deterministic_reply(messages)
+        prompt_tokens = sum(_tokens(m["content"]) for m in messages)
+        return types.SimpleNamespace(
+            model=model,
+            choices=[types.SimpleNamespace(index=0, finish_reason="stop",
+                                           message=types.SimpleNamespace(role="assistant", content=content))],
+            usage=types.SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=_tokens(content),
+                                        total_tokens=prompt_tokens + _tokens(content))
+        )
+
+class StubOpenAI:
+    """Drop-in for `openai.OpenAI` as the services use it, with an optional fixed latency per call."""
+
+    def __init__(self, dim: int = EMBEDDING_DIM, latency_ms: float = 0.0):
+        self.dim = dim
+        self.latency = latency_ms / 1000.0
+        self.calls = {"embeddings": 0, "chat": 0}
+        self.inputs = {"embeddings": 0, "chat": 0}
+        self._lock = threading.Lock()
+        self.embeddings = _Embeddings(self)
+        self.chat = types.SimpleNamespace(completions=_Completions(self))
+
+    def _record(self, kind: str, inputs: int):
+        with self._lock:
+            self.calls[kind] += 1
+            self.inputs[kind] += inputs
+        if self.latency:
+            time.sleep(self.latency)
+
+    def with_options(self, **kwargs):
+        return self
+
+def install(*services, client: StubOpenAI = None) -> StubOpenAI:
+    """Point each service's `client` at one shared stub and return it."""
+    client = client or StubOpenAI()
+    for service in services:
+        service.client = client
+    return client
@@ -0,0 +1,217 @@
+# benchmarks/suite.py
+"""
+Offline benchmark suite for the request hot path, with baseline comparison.
+
+Covers match scoring, keyword analysis and feedback generation, text
+extraction of TXT/DOCX/PDF resumes at several sizes, chat response formatting
+and the database CRUD functions. The NVIDIA clients are replaced by the
+deterministic stub in benchmarks.stub_upstream and the database is a fresh
+SQLite file in a temporary directory, so runs need no network or API key and
+are reproducible. The batching, scheduling and resilience layers in front of
+the client are real and included in the timings.
+
+Every run appends a unique reference line to the resume, so caches keyed by
+document (normalizer, keywords, skills) miss as they would for a new upload.
+Logging is raised to WARNING while measuring.
+
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --save-baseline benchmarks/baseline.json
+    python -m benchmarks.suite --baseline benchmarks/baseline.json --threshold 0.2
+
+With --baseline, a case whose median is more than `threshold` slower than the
+baseline (and slower by at least --min-delta-ms) is a regression, and the
+command exits with status 1. Compare only baselines recorded on the same machine.
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from benchmarks import fixtures
+
+SCHEMA_VERSION = 1
+
+class Case:
+    """One benchmark: `func(run)` is timed once per run; `run` makes inputs unique per call."""
+
+    def __init__(self, name: str, func, repeat: int = None):
+        self.name = name
+        self.func = func
+        self.repeat = repeat
+
+def _percentile(samples, fraction: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+def measure(func, repeat: int, warmup: int = 1) -> dict:
+    for run in range(warmup):
+        func(-1 - run)
+    samples = []
+    for run in range(repeat):
+        start = time.perf_counter()
+        func(run)
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return {
+        "runs": repeat,
+        "min_ms": round(min(samples), 4),
+        "median_ms": round(statistics.median(samples), 4),
+        "mean_ms": round(statistics.fmean(samples), 4),
+        "p95_ms": round(_percentile(samples, 0.95), 4),
+    }
+
+def build_cases(workdir: str) -> list:
+    """Import the services against the temporary database and stub upstream, and return the cases."""
+    from database import models
+    from services.feedback import FeedbackGenerator
+    from services.nlp import NlpService
+    from services.nvidia_chat import NvidiaChatService
+    from services.resume_matching import ResumeMatchingService
+    from utils.utils import TextExtractor
+    from benchmarks.stub_upstream import install, deterministic_reply
+
+    models.initialize_database()
+    matcher = ResumeMatchingService()
+    feedback = FeedbackGenerator(nlp_service=NlpService())
+    chat = NvidiaChatService(api_key="offline-benchmark")
+    install(matcher.embedding_service, feedback.embedding_service, chat)
+
+    job_description = fixtures.job_description()
+    resume = fixtures.resume_text(fixtures.SIZES["medium"])
+
+    def unique(run: int, case: str) -> str:
+        # Distinct per case too, or one case would warm the caches for the next
+        return f"{resume}\nReference {case}-{run}"
+
+    cases = [
+        Case("matching.calculate_match_score", lambda run: matcher.calculate_match_score(job_description, unique(run, "match"))),
+        Case("feedback.analyze_keywords", lambda run: feedback.analyze_keywords(job_description, unique(run, "keywords"))),
+        Case("feedback.generate_feedback",
+             lambda run: feedback.generate_feedback(job_description, unique(run, "feedback"), 72.5)),
+    ]
+
+    extractor = TextExtractor()
+    for (fmt, size), path in sorted(fixtures.write_resume_fixtures(workdir).items()):
+        cases.append(Case(f"extract.{fmt}.{size}", lambda run, path=path: extractor.extract_raw_text(path)))
+    cases.append(Case("extract.clean_text", lambda run: extractor.clean_text(unique(run, "clean"))))
+
+    reply = "\n".join(deterministic_reply([{"role": "user", "content": f"question {i}"}]) for i in range(50))
+    cases.append(Case("chat.format_response", lambda run: chat.format_response(reply)))
+
+    # Reads run against a table of realistic size
+    seeded = [models.add_job_application("Acme Corp", "Engineer", job_description, match_score=70.0,
+                                         feedback="{}", suggestions="[]") for _ in range(500)]
+    resume_id = models.add_resume("Jordan Example", resume)
+    cases += [
+        Case("db.get_job_application_by_id",
+             lambda run: models.get_job_application_by_id(seeded[run % len(seeded)])),
+        Case("db.get_job_applications", lambda run: models.get_job_applications()),
+        Case("db.get_resume", lambda run: models.get_resume(resume_id)),
+        Case("db.update_job_application_status",
+             lambda run: models.update_job_application_status(seeded[run % len(seeded)], "Interviewing")),
+        Case("db.add_job_application",
+             lambda run: models.add_job_application("Acme Corp", "Engineer", job_description, match_score=70.0,
+                                                    feedback="{}", suggestions="[]")),
+        Case("db.add_resume", lambda run: models.add_resume("Jordan Example", unique(run, "db"))),
+    ]
+    return cases
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              timeout=5).stdout.strip() or None
+    except Exception:
+        return None
+
+def run(repeat: int, filters=None) -> dict:
+    with tempfile.TemporaryDirectory(prefix="benchmarks-") as workdir:
+        # Config reads the environment at import, so this must precede the service imports
+        os.environ["DB_PATH"] = os.path.join(workdir, "benchmark.db")
+        # The clients are replaced before any call, but constructing them needs a key
+        os.environ.setdefault("NVIDIA_API_KEY", "offline-benchmark")
+        os.environ.setdefault("NVIDIA_API_KEY_NEW", "offline-benchmark")
+        cases = build_cases(workdir)
+        logging.getLogger().setLevel(logging.WARNING)
+
+        results = {}
+        for case in cases:
+            if filters and not any(f in case.name for f in filters):
+                continue
+            results[case.name] = measure(case.func, case.repeat or repeat)
+
+    return {
+        "schema": SCHEMA_VERSION,
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+def compare(current: dict, baseline: dict, threshold: float, min_delta_ms: float) -> dict:
+    """Median of each case against the baseline; slower by more than `threshold` is a regression."""
+    report = {"regressions": {}, "improvements": {}, "unchanged": [], "new": [], "missing": []}
+    for name, result in current["results"].items():
+        previous = baseline["results"].get(name)
+        if previous is None:
+            report["new"].append(name)
+            continue
+        before, after = previous["median_ms"], result["median_ms"]
+        change = (after - before) / before if before else 0.0
+        entry = {"baseline_ms": before, "current_ms": after, "change": round(change, 3)}
+        if change > threshold and after - before >= min_delta_ms:
+            report["regressions"][name] = entry
+        elif change < -threshold and before - after >= min_delta_ms:
+            report["improvements"][name] = entry
+        else:
+            report["unchanged"].append(name)
+    report["missing"] = sorted(set(baseline["results"]) - set(current["results"]))
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per case (after one warm-up run)")
+    parser.add_argument("--filter", action="append", help="Only run cases whose name contains this (repeatable)")
+    parser.add_argument("--output", help="Write the results JSON to this file")
+    parser.add_argument("--save-baseline", metavar="PATH", help="Store the results as the baseline at PATH")
+    parser.add_argument("--baseline", metavar="PATH", help="Compare against the baseline at PATH")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed median slowdown, as a fraction")
+    parser.add_argument("--min-delta-ms", type=float, default=0.1,
+                        help="Ignore slowdowns smaller than this, which are timer noise")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("schema") != SCHEMA_VERSION:
+            parser.error(f"{args.baseline} has schema {baseline.get('schema')}, expected {SCHEMA_VERSION}")
+
+    results = run(args.repeat, args.filter)
+    if baseline is not None:
+        results["comparison"] = compare(results, baseline, args.threshold, args.min_delta_ms)
+
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({key: value for key, value in results.items() if key != "comparison" or path == args.output},
+                      f, indent=2)
+    print(json.dumps(results, indent=2))
+
+    if baseline is not None and results["comparison"]["regressions"]:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,90 @@ class Config:
     # API Keys
     NVIDIA_API_KEY = os.getenv("NVIDIA_API_KEY", "")
     NVIDIA_API_KEY_NEW = os.getenv("NVIDIA_API_KEY_NEW", "")
+    # OpenAI-compatible endpoint; point at tools/upstream_stub.py for offline runs
+    NVIDIA_BASE_URL = os.getenv("NVIDIA_BASE_URL", "https://integrate.api.nvidia.com/v1")
+
+    # Upstream scheduling (0 disables a budget)
+    UPSTREAM_MAX_CONCURRENCY = int(os.getenv("UPSTREAM_MAX_CONCURRENCY", "8"))
+    UPSTREAM_REQUESTS_PER_MINUTE = float(os.getenv("UPSTREAM_REQUESTS_PER_MINUTE", "0"))
+    UPSTREAM_TOKENS_PER_MINUTE = float(os.getenv("UPSTREAM_TOKENS_PER_MINUTE", "0"))
+    UPSTREAM_QUEUE_TIMEOUT = float(os.getenv("UPSTREAM_QUEUE_TIMEOUT", "120"))
+
+    # Upstream resilience
+    EMBEDDING_DEADLINE_SECONDS = float(os.getenv("EMBEDDING_DEADLINE_SECONDS", "15"))
+    CHAT_DEADLINE_SECONDS = float(os.getenv("CHAT_DEADLINE_SECONDS", "60"))
+    UPSTREAM_MAX_ATTEMPTS = int(os.getenv("UPSTREAM_MAX_ATTEMPTS", "3"))
+    UPSTREAM_BACKOFF_BASE = float(os.getenv("UPSTREAM_BACKOFF_BASE", "0.25"))
+    UPSTREAM_BACKOFF_MAX = float(os.getenv("UPSTREAM_BACKOFF_MAX", "4"))
+    UPSTREAM_HEDGE_ENABLED = os.getenv("UPSTREAM_HEDGE_ENABLED", "False").lower() in ("true", "1")
+    UPSTREAM_HEDGE_MIN_SAMPLES = int(os.getenv("UPSTREAM_HEDGE_MIN_SAMPLES", "20"))
+    CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+    CIRCUIT_RECOVERY_SECONDS = float(os.getenv("CIRCUIT_RECOVERY_SECONDS", "30"))
+
+    # Background health probes
+    HEALTH_PROBE_INTERVAL = float(os.getenv("HEALTH_PROBE_INTERVAL", "60"))
+    HEALTH_PROBE_TIMEOUT = float(os.getenv("HEALTH_PROBE_TIMEOUT", "10"))
+
+    # Embedding micro-batching
+    EMBEDDING_BATCH_WINDOW_MS = float(os.getenv("EMBEDDING_BATCH_WINDOW_MS", "5"))
+    EMBEDDING_BATCH_MAX_SIZE = int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "32"))
+
+    # Chat
+    CHAT_PREWARM_WORKERS = int(os.getenv("CHAT_PREWARM_WORKERS", "2"))
+    CHAT_PREWARM_TIMEOUT = float(os.getenv("CHAT_PREWARM_TIMEOUT", "60"))
+
+    # Resume scoring: "whole" document cosine or "section_weighted"
+    RESUME_SCORING_MODE = os.getenv("RESUME_SCORING_MODE", "whole").lower()
+
+    # Requirement-to-evidence match explanations
+    EXPLANATION_SUPPORT_THRESHOLD = float(os.getenv("EXPLANATION_SUPPORT_THRESHOLD", "0.45"))
+    EXPLANATION_CACHE_SIZE = int(os.getenv("EXPLANATION_CACHE_SIZE", "5000"))
+
+    # PDF text extraction budget and worker pool
+    PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "20"))
+    PDF_MAX_CHARS = int(os.getenv("PDF_MAX_CHARS", "50000"))
+    PDF_WORKERS = int(os.getenv("PDF_WORKERS", "2"))
+    PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "8"))
+    PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "4"))
+
+    # OCR of scanned PDF pages
+    OCR_DPI = int(os.getenv("OCR_DPI", "200"))
+    OCR_MAX_WIDTH = int(os.getenv("OCR_MAX_WIDTH", "1700"))
+    OCR_BINARIZE_THRESHOLD = int(os.getenv("OCR_BINARIZE_THRESHOLD", "160"))
+    OCR_WORKERS = int(os.getenv("OCR_WORKERS", "2"))
+    OCR_CACHE_SIZE = int(os.getenv("OCR_CACHE_SIZE", "256"))
+
+    # Extracted-text cache for uploaded files (SQLite, LRU-evicted)
+    EXTRACTION_CACHE_MAX_BYTES = int(os.getenv("EXTRACTION_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+    # Uploads: whole-request limit (two files plus form fields) and in-memory spool size per file
+    MAX_REQUEST_BYTES = int(os.getenv("MAX_REQUEST_BYTES", str(21 * 1024 * 1024)))
+    UPLOAD_SPOOL_BYTES = int(os.getenv("UPLOAD_SPOOL_BYTES", str(1024 * 1024)))
+
+    # Bulk job-feed import; feeds uploaded to /import_jobs have their own size limit and run in the background
+    JOB_IMPORT_BATCH_SIZE = int(os.getenv("JOB_IMPORT_BATCH_SIZE", "64"))
+    JOB_FEED_MAX_BYTES = int(os.getenv("JOB_FEED_MAX_BYTES", str(512 * 1024 * 1024)))
+    JOB_IMPORT_WORKERS = int(os.getenv("JOB_IMPORT_WORKERS", "1"))
+
+    # Text normalization (Unicode form applied before cleaning and tokenizing; empty to disable)
+    TEXT_UNICODE_FORM = os.getenv("TEXT_UNICODE_FORM", "NFKC")
+    TEXT_NORMALIZER_CACHE_SIZE = int(os.getenv("TEXT_NORMALIZER_CACHE_SIZE", "512"))
+
+    # Skills taxonomy (canonical skill -> aliases)
+    SKILLS_TAXONOMY_PATH = os.getenv(
+        "SKILLS_TAXONOMY_PATH",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "skills_taxonomy.json")
+    )
+
+    # NLP (spaCy) service
+    NLP_ENABLED = os.getenv("NLP_ENABLED", "True").lower() in ("true", "1")
+    SPACY_MODEL = os.getenv("SPACY_MODEL", "en_core_web_sm")
+    NLP_WORKERS = int(os.getenv("NLP_WORKERS", "2"))
+    NLP_BATCH_SIZE = int(os.getenv("NLP_BATCH_SIZE", "16"))
+
+    # Metrics: directory shared by worker processes for merged /metrics output (empty for one process)
+    METRICS_MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR", "")
+    METRICS_SNAPSHOT_INTERVAL = float(os.getenv("METRICS_SNAPSHOT_INTERVAL", "5"))
 
     # Database
     DB_PATH = os.getenv("DB_PATH", "career_launchpad.db")
@@ -1,12 +1,26 @@
 # database/models.py
 import sqlite3
+import functools
 from contextlib import contextmanager
 import logging
 from config import Config
+from utils.metrics import metrics_collector
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+db_query_seconds = metrics_collector.histogram(
+    "db_query_duration_seconds", "Time spent in each database function, connection included.", ("operation",)
+)
+
+def timed_query(func):
+    """Record the duration of a database function under its name."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with db_query_seconds.time(operation=func.__name__):
+            return func(*args, **kwargs)
+    return wrapper
+
 @contextmanager
 def get_db_connection():
     conn = sqlite3.connect(Config.DB_PATH)
@@ -18,14 +32,13 @@ def get_db_connection():
     finally:
         conn.close()
 
+@timed_query
 def initialize_database():
     with get_db_connection() as conn:
         cursor = conn.cursor()
 
-        # Drop the job_applications table if it exists
-        cursor.execute("DROP TABLE IF EXISTS job_applications")
-
-        # Recreate the job_applications table with the updated schema
+        # Create job_applications table; existing applications are kept, since any
+        # extra process that initializes the database (e.g. a pool worker) must not wipe them
         cursor.execute("""
         CREATE TABLE IF NOT EXISTS job_applications (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -62,14 +75,96 @@ def initialize_database():
         )
         """)
 
+        # Create keyword statistics tables (document frequencies across stored job descriptions)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS keyword_documents (
+            doc_hash TEXT PRIMARY KEY,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS keyword_document_frequency (
+            term TEXT PRIMARY KEY,
+            df INTEGER NOT NULL
+        )
+        """)
+
+        # Create document_skills table (skills extracted per document, keyed by content hash)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS document_skills (
+            doc_hash TEXT NOT NULL,
+            taxonomy_version TEXT NOT NULL,
+            skills TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (doc_hash, taxonomy_version)
+        )
+        """)
+
+        # Create extracted_text table (text extracted from uploaded files, keyed by file hash)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS extracted_text (
+            file_hash TEXT NOT NULL,
+            extractor_version TEXT NOT NULL,
+            text TEXT NOT NULL,
+            size_bytes INTEGER NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_used_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (file_hash, extractor_version)
+        )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_extracted_text_last_used ON extracted_text(last_used_at)")
+
+        # Create ingested_files table (bulk-ingestion checkpoint, one row per distinct file)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS ingested_files (
+            file_hash TEXT PRIMARY KEY,
+            path TEXT NOT NULL,
+            status TEXT NOT NULL,
+            resume_id INTEGER,
+            error TEXT,
+            ingested_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (resume_id) REFERENCES resumes(id)
+        )
+        """)
+
+        # Create job posting tables (bulk-imported job descriptions with precomputed embeddings)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS companies (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE
+        )
+        """)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS job_titles (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL UNIQUE
+        )
+        """)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS job_postings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            company_id INTEGER NOT NULL,
+            job_title_id INTEGER NOT NULL,
+            job_description TEXT NOT NULL,
+            content_hash TEXT NOT NULL UNIQUE,
+            embedding BLOB,
+            source TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (company_id) REFERENCES companies(id),
+            FOREIGN KEY (job_title_id) REFERENCES job_titles(id)
+        )
+        """)
+
         # Create indexes for faster querying
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_job_applications_company ON job_applications(company)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_job_applications_job_title ON job_applications(job_title)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_resumes_user_name ON resumes(user_name)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_job_postings_company ON job_postings(company_id)")
 
         conn.commit()
         logger.info("Database initialized and tables created.")
 
+@timed_query
 def add_job_application(company, job_title, job_description, application_status="Pending", match_score=None, feedback=None, suggestions=None):
     with get_db_connection() as conn:
         cursor = conn.cursor()
@@ -80,6 +175,7 @@ def add_job_application(company, job_title, job_description, application_status=
         conn.commit()
         return cursor.lastrowid
 
+@timed_query
 def get_job_application_by_id(application_id):
     """Fetch job application details by application ID."""
     with get_db_connection() as conn:
@@ -88,6 +184,7 @@ def get_job_application_by_id(application_id):
         result = cursor.fetchone()
         return _fetch_one_as_dict(cursor, result)
 
+@timed_query
 def get_job_applications():
     """Retrieve all job applications."""
     with get_db_connection() as conn:
@@ -95,6 +192,7 @@ def get_job_applications():
         cursor.execute("SELECT * FROM job_applications")
         return _fetch_all_as_dict(cursor)
 
+@timed_query
 def get_companies_and_titles():
     """Retrieve unique company and job title combinations."""
     with get_db_connection() as conn:
@@ -102,6 +200,7 @@ def get_companies_and_titles():
         cursor.execute("SELECT DISTINCT company, job_title FROM job_applications")
         return cursor.fetchall()
 
+@timed_query
 def add_resume(user_name, resume_text):
     """Add a resume with user name and resume text."""
     with get_db_connection() as conn:
@@ -113,6 +212,7 @@ def add_resume(user_name, resume_text):
         conn.commit()
         return cursor.lastrowid
 
+@timed_query
 def add_resume_embedding(resume_id, embedding):
     """Store the embedding of a resume."""
     with get_db_connection() as conn:
@@ -124,6 +224,7 @@ def add_resume_embedding(resume_id, embedding):
         conn.commit()
         return cursor.lastrowid
 
+@timed_query
 def get_resume(resume_id):
     """Retrieve resume details by resume ID."""
     with get_db_connection() as conn:
@@ -132,6 +233,7 @@ def get_resume(resume_id):
         result = cursor.fetchone()
         return _fetch_one_as_dict(cursor, result)
 
+@timed_query
 def update_job_application_status(application_id, new_status):
     """Update the status of a job application."""
     with get_db_connection() as conn:
@@ -144,6 +246,169 @@ def update_job_application_status(application_id, new_status):
         conn.commit()
         return cursor.rowcount > 0
 
+@timed_query
+def add_keyword_document(doc_hash, terms):
+    """Record a job description's distinct terms; returns False if the document was already counted."""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("INSERT OR IGNORE INTO keyword_documents (doc_hash) VALUES (?)", (doc_hash,))
+        if cursor.rowcount == 0:
+            return False
+        cursor.executemany("""
+        INSERT INTO keyword_document_frequency (term, df) VALUES (?, 1)
+        ON CONFLICT(term) DO UPDATE SET df = df + 1
+        """, [(term,) for term in terms])
+        conn.commit()
+        return True
+
+@timed_query
+def get_keyword_statistics():
+    """Return the number of counted job descriptions and the document frequency of every term."""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM keyword_documents")
+        document_count = cursor.fetchone()[0]
+        cursor.execute("SELECT term, df FROM keyword_document_frequency")
+        return document_count, dict(cursor.fetchall())
+
+@timed_query
+def get_document_skills(doc_hash, taxonomy_version):
+    """Fetch the stored skills JSON for a document, or None if it has not been processed."""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT skills FROM document_skills WHERE doc_hash = ? AND taxonomy_version = ?",
+            (doc_hash, taxonomy_version)
+        )
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+@timed_query
+def save_document_skills(doc_hash, taxonomy_version, skills):
+    """Store the skills JSON extracted from a document."""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+        INSERT OR REPLACE INTO document_skills (doc_hash, taxonomy_version, skills)
+        VALUES (?, ?, ?)
+        """, (doc_hash, taxonomy_version, skills))
+        conn.commit()
+
+@timed_query
+def get_extracted_text(file_hash, extractor_version):
+    """Fetch the cached text of a file and mark it as recently used, or None if it is not cached."""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT text FROM extracted_text WHERE file_hash = ? AND extractor_version = ?",
+            (file_hash, extractor_version)
+        )
+        row = cursor.fetchone()
+        if row:
+            cursor.execute("""
+            UPDATE extracted_text SET last_used_at = CURRENT_TIMESTAMP
+            WHERE file_hash = ? AND extractor_version = ?
+            """, (file_hash, extractor_version))
+            conn.commit()
+        return row[0] if row else None
+
+@timed_query
+def save_extracted_text(file_hash, extractor_version, text, max_bytes):
+    """Store the text extracted from a file, evicting least recently used entries beyond `max_bytes`."""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+        INSERT OR REPLACE INTO extracted_text (file_hash, extractor_version, text, size_bytes)
+        VALUES (?, ?, ?, ?)
+        """, (file_hash, extractor_version, text, len(text.encode("utf-8", errors="replace"))))
+
+        # Entries from older extractor versions can never be hit again
+        cursor.execute("DELETE FROM extracted_text WHERE extractor_version != ?", (extractor_version,))
+        cursor.execute("""
+        DELETE FROM extracted_text WHERE rowid IN (
+            SELECT rowid FROM (
+                SELECT rowid, SUM(size_bytes) OVER (ORDER BY last_used_at DESC, rowid DESC) AS running_total
+                FROM extracted_text
+            ) WHERE running_total > ?
+        )
+        """, (max_bytes,))
+        conn.commit()
+
+@timed_query
+def get_extracted_text_usage():
+    """Number of cached extractions and their total size in bytes."""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM extracted_text")
+        entries, size_bytes = cursor.fetchone()
+        return {"entries": entries, "size_bytes": size_bytes}
+
+@timed_query
+def get_ingested_files():
+    """Map of file hash to ingestion status for every file recorded by bulk ingestion."""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT file_hash, status FROM ingested_files")
+        return dict(cursor.fetchall())
+
+@timed_query
+def add_ingested_resumes(resumes, failures=()):
+    """
+    Store a batch of ingested resumes in one transaction.
+
+    `resumes` holds (file_hash, path, user_name, resume_text, embedding_bytes) tuples and
+    `failures` (file_hash, path, error) tuples; both are checkpointed in ingested_files.
+    """
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        for file_hash, path, user_name, resume_text, embedding in resumes:
+            cursor.execute("INSERT INTO resumes (user_name, resume_text) VALUES (?, ?)", (user_name, resume_text))
+            resume_id = cursor.lastrowid
+            cursor.execute("INSERT INTO resume_embeddings (resume_id, embedding) VALUES (?, ?)", (resume_id, embedding))
+            cursor.execute("""
+            INSERT OR REPLACE INTO ingested_files (file_hash, path, status, resume_id, error)
+            VALUES (?, ?, 'done', ?, NULL)
+            """, (file_hash, path, resume_id))
+        cursor.executemany("""
+        INSERT OR REPLACE INTO ingested_files (file_hash, path, status, resume_id, error)
+        VALUES (?, ?, 'failed', NULL, ?)
+        """, list(failures))
+        conn.commit()
+
+@timed_query
+def get_existing_posting_hashes(content_hashes):
+    """The subset of `content_hashes` already stored in job_postings."""
+    content_hashes = list(content_hashes)
+    if not content_hashes:
+        return set()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        placeholders = ",".join("?" * len(content_hashes))
+        cursor.execute(f"SELECT content_hash FROM job_postings WHERE content_hash IN ({placeholders})", content_hashes)
+        return {row[0] for row in cursor.fetchall()}
+
+@timed_query
+def add_job_postings(postings, source=None):
+    """
+    Store a batch of job postings in one transaction, upserting their companies and titles.
+
+    `postings` holds (company, job_title, job_description, content_hash, embedding_bytes) tuples;
+    postings whose content hash is already stored are ignored. Returns the number inserted.
+    """
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.executemany("INSERT OR IGNORE INTO companies (name) VALUES (?)", {(p[0],) for p in postings})
+        cursor.executemany("INSERT OR IGNORE INTO job_titles (title) VALUES (?)", {(p[1],) for p in postings})
+        inserted = 0
+        for company, job_title, job_description, content_hash, embedding in postings:
+            cursor.execute("""
+            INSERT OR IGNORE INTO job_postings (company_id, job_title_id, job_description, content_hash, embedding, source)
+            VALUES ((SELECT id FROM companies WHERE name = ?), (SELECT id FROM job_titles WHERE title = ?), ?, ?, ?, ?)
+            """, (company, job_title, job_description, content_hash, embedding, source))
+            inserted += cursor.rowcount
+        conn.commit()
+        return inserted
+
 # Helper functions
 def _fetch_all_as_dict(cursor):
     """Convert all rows to a list of dictionaries"""
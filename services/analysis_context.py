@@ -0,0 +1,63 @@
+# analysis_context.py
+import logging
+from typing import Callable, Dict, List, Optional, Sequence
+
+import torch
+
+from services.keywords import extract_terms
+from utils.text_normalizer import text_normalizer, NormalizedText
+
+logger = logging.getLogger(__name__)
+
+class AnalysisContext:
+    """
+    Per-request memo of document-level work.
+
+    One context is created per submission and handed to the matcher and the
+    feedback generator, so each document is embedded and normalized exactly
+    once however many of them use it.
+    Embeddings of documents not yet seen are fetched together in one batch.
+    """
+
+    def __init__(self, embedding_service, prepare: Callable[[str], str] = None):
+        self.embedding_service = embedding_service
+        self.prepare = prepare or (lambda text: text)
+        self._embeddings: Dict[str, torch.Tensor] = {}
+        self._normalized: Dict[str, NormalizedText] = {}
+        self._terms: Dict[str, set] = {}
+
+    def embeddings(self, texts: Sequence[str]) -> Optional[List[torch.Tensor]]:
+        """Embeddings for each text (as prepared for the model), or None if any could not be fetched."""
+        prepared = [self.prepare(text or "") for text in texts]
+        missing = list(dict.fromkeys(text for text in prepared if text not in self._embeddings))
+        if missing:
+            fetched = self.embedding_service.get_embeddings(missing)
+            if fetched is None:
+                return None
+            for text, embedding in zip(missing, fetched):
+                self._embeddings[text] = embedding
+        return [self._embeddings[text] for text in prepared]
+
+    def embedding(self, text: str) -> Optional[torch.Tensor]:
+        embeddings = self.embeddings([text])
+        return embeddings[0] if embeddings else None
+
+    def normalized(self, text: str) -> NormalizedText:
+        """Cleaned text and keyword tokens of a document, from one normalization pass."""
+        if text not in self._normalized:
+            self._normalized[text] = text_normalizer.normalize(text or "")
+        return self._normalized[text]
+
+    def cleaned_text(self, text: str) -> str:
+        """`TextExtractor.clean_text` output for a document."""
+        return self.normalized(text).cleaned
+
+    def tokens(self, text: str) -> List[str]:
+        """Keyword tokens of a document."""
+        return self.normalized(text).tokens
+
+    def terms(self, text: str) -> set:
+        """Distinct keyword terms (unigrams and bigrams) of a document."""
+        if text not in self._terms:
+            self._terms[text] = set(extract_terms(self.tokens(text)))
+        return self._terms[text]
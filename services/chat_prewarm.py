@@ -0,0 +1,85 @@
+# chat_prewarm.py
+import contextvars
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Optional
+
+from utils.metrics import record_cache_lookup
+
+logger = logging.getLogger(__name__)
+
+# Opening message the frontend sends automatically after a submission (see static/script.js)
+OPENING_QUERY = "Can you provide feedback on my resume?"
+
+class OpeningResponseCache:
+    """Pre-generates the opening chat reply for each application in the background."""
+
+    def __init__(self, chat_service, max_workers: int = 2, max_entries: int = 256, wait_timeout: float = 60.0):
+        self.chat_service = chat_service
+        self.max_entries = max_entries
+        self.wait_timeout = wait_timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="chat-prewarm")
+        self._pending = OrderedDict()  # application_id -> (query, Future)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def schedule(self, application_id, context: dict, query: str = OPENING_QUERY):
+        """Start generating the opening reply for an application without blocking the caller."""
+        # Carry the caller's upstream priority and session over to the worker thread
+        call_context = contextvars.copy_context()
+        future = self._executor.submit(call_context.run, self.chat_service.generate_response, query, context)
+        with self._lock:
+            self._pending[application_id] = (query, future)
+            self._pending.move_to_end(application_id)
+            while len(self._pending) > self.max_entries:
+                _, (_, stale) = self._pending.popitem(last=False)
+                stale.cancel()
+        logger.info("Scheduled opening chat response for application %s", application_id)
+        return future
+
+    def pop(self, application_id, query: str) -> Optional[str]:
+        """
+        Take the pre-generated reply for an application if it answers `query`.
+
+        Waits for a generation that is still running, since that is always
+        sooner than starting a new one. Returns None when nothing usable is cached.
+        """
+        with self._lock:
+            entry = self._pending.get(application_id)
+            if entry is None or entry[0] != query:
+                self.misses += 1
+                record_cache_lookup("opening_chat", False)
+                return None
+            del self._pending[application_id]
+
+        try:
+            response = entry[1].result(timeout=self.wait_timeout)
+        except FutureTimeoutError:
+            logger.warning("Opening chat response for application %s timed out", application_id)
+            response = None
+        except Exception as e:
+            logger.error(f"Opening chat response for application {application_id} failed: {e}")
+            response = None
+
+        with self._lock:
+            if response is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        record_cache_lookup("opening_chat", response is not None)
+        return response
+
+    def discard(self, application_id):
+        """Drop any pending reply for an application."""
+        with self._lock:
+            entry = self._pending.pop(application_id, None)
+        if entry:
+            entry[1].cancel()
+
+    def get_stats(self) -> dict:
+        """Return cache hit/miss counters and the number of pending entries."""
+        with self._lock:
+            return {"pending": len(self._pending), "hits": self.hits, "misses": self.misses}
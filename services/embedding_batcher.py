@@ -0,0 +1,104 @@
+# embedding_batcher.py
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List, Optional, Sequence
+
+from services.scheduler import upstream_scheduler, current_context
+
+logger = logging.getLogger(__name__)
+
+class _Pending:
+    __slots__ = ("text", "future", "priority", "session_id")
+
+    def __init__(self, text, priority, session_id):
+        self.text = text
+        self.future = Future()
+        self.priority = priority
+        self.session_id = session_id
+
+class EmbeddingBatcher:
+    """
+    Collects embedding requests from concurrent callers into batched upstream calls.
+
+    The first request opens a batch window of `window_ms`; everything that
+    arrives before it closes (up to `max_batch_size` texts) is sent in one call
+    to `embed_batch`, and each caller's future receives its own vector.
+    """
+
+    def __init__(self, embed_batch: Callable[[List[str]], List[List[float]]], window_ms: float = 5.0,
+                 max_batch_size: int = 32, max_inflight_batches: int = 4, name: str = "embeddings"):
+        self.embed_batch = embed_batch
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self.name = name
+        self._queue: List[_Pending] = []
+        self._cond = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=max_inflight_batches, thread_name_prefix=f"{name}-batch")
+        self._worker = threading.Thread(target=self._collect, name=f"{name}-batcher", daemon=True)
+        self._worker.start()
+        self.batches_sent = 0
+        self.texts_sent = 0
+
+    def submit(self, text: str) -> Future:
+        """Queue a text for embedding and return a future for its vector."""
+        priority, session_id = current_context()
+        pending = _Pending(text, priority, session_id)
+        with self._cond:
+            self._queue.append(pending)
+            self._cond.notify()
+        return pending.future
+
+    def embed(self, text: str, timeout: Optional[float] = None) -> List[float]:
+        """Embed a single text, blocking until its batch returns."""
+        return self.submit(text).result(timeout=timeout)
+
+    def embed_many(self, texts: Sequence[str], timeout: Optional[float] = None) -> List[List[float]]:
+        """Embed several texts; they are batched together with any concurrent callers."""
+        futures = [self.submit(text) for text in texts]
+        return [future.result(timeout=timeout) for future in futures]
+
+    def _collect(self):
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+                # Hold the window open unless the batch fills up first
+                deadline = time.monotonic() + self.window
+                while len(self._queue) < self.max_batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(timeout=remaining)
+                batch = self._queue[:self.max_batch_size]
+                del self._queue[:self.max_batch_size]
+            self._executor.submit(self._send, batch)
+
+    def _send(self, batch: List[_Pending]):
+        # The batch runs at the most urgent priority of any caller waiting on it
+        lead = min(batch, key=lambda pending: pending.priority)
+        try:
+            with upstream_scheduler.context(lead.priority, lead.session_id):
+                vectors = self.embed_batch([pending.text for pending in batch])
+            if len(vectors) != len(batch):
+                raise ValueError(f"Expected {len(batch)} embeddings, received {len(vectors)}")
+        except Exception as e:
+            logger.error(f"Batched {self.name} call failed for {len(batch)} texts: {e}")
+            for pending in batch:
+                pending.future.set_exception(e)
+            return
+
+        with self._cond:
+            self.batches_sent += 1
+            self.texts_sent += len(batch)
+        for pending, vector in zip(batch, vectors):
+            pending.future.set_result(vector)
+
+    def get_stats(self) -> dict:
+        """Return the number of batches sent and the average batch size."""
+        return {
+            "batches": self.batches_sent,
+            "texts": self.texts_sent,
+            "avg_batch_size": round(self.texts_sent / self.batches_sent, 2) if self.batches_sent else 0.0
+        }
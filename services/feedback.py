@@ -3,6 +3,10 @@ import numpy as np
 import torch  # Import PyTorch to enable GPU usage
 from typing import Dict, List
 from services.nvidia_embeddings import NvidiaEmbeddingService  # Correct import
+from services.keywords import KeywordEngine
+from services.skills import SkillExtractor
+from services.nlp import NlpService
+from services.analysis_context import AnalysisContext
 import os
 from dotenv import load_dotenv
 
@@ -12,10 +16,16 @@ load_dotenv()
 logger = logging.getLogger(__name__)
 
 class FeedbackGenerator:
-    def __init__(self):
+    def __init__(self, nlp_service: NlpService = None):
         try:
             # Initialize EmbeddingService with the embedding model
             self.embedding_service = NvidiaEmbeddingService(model_name="nvidia/nv-embedqa-e5-v5")
+            # TF-IDF keyword ranking backed by stored job descriptions
+            self.keyword_engine = KeywordEngine()
+            # Single-pass skill matching against the skills taxonomy
+            self.skill_extractor = SkillExtractor()
+            # spaCy entities, noun chunks and lemmas, processed in a worker pool
+            self.nlp_service = nlp_service or NlpService()
             # Set the device to GPU if available
             self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
             logger.info("FeedbackGenerator initialized on device: %s", self.device)
@@ -33,11 +43,15 @@ class FeedbackGenerator:
             logger.error(f"Failed to get embedding for text: {e}")
             raise
 
-    def calculate_keyword_match(self, job_description: str, resume_text: str) -> Dict:
+    def calculate_keyword_match(self, job_description: str, resume_text: str, analysis: AnalysisContext = None) -> Dict:
         """Calculate the similarity score for keywords using NVIDIA embeddings."""
         try:
-            job_embedding = self.get_embedding(job_description)
-            resume_embedding = self.get_embedding(resume_text)
+            if analysis is not None:
+                # Reuse the embeddings already fetched for this request
+                job_embedding, resume_embedding = analysis.embeddings([job_description, resume_text])
+            else:
+                job_embedding = self.get_embedding(job_description)
+                resume_embedding = self.get_embedding(resume_text)
             
             # Calculate cosine similarity on GPU
             similarity = torch.dot(job_embedding, resume_embedding) / (
@@ -48,9 +62,11 @@ class FeedbackGenerator:
             logger.error(f"Error in calculating keyword match: {e}")
             return {"match_score": 0.0}
 
-    def generate_feedback(self, job_description: str, resume_text: str, match_score: float) -> Dict:
+    def generate_feedback(self, job_description: str, resume_text: str, match_score: float,
+                          analysis: AnalysisContext = None) -> Dict:
         """Generate feedback based on match score and content analysis."""
-        missing_keywords = self.analyze_keywords(job_description, resume_text)
+        missing_keywords = self.analyze_keywords(job_description, resume_text, analysis=analysis)
+        skills = self.analyze_skills(job_description, resume_text, analysis=analysis)
 
         feedback = {
             "overall_match": {
@@ -59,16 +75,49 @@ class FeedbackGenerator:
             "keywords_analysis": {
                 "missing_keywords": missing_keywords
             },
+            "skills_analysis": skills,
+            "phrase_analysis": self.analyze_phrases(job_description, resume_text),
             "detailed_recommendations": self.get_improvement_suggestions()
         }
         return feedback
 
-    def analyze_keywords(self, job_description: str, resume_text: str) -> List[str]:
-        """Identify missing keywords from job description in resume."""
-        job_keywords = set(job_description.lower().split())
-        resume_keywords = set(resume_text.lower().split())
-        missing_keywords = list(job_keywords - resume_keywords)
-        return missing_keywords[:15]  # Limit to top 15 missing keywords for brevity
+    def analyze_keywords(self, job_description: str, resume_text: str, analysis: AnalysisContext = None) -> List[str]:
+        """Identify missing keywords from job description in resume, ranked by TF-IDF."""
+        resume_terms = analysis.terms(resume_text) if analysis is not None else None
+        return self.keyword_engine.missing_keywords(
+            job_description, resume_text, limit=15, resume_terms=resume_terms  # Top 15 for brevity
+        )
+
+    def analyze_skills(self, job_description: str, resume_text: str, analysis: AnalysisContext = None) -> Dict:
+        """Compare taxonomy skills required by the job description with those found in the resume."""
+        normalize = analysis.normalized if analysis is not None else None
+        try:
+            job_skills = self.skill_extractor.extract(job_description, normalize=normalize)
+            resume_skills = set(self.skill_extractor.extract(resume_text, normalize=normalize))
+        except Exception as e:
+            logger.error(f"Error extracting skills: {e}")
+            return {"matched_skills": [], "missing_skills": []}
+        return {
+            "matched_skills": [skill for skill in job_skills if skill in resume_skills],
+            "missing_skills": [skill for skill in job_skills if skill not in resume_skills]
+        }
+
+    def analyze_phrases(self, job_description: str, resume_text: str) -> Dict:
+        """Find job-description noun phrases whose content words never appear (as lemmas) in the resume."""
+        analyses = self.nlp_service.analyze_many([job_description, resume_text])
+        if not analyses:
+            return {"missing_phrases": [], "job_entities": []}
+
+        job_analysis, resume_analysis = analyses
+        resume_lemmas = set(resume_analysis.get("lemmas", []))
+        missing_phrases = [
+            text for text, content in job_analysis.get("noun_chunks", [])
+            if not any(lemma in resume_lemmas for lemma in content)
+        ]
+        return {
+            "missing_phrases": missing_phrases[:10],
+            "job_entities": [text for text, _ in job_analysis.get("entities", [])][:10]
+        }
 
     def get_improvement_suggestions(self, feedback: Dict = None) -> List[str]:
         """Provide improvement suggestions based on feedback or return generic suggestions."""
@@ -0,0 +1,79 @@
+# health_probe.py
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+class HealthProber:
+    """
+    Probes each upstream API on a fixed schedule from a background thread.
+
+    Results are kept in a small ring buffer per upstream, and status requests
+    are answered from that buffer, so health checks never trigger upstream calls.
+    """
+
+    def __init__(self, probes: Dict[str, Callable[[], None]], interval: float = 60.0, history: int = 20):
+        self.probes = probes
+        self.interval = interval
+        self._results = {name: deque(maxlen=history) for name in probes}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the background probe loop (idempotent)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="health-prober", daemon=True)
+        self._thread.start()
+        logger.info("Health prober started for %s every %ss", ", ".join(self.probes), self.interval)
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.probe_all()
+            self._stop.wait(self.interval)
+
+    def probe_all(self):
+        """Run every probe once and record the outcome."""
+        for name, probe in self.probes.items():
+            start = time.monotonic()
+            try:
+                probe()
+                ok, error = True, None
+            except Exception as e:
+                ok, error = False, str(e)
+                logger.warning(f"Health probe for {name} failed: {e}")
+            result = {
+                "ok": ok,
+                "latency_ms": round((time.monotonic() - start) * 1000, 1),
+                "checked_at": time.time(),
+                "error": error
+            }
+            with self._lock:
+                self._results[name].append(result)
+
+    def get_status(self, name: str) -> dict:
+        """Return the cached status of one upstream."""
+        with self._lock:
+            results = list(self._results.get(name, ()))
+        if not results:
+            return {"status": "unknown"}
+
+        latest = results[-1]
+        successes = [r["latency_ms"] for r in results if r["ok"]]
+        return {
+            "status": "available" if latest["ok"] else "unavailable",
+            "latency_ms": latest["latency_ms"],
+            "avg_latency_ms": round(sum(successes) / len(successes), 1) if successes else None,
+            "availability": round(len(successes) / len(results), 3),
+            "samples": len(results),
+            "checked_at": latest["checked_at"],
+            "error": latest["error"]
+        }
@@ -0,0 +1,215 @@
+# job_import.py
+import csv
+import hashlib
+import io
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+from config import Config
+from database.models import get_existing_posting_hashes, add_job_postings
+from services.scheduler import upstream_scheduler, Priority
+from utils.utils import FileHandler
+
+logger = logging.getLogger(__name__)
+
+# Accepted column / key names for each field, first match wins
+FIELD_ALIASES = {
+    "company": ("company", "company_name", "employer", "organization"),
+    "job_title": ("job_title", "title", "position", "role"),
+    "job_description": ("job_description", "description", "jd", "body", "text"),
+}
+
+FEED_FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+
+def content_hash(company: str, job_title: str, job_description: str) -> str:
+    """SHA-256 of a posting's content, with whitespace normalized so re-exports hash the same."""
+    normalized = "\x1f".join(" ".join(value.split()) for value in (company, job_title, job_description))
+    return hashlib.sha256(normalized.encode("utf-8", errors="replace")).hexdigest()
+
+def feed_format(filename: str) -> Optional[str]:
+    return FEED_FORMATS.get(os.path.splitext(filename or "")[1].lower())
+
+def _field(record: Dict, field: str) -> str:
+    lowered = {str(key).strip().lower(): value for key, value in record.items() if key is not None}
+    for alias in FIELD_ALIASES[field]:
+        value = lowered.get(alias)
+        if value is not None and str(value).strip():
+            return str(value).strip()
+    return ""
+
+class JobFeedImporter:
+    """
+    Imports job postings from CSV or JSONL feeds.
+
+    Records are parsed lazily from the stream and handled in batches, so
+    memory stays bounded however large the feed is. Postings whose content
+    hash is already stored are skipped before anything is embedded; the rest
+    are embedded in one upstream batch at BULK priority and written with their
+    companies and titles in one transaction.
+    """
+
+    def __init__(self, embedding_service, prepare=None, keyword_engine=None, batch_size: int = None):
+        self.embedding_service = embedding_service
+        self.prepare = prepare or (lambda text: text)
+        self.keyword_engine = keyword_engine
+        self.batch_size = batch_size or Config.JOB_IMPORT_BATCH_SIZE
+
+    def _records(self, stream: BinaryIO, fmt: str, stats: Dict) -> Iterator[Tuple[str, str, str]]:
+        """Yield (company, job_title, job_description) per well-formed record."""
+        encoding = FileHandler.detect_stream_encoding(stream)
+        text = io.TextIOWrapper(stream, encoding=encoding, errors="replace", newline="")
+        try:
+            if fmt == "csv":
+                reader = csv.DictReader(text)
+                while True:
+                    try:
+                        record = next(reader)
+                    except StopIteration:
+                        break
+                    except csv.Error as e:
+                        logger.warning(f"Skipping malformed CSV record near line {reader.line_num}: {e}")
+                        stats["malformed"] += 1
+                        continue
+                    yield self._fields(record, stats)
+            else:
+                for line_number, line in enumerate(text, start=1):
+                    if not line.strip():
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except ValueError as e:
+                        logger.warning(f"Skipping malformed JSONL record on line {line_number}: {e}")
+                        stats["malformed"] += 1
+                        continue
+                    yield self._fields(record if isinstance(record, dict) else {}, stats)
+        finally:
+            # Leave the caller's stream open
+            text.detach()
+
+    @staticmethod
+    def _fields(record: Dict, stats: Dict) -> Optional[Tuple[str, str, str]]:
+        fields = tuple(_field(record, name) for name in ("company", "job_title", "job_description"))
+        if not all(fields):
+            stats["incomplete"] += 1
+            return None
+        return fields
+
+    def _flush(self, batch, stats: Dict, source: Optional[str]):
+        hashes = [content_hash(*record) for record in batch]
+        existing = get_existing_posting_hashes(set(hashes))
+        new = []
+        seen = set()
+        for record, record_hash in zip(batch, hashes):
+            if record_hash in existing or record_hash in seen:
+                stats["skipped_existing"] += 1
+                continue
+            seen.add(record_hash)
+            new.append((record, record_hash))
+        if not new:
+            return
+
+        start = time.perf_counter()
+        with upstream_scheduler.context(Priority.BULK, "job-import"):
+            embeddings = self.embedding_service.get_embeddings([self.prepare(record[2]) for record, _ in new])
+        stats["embed_seconds"] += time.perf_counter() - start
+        if embeddings is None:
+            # Nothing from this batch is stored; rerunning the import picks it up again
+            raise RuntimeError("Embedding request failed; import stopped. Run it again to continue.")
+        vectors = embeddings.detach().cpu().numpy().astype(np.float32)
+
+        start = time.perf_counter()
+        stats["imported"] += add_job_postings(
+            [(*record, record_hash, vector.tobytes()) for (record, record_hash), vector in zip(new, vectors)],
+            source=source
+        )
+        stats["write_seconds"] += time.perf_counter() - start
+        if self.keyword_engine is not None:
+            for (_, _, job_description), _ in new:
+                self.keyword_engine.observe(job_description)
+
+    def import_stream(self, stream: BinaryIO, fmt: str, source: str = None) -> Dict:
+        """Import every posting in a seekable binary stream of the given format ("csv" or "jsonl")."""
+        if fmt not in ("csv", "jsonl"):
+            raise ValueError(f"Unsupported feed format: {fmt}")
+        stats = {"records": 0, "imported": 0, "skipped_existing": 0, "incomplete": 0, "malformed": 0,
+                 "embed_seconds": 0.0, "write_seconds": 0.0}
+        started = time.perf_counter()
+        batch = []
+        for record in self._records(stream, fmt, stats):
+            stats["records"] += 1
+            if record is None:
+                continue
+            batch.append(record)
+            if len(batch) >= self.batch_size:
+                self._flush(batch, stats, source)
+                batch = []
+        if batch:
+            self._flush(batch, stats, source)
+
+        stats["seconds"] = round(time.perf_counter() - started, 3)
+        stats["embed_seconds"] = round(stats["embed_seconds"], 3)
+        stats["write_seconds"] = round(stats["write_seconds"], 3)
+        return stats
+
+class ImportJobQueue:
+    """
+    Runs uploaded feed imports on background threads, so the upload request
+    returns at once, and keeps the status of recent imports for polling.
+
+    Each feed is imported from a file the queue owns and deletes afterwards.
+    """
+
+    def __init__(self, importer: JobFeedImporter, max_workers: int = None, max_jobs: int = 100):
+        self.importer = importer
+        self.max_jobs = max_jobs
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or Config.JOB_IMPORT_WORKERS,
+                                            thread_name_prefix="job-import")
+        self._jobs = OrderedDict()  # job id -> status dict
+        self._lock = threading.Lock()
+
+    def submit(self, path: str, fmt: str, source: str = None) -> Dict:
+        """Queue the import of the feed at `path`, taking ownership of the file; returns the job status."""
+        job_id = uuid.uuid4().hex
+        job = {"job_id": job_id, "status": "queued", "source": source, "format": fmt,
+               "submitted_at": time.time(), "results": None, "error": None}
+        with self._lock:
+            self._jobs[job_id] = job
+            while len(self._jobs) > self.max_jobs:
+                self._jobs.popitem(last=False)
+            status = dict(job)
+        self._executor.submit(self._run, job, path)
+        return status
+
+    def _run(self, job: Dict, path: str):
+        with self._lock:
+            job["status"] = "running"
+        try:
+            with open(path, "rb") as stream:
+                results = self.importer.import_stream(stream, job["format"], source=job["source"])
+            with self._lock:
+                job.update(status="done", results=results)
+            logger.info("Imported job feed %s: %s", job["source"], results)
+        except Exception as e:
+            logger.error(f"Job feed import {job['job_id']} failed: {e}")
+            with self._lock:
+                job.update(status="failed", error=str(e))
+        finally:
+            try:
+                os.remove(path)
+            except OSError as e:
+                logger.warning(f"Could not remove job feed {path}: {e}")
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Status of an import: queued, running, done (with results) or failed (with the error)."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
@@ -0,0 +1,173 @@
+# keywords.py
+import hashlib
+import logging
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from database.models import add_keyword_document, get_keyword_statistics
+from utils.text_normalizer import text_normalizer
+from utils.metrics import record_cache_lookup
+
+logger = logging.getLogger(__name__)
+
+STOPWORDS = frozenset("""
+a about above across after again against all also an and any are as at be because been before being below
+between both but by can could did do does doing down during each either etc few for from further had has have
+having he her here hers him his how i if in into is it its itself just may me might more most must my no nor
+not of off on once only or other our ours out over own per same shall she should so some such than that the
+their them then there these they this those through to too under until up upon us very via was we well were
+what when where which while who whom why will with within without would you your yours
+ability able candidate candidates including join looking plus preferred required requirements responsibilities
+role strong team using work working years year experience
+""".split())
+
+def document_hash(text: str) -> str:
+    """SHA-256 of a document's text, used to key caches and the IDF corpus."""
+    return hashlib.sha256(text.encode("utf-8", errors="replace")).hexdigest()
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word and phrase-boundary tokens of a document."""
+    return text_normalizer.tokenize(text)
+
+def extract_terms(tokens: List[str]) -> List[str]:
+    """Unigrams and bigrams worth ranking; stopwords and bare numbers are dropped and break bigrams."""
+    terms = []
+    previous = None
+    for token in tokens:
+        if token in STOPWORDS or token.isdigit() or len(token) < 2 or not token[0].isalnum():
+            previous = None
+            continue
+        terms.append(token)
+        if previous:
+            terms.append(f"{previous} {token}")
+        previous = token
+    return terms
+
+class KeywordEngine:
+    """
+    Ranks job-description terms missing from a resume by TF-IDF.
+
+    Document frequencies come from every stored job description and are kept
+    in the database, updated incrementally as new descriptions are stored. Each
+    job description's term counts are tokenized once and cached by content hash.
+    """
+
+    def __init__(self, cache_size: int = 256):
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+        self._document_count = None
+        self._df: Dict[str, int] = {}
+        self._corpus_version = 0
+        self._terms = OrderedDict()    # doc hash -> (terms array, tf array)
+        self._weights = OrderedDict()  # doc hash -> (corpus version, weights array)
+
+    def _load_statistics(self):
+        if self._document_count is None:
+            try:
+                self._document_count, self._df = get_keyword_statistics()
+            except Exception as e:
+                logger.error(f"Failed to load keyword statistics: {e}")
+                self._document_count, self._df = 0, {}
+
+    def observe(self, job_description: str):
+        """Add a stored job description to the IDF corpus (each distinct text is counted once)."""
+        if not job_description:
+            return
+        distinct_terms = set(extract_terms(tokenize(job_description)))
+        with self._lock:
+            # Load before the insert, or the loaded counts would already include this document
+            self._load_statistics()
+        try:
+            added = add_keyword_document(document_hash(job_description), distinct_terms)
+        except Exception as e:
+            logger.error(f"Failed to update keyword statistics: {e}")
+            return
+        if not added:
+            return
+        with self._lock:
+            self._document_count += 1
+            for term in distinct_terms:
+                self._df[term] = self._df.get(term, 0) + 1
+            self._corpus_version += 1
+
+    def _term_counts(self, doc_hash: str, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        with self._lock:
+            cached = self._terms.get(doc_hash)
+            if cached is not None:
+                self._terms.move_to_end(doc_hash)
+        record_cache_lookup("keyword_terms", cached is not None)
+        if cached is not None:
+            return cached
+
+        counts = Counter(extract_terms(tokenize(text)))
+        terms = np.array(list(counts.keys()), dtype=object)
+        tf = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+        with self._lock:
+            self._terms[doc_hash] = (terms, tf)
+            if len(self._terms) > self.cache_size:
+                self._terms.popitem(last=False)
+        return terms, tf
+
+    def tfidf(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Return a document's terms and their TF-IDF weights against the current corpus."""
+        doc_hash = document_hash(text)
+        terms, tf = self._term_counts(doc_hash, text)
+        with self._lock:
+            cached = self._weights.get(doc_hash)
+            if cached is not None and cached[0] == self._corpus_version:
+                self._weights.move_to_end(doc_hash)
+                return terms, cached[1]
+            self._load_statistics()
+            document_count = self._document_count
+            df = np.fromiter((self._df.get(term, 0) for term in terms), dtype=np.float64, count=len(terms))
+            version = self._corpus_version
+
+        # Smoothed IDF; sublinear TF keeps a repeated word from dominating
+        idf = np.log((1.0 + document_count) / (1.0 + df)) + 1.0
+        weights = (1.0 + np.log(tf, where=tf > 0, out=np.zeros_like(tf))) * idf
+        with self._lock:
+            self._weights[doc_hash] = (version, weights)
+            if len(self._weights) > self.cache_size:
+                self._weights.popitem(last=False)
+        return terms, weights
+
+    def missing_keywords(self, job_description: str, resume_text: str, limit: int = 15,
+                         resume_terms: Optional[set] = None) -> List[str]:
+        """Job-description terms absent from the resume, highest TF-IDF first."""
+        if not job_description:
+            return []
+        terms, weights = self.tfidf(job_description)
+        _, tf = self._term_counts(document_hash(job_description), job_description)
+        if resume_terms is None:
+            resume_terms = set(extract_terms(tokenize(resume_text or "")))
+
+        missing = np.fromiter((term not in resume_terms for term in terms), dtype=bool, count=len(terms))
+        is_phrase = np.fromiter((" " in term for term in terms), dtype=bool, count=len(terms))
+        # A phrase that half-overlaps the resume ("senior python") is rarely a real skill
+        # unless it recurs, in this description or across the corpus
+        with self._lock:
+            recurring = np.fromiter((self._df.get(term, 0) > 0 for term in terms), dtype=bool, count=len(terms))
+        recurring |= tf > 1
+        partial = np.fromiter(
+            (" " in term and any(word in resume_terms for word in term.split(" ")) for term in terms),
+            dtype=bool, count=len(terms)
+        )
+        candidates = np.flatnonzero(missing & ~(partial & ~recurring))
+        # Highest weight first, phrases before their words on ties, then order of appearance
+        ranked = candidates[np.lexsort((candidates, ~is_phrase[candidates], -weights[candidates]))]
+
+        selected = []
+        covered = set()
+        for index in ranked:
+            term = terms[index]
+            # Skip a word already shown as part of a selected phrase
+            if term in covered:
+                continue
+            selected.append(term)
+            covered.update(term.split(" "))
+            if len(selected) >= limit:
+                break
+        return selected
@@ -0,0 +1,118 @@
+# match_explanation.py
+import hashlib
+import logging
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List
+
+import numpy as np
+
+from config import Config
+from utils.metrics import record_cache_lookup
+
+logger = logging.getLogger(__name__)
+
+BULLET_PREFIX = re.compile(r"^\s*(?:[-*•▪●◦‣–—>]+|\(?\d{1,2}[.)])\s*")
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?;])\s+(?=[A-Z0-9(])")
+
+def split_units(text: str, min_words: int = 3) -> List[str]:
+    """Split text into bullet- or sentence-sized units, dropping fragments shorter than `min_words`."""
+    units = []
+    for line in (text or "").splitlines():
+        line = BULLET_PREFIX.sub("", line).strip()
+        for sentence in SENTENCE_BOUNDARY.split(line):
+            sentence = sentence.strip(" \t;")
+            if len(sentence.split()) >= min_words:
+                units.append(sentence)
+    return list(dict.fromkeys(units))
+
+class MatchExplainer:
+    """
+    Explains a match score requirement by requirement.
+
+    The job description is split into requirement sentences and the resume
+    into bullets. Both sets are embedded in batches and compared through one
+    similarity-matrix product; each requirement gets its best-supporting bullet
+    or is flagged as unsupported. Sentence embeddings are cached by hash, so
+    re-scoring an edited resume only embeds the bullets that changed.
+    """
+
+    def __init__(self, embedding_service, support_threshold: float = None, cache_size: int = None):
+        self.embedding_service = embedding_service
+        self.support_threshold = support_threshold if support_threshold is not None else Config.EXPLANATION_SUPPORT_THRESHOLD
+        self.cache_size = cache_size or Config.EXPLANATION_CACHE_SIZE
+        self._cache = OrderedDict()  # sentence hash -> unit-normalized float32 vector
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _hash(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8", errors="replace")).hexdigest()
+
+    def _embed(self, sentences: List[str]):
+        """Return a (len(sentences), dim) matrix of unit vectors and how many had to be fetched."""
+        hashes = [self._hash(sentence) for sentence in sentences]
+        # Vectors of this call are kept locally: storing the fetched ones may evict cached hits
+        found = {}
+        missing = []
+        with self._lock:
+            for sentence_hash, sentence in zip(hashes, sentences):
+                vector = self._cache.get(sentence_hash)
+                if vector is None:
+                    missing.append((sentence_hash, sentence))
+                else:
+                    self._cache.move_to_end(sentence_hash)
+                    found[sentence_hash] = vector
+        record_cache_lookup("explanation_embeddings", True, len(hashes) - len(missing))
+        record_cache_lookup("explanation_embeddings", False, len(missing))
+
+        if missing:
+            fetched = self.embedding_service.get_embeddings([sentence for _, sentence in missing])
+            if fetched is None:
+                raise RuntimeError("Embeddings for match explanation could not be retrieved.")
+            vectors = fetched.detach().cpu().numpy().astype(np.float32)
+            vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+            with self._lock:
+                for (sentence_hash, _), vector in zip(missing, vectors):
+                    found[sentence_hash] = self._cache[sentence_hash] = vector
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        return np.vstack([found[sentence_hash] for sentence_hash in hashes]), len(missing)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {"cached_sentences": len(self._cache), "cache_size": self.cache_size}
+
+    def explain(self, job_description: str, resume_text: str) -> Dict:
+        """Map each job requirement to its best-supporting resume bullet."""
+        requirements = split_units(job_description)
+        bullets = split_units(resume_text)
+        result = {"requirements": [], "coverage": 0.0, "embedded": 0, "cached": 0}
+        if not requirements:
+            return result
+
+        if bullets:
+            # Requirements and bullets go out together so they share upstream batches
+            matrix, embedded = self._embed(requirements + bullets)
+            requirement_vectors, bullet_vectors = matrix[:len(requirements)], matrix[len(requirements):]
+            similarity = requirement_vectors @ bullet_vectors.T
+            best = similarity.argmax(axis=1)
+            best_scores = similarity[np.arange(len(requirements)), best]
+        else:
+            embedded = 0
+            best = np.zeros(len(requirements), dtype=int)
+            best_scores = np.full(len(requirements), -1.0)
+
+        supported = best_scores >= self.support_threshold
+        for index, requirement in enumerate(requirements):
+            result["requirements"].append({
+                "requirement": requirement,
+                "evidence": bullets[best[index]] if bullets and supported[index] else None,
+                "similarity": round(float(best_scores[index]), 3) if bullets else None,
+                "supported": bool(supported[index])
+            })
+        result["coverage"] = round(float(supported.mean()), 3)
+        result["embedded"] = embedded
+        result["cached"] = len(requirements) + len(bullets) - embedded
+        return result
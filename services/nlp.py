@@ -0,0 +1,153 @@
+# nlp.py
+import atexit
+import hashlib
+import importlib.util
+import logging
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Sequence
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Pipeline components each feature depends on; everything else is excluded at load time
+FEATURE_COMPONENTS = {
+    "entities": {"tok2vec", "ner"},
+    "noun_chunks": {"tok2vec", "tagger", "attribute_ruler", "parser"},
+    "lemmas": {"tok2vec", "tagger", "attribute_ruler", "lemmatizer"},
+}
+PIPELINE_COMPONENTS = {"tok2vec", "tagger", "parser", "attribute_ruler", "lemmatizer", "ner", "senter"}
+
+# Loaded once in each worker process by _init_worker
+_worker_nlp = None
+_worker_features = ()
+
+def _init_worker(model_name: str, features: Sequence[str]):
+    global _worker_nlp, _worker_features
+    import spacy
+
+    needed = set().union(*(FEATURE_COMPONENTS[feature] for feature in features))
+    _worker_nlp = spacy.load(model_name, exclude=sorted(PIPELINE_COMPONENTS - needed))
+    _worker_features = tuple(features)
+
+def _doc_features(doc) -> Dict:
+    result = {}
+    if "entities" in _worker_features:
+        result["entities"] = [[ent.text, ent.label_] for ent in doc.ents]
+    if "noun_chunks" in _worker_features:
+        # Each chunk with the lemmas of its content words, for matching against other documents
+        chunks = {}
+        for chunk in doc.noun_chunks:
+            content = [token.lemma_.lower() for token in chunk if token.is_alpha and not token.is_stop and token.lemma_]
+            if content:
+                chunks.setdefault(chunk.text.lower(), content)
+        result["noun_chunks"] = [[text, content] for text, content in chunks.items()]
+    if "lemmas" in _worker_features:
+        result["lemmas"] = list(dict.fromkeys(
+            token.lemma_.lower() for token in doc if token.is_alpha and not token.is_stop and token.lemma_
+        ))
+    return result
+
+def _process_batch(texts: List[str], batch_size: int) -> List[Dict]:
+    return [_doc_features(doc) for doc in _worker_nlp.pipe(texts, batch_size=batch_size)]
+
+class NlpService:
+    """
+    Entity, noun-chunk and lemma extraction with spaCy.
+
+    The pipeline is loaded once per worker process with every component the
+    requested features do not need excluded, and documents are processed with
+    `nlp.pipe` in batches. Results are cached by document hash, so repeated
+    documents (the same resume against several jobs) are only parsed once.
+    """
+
+    def __init__(self, model_name: str = None, workers: int = None, batch_size: int = None,
+                 features: Sequence[str] = ("entities", "noun_chunks", "lemmas"), cache_size: int = 1024):
+        self.model_name = model_name or Config.SPACY_MODEL
+        self.workers = workers or Config.NLP_WORKERS
+        self.batch_size = batch_size or Config.NLP_BATCH_SIZE
+        self.features = tuple(features)
+        self.cache_size = cache_size
+        self.enabled = Config.NLP_ENABLED and self._model_available()
+        self._executor = None
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        if not self.enabled:
+            logger.warning("NLP service disabled (NLP_ENABLED is off, or spaCy or %s is not installed).", self.model_name)
+
+    def _model_available(self) -> bool:
+        """spaCy must be importable and the model installed as a package or present on disk."""
+        if importlib.util.find_spec("spacy") is None:
+            return False
+        return os.path.isdir(self.model_name) or importlib.util.find_spec(self.model_name) is not None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Spawned workers avoid forking a process that is already running threads
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.model_name, self.features)
+                )
+                atexit.register(self._executor.shutdown, wait=False, cancel_futures=True)
+                logger.info("Started %d NLP workers with model %s", self.workers, self.model_name)
+            return self._executor
+
+    def analyze(self, text: str) -> Optional[Dict]:
+        """Return the NLP features of one document, or None if the service is unavailable."""
+        results = self.analyze_many([text])
+        return results[0] if results else None
+
+    def analyze_many(self, texts: Sequence[str]) -> Optional[List[Dict]]:
+        """Return NLP features for each document, spreading uncached ones across the worker pool."""
+        if not self.enabled:
+            return None
+
+        hashes = [hashlib.sha256((text or "").encode("utf-8", errors="replace")).hexdigest() for text in texts]
+        results = {}
+        pending = OrderedDict()  # hash -> text, each distinct uncached document once
+        with self._lock:
+            for doc_hash, text in zip(hashes, texts):
+                if doc_hash in self._cache:
+                    self._cache.move_to_end(doc_hash)
+                    results[doc_hash] = self._cache[doc_hash]
+                else:
+                    pending.setdefault(doc_hash, text or "")
+
+        if pending:
+            pending_hashes = list(pending)
+            pending_texts = list(pending.values())
+            # Roughly one chunk per worker, never smaller than a pipe batch
+            chunk_size = max(self.batch_size, -(-len(pending_texts) // self.workers))
+            try:
+                executor = self._pool()
+                futures = [
+                    executor.submit(_process_batch, pending_texts[start:start + chunk_size], self.batch_size)
+                    for start in range(0, len(pending_texts), chunk_size)
+                ]
+                processed = [features for future in futures for features in future.result()]
+            except BrokenProcessPool as e:
+                # A worker died (e.g. out of memory); start a fresh pool on the next call
+                logger.error(f"NLP worker pool broke: {e}")
+                with self._lock:
+                    self._executor = None
+                return None
+            except Exception as e:
+                logger.error(f"NLP processing failed for {len(pending_texts)} documents: {e}")
+                return None
+
+            with self._lock:
+                for doc_hash, features in zip(pending_hashes, processed):
+                    results[doc_hash] = features
+                    self._cache[doc_hash] = features
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        return [results[doc_hash] for doc_hash in hashes]
@@ -4,18 +4,26 @@ import os
 import logging
 import re
 import torch  # Import PyTorch to enable GPU usage
+from config import Config
+from services.scheduler import upstream_scheduler, estimate_tokens
+from services.single_flight import SingleFlight, request_key
+from services.resilience import chat_resilience, time_left
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Identical chat completions in flight anywhere in the process share one upstream call
+chat_flights = SingleFlight("chat")
+
 class NvidiaChatService:
     def __init__(self, api_key=None, model_name="nvidia/llama-3.1-nemotron-70b-instruct", device=None):
         """
         Initialize the NVIDIA chat service with the specified model and set up GPU compatibility.
         """
         api_key = api_key or os.getenv("NVIDIA_API_KEY_NEW")
-        self.client = OpenAI(api_key=api_key, base_url="https://integrate.api.nvidia.com/v1")
+        # Retries are handled by the shared resilience policy
+        self.client = OpenAI(api_key=api_key, base_url=Config.NVIDIA_BASE_URL, max_retries=0)
         self.model_name = model_name
         # Set the device to GPU if available
         self.device = device or torch.device("cuda" if torch.cuda.is_available() else "cpu")
@@ -37,7 +45,39 @@ class NvidiaChatService:
             logger.error("Chat client not initialized. NVIDIA API key is required.")
             return "Chat service unavailable."
 
-        # Prepare context details to provide to the chat model
+        # Store the query in memory
+        self.chat_memory.append({"role": "user", "content": user_query})
+
+        bot_response = self._complete(self.build_context_message(context), self.chat_memory)
+        if bot_response is None:
+            return "An error occurred while generating a response."
+
+        self.chat_memory.append({"role": "assistant", "content": bot_response})  # Save response in memory
+        return self.format_response(bot_response)
+
+    def generate_response(self, user_query: str, context: dict = None):
+        """
+        Generate a raw response for a single query without touching the chat memory.
+
+        Used to pre-generate replies in the background; the caller records the
+        exchange with `record_exchange` once the reply is actually served.
+
+        Returns:
+        - str or None: The unformatted response, or None if generation failed.
+        """
+        if not self.client:
+            logger.error("Chat client not initialized. NVIDIA API key is required.")
+            return None
+        return self._complete(self.build_context_message(context), [{"role": "user", "content": user_query}])
+
+    def record_exchange(self, user_query: str, bot_response: str) -> str:
+        """Append a pre-generated exchange to the chat memory and return the formatted response."""
+        self.chat_memory.append({"role": "user", "content": user_query})
+        self.chat_memory.append({"role": "assistant", "content": bot_response})
+        return self.format_response(bot_response)
+
+    def build_context_message(self, context: dict = None) -> str:
+        """Build the system message describing the job application for the chat model."""
         context_message = "You are a helpful assistant for job applications and resume guidance."
         if context:
             logger.info("Received context for chat: %s", context)
@@ -54,31 +94,51 @@ class NvidiaChatService:
             # Add resume text, truncated for length
             resume_text = context.get('resume_text', 'N/A')[:500]
             context_message += f" Here are the details of the job application: {' '.join(details)} Resume: {resume_text}"
+        return context_message
 
-        # Store the query in memory
-        self.chat_memory.append({"role": "user", "content": user_query})
-
+    def _complete(self, context_message: str, messages: list):
+        """Send the conversation to the chat model and return the raw reply, or None on failure."""
         try:
             logger.info("Sending query to NVIDIA chat API with context: %s", context_message)
-            response = self.client.chat.completions.create(
-                model=self.model_name,
-                messages=[{"role": "system", "content": context_message}] + self.chat_memory,
-                temperature=0.2,
-                max_tokens=1024
+            full_messages = [{"role": "system", "content": context_message}] + messages
+            response = chat_flights.do(
+                request_key(self.model_name, full_messages, 0.2, 1024),
+                lambda: chat_resilience.call(
+                    lambda deadline: upstream_scheduler.run(
+                        lambda: self.client.chat.completions.create(
+                            model=self.model_name,
+                            messages=full_messages,
+                            temperature=0.2,
+                            max_tokens=1024,
+                            timeout=time_left(deadline)
+                        ),
+                        # Budget the prompt plus the largest reply we allow
+                        cost=sum(estimate_tokens(m["content"]) for m in full_messages) + 1024,
+                        api="chat",
+                        timeout=time_left(deadline)
+                    )
+                )
             )
 
             if response and response.choices:
-                bot_response = response.choices[0].message.content
-                self.chat_memory.append({"role": "assistant", "content": bot_response})  # Save response in memory
                 logger.info("Received response from NVIDIA chat API")
-                return self.format_response(bot_response)
+                return response.choices[0].message.content
             else:
                 logger.warning("Unexpected response structure from NVIDIA API: %s", response)
-                return "An error occurred while generating a response."
+                return None
 
         except Exception as e:
             logger.error(f"Error generating chat response: {e}")
-            return "An error occurred while generating a response."
+            return None
+
+    def check_health(self, timeout: float = 10.0):
+        """Send a one-token completion straight to the API; raises if it fails."""
+        self.client.chat.completions.create(
+            model=self.model_name,
+            messages=[{"role": "user", "content": "ping"}],
+            max_tokens=1,
+            timeout=timeout
+        )
 
     def clear_memory(self):
         """Clear the chat memory."""
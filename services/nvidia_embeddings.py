@@ -3,6 +3,12 @@ import os
 import logging
 import torch  # Import PyTorch for GPU compatibility
 from dotenv import load_dotenv
+from typing import List, Sequence
+from config import Config
+from services.scheduler import upstream_scheduler, estimate_tokens
+from services.embedding_batcher import EmbeddingBatcher
+from services.single_flight import SingleFlight, request_key
+from services.resilience import embedding_resilience, time_left
 
 # Load environment variables
 load_dotenv()
@@ -11,15 +17,48 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Identical embedding requests in flight anywhere in the process share one upstream call
+embedding_flights = SingleFlight("embeddings")
+
 class NvidiaEmbeddingService:
     def __init__(self, api_key=None, model_name="nvidia/nv-embedqa-e5-v5", device=None):
         """Initialize the NVIDIA embedding service with the specified model and set up GPU compatibility."""
         api_key = api_key or os.getenv("NVIDIA_API_KEY")
-        self.client = OpenAI(api_key=api_key, base_url="https://integrate.api.nvidia.com/v1")
+        # Retries are handled by the shared resilience policy
+        self.client = OpenAI(api_key=api_key, base_url=Config.NVIDIA_BASE_URL, max_retries=0)
         self.model_name = model_name
         self.device = device or torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        # Concurrent callers share batched upstream calls
+        self.batcher = EmbeddingBatcher(
+            self._embed_batch,
+            window_ms=Config.EMBEDDING_BATCH_WINDOW_MS,
+            max_batch_size=Config.EMBEDDING_BATCH_MAX_SIZE,
+            name="embeddings"
+        )
         logger.info("NvidiaEmbeddingService initialized on device: %s", self.device)
 
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """Send one batched embeddings request and return the vectors in input order."""
+        response = embedding_resilience.call(
+            lambda deadline: upstream_scheduler.run(
+                lambda: self.client.embeddings.create(
+                    input=texts,
+                    model=self.model_name,
+                    encoding_format="float",
+                    extra_body={"input_type": "query", "truncate": "NONE"},
+                    timeout=time_left(deadline)
+                ),
+                cost=sum(estimate_tokens(text) for text in texts),
+                api="embeddings",
+                timeout=time_left(deadline)
+            )
+        )
+        return [item.embedding for item in sorted(response.data, key=lambda item: getattr(item, "index", 0))]
+
+    def _submit(self, text: str):
+        """Queue a text on the batcher, joining an identical request that is already in flight."""
+        return embedding_flights.share(request_key(self.model_name, text), lambda: self.batcher.submit(text))
+
     def get_embedding(self, text: str) -> torch.Tensor:
         """Get embeddings for the given text using NVIDIA's embedding API and move it to the GPU if available."""
         if not self.client:
@@ -27,13 +66,7 @@ class NvidiaEmbeddingService:
             return None
 
         try:
-            response = self.client.embeddings.create(
-                input=[text],
-                model=self.model_name,
-                encoding_format="float",
-                extra_body={"input_type": "query", "truncate": "NONE"}
-            )
-            embedding = response.data[0].embedding
+            embedding = self._submit(text).result()
             # Convert the embedding to a PyTorch tensor and move it to the specified device
             embedding_tensor = torch.tensor(embedding, dtype=torch.float32).to(self.device)
             logger.info("Embedding retrieved and moved to device %s successfully.", self.device)
@@ -41,3 +74,27 @@ class NvidiaEmbeddingService:
         except Exception as e:
             logger.error(f"Failed to get embedding for text: {e}")
             return None
+
+    def get_embeddings(self, texts: Sequence[str]) -> torch.Tensor:
+        """Get embeddings for several texts as one (len(texts), dim) tensor, or None on failure."""
+        if not self.client:
+            logger.error("Embedding client not initialized. NVIDIA API key is required.")
+            return None
+
+        try:
+            futures = [self._submit(text) for text in texts]
+            embeddings = [future.result() for future in futures]
+            return torch.tensor(embeddings, dtype=torch.float32).to(self.device)
+        except Exception as e:
+            logger.error(f"Failed to get embeddings for {len(texts)} texts: {e}")
+            return None
+
+    def check_health(self, timeout: float = 10.0):
+        """Send a minimal embeddings request straight to the API; raises if it fails."""
+        self.client.embeddings.create(
+            input=["health check"],
+            model=self.model_name,
+            encoding_format="float",
+            extra_body={"input_type": "query", "truncate": "NONE"},
+            timeout=timeout
+        )
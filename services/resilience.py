@@ -0,0 +1,244 @@
+# resilience.py
+import contextvars
+import logging
+import math
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Optional
+
+import openai
+
+from config import Config
+from services.scheduler import admitted_at, upstream_scheduler
+
+logger = logging.getLogger(__name__)
+
+class CircuitOpenError(Exception):
+    """Raised without calling upstream while the circuit breaker is open."""
+    pass
+
+class DeadlineExceeded(Exception):
+    """Raised when a call runs out of time across all of its attempts."""
+    pass
+
+def time_left(deadline: float, minimum: float = 0.1) -> float:
+    """Seconds remaining until a monotonic deadline, never less than `minimum`."""
+    return max(minimum, deadline - time.monotonic())
+
+def is_retryable(error: Exception) -> bool:
+    """Timeouts, connection errors, rate limits and 5xx responses are worth retrying."""
+    if isinstance(error, (openai.APIConnectionError, openai.RateLimitError, DeadlineExceeded, TimeoutError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in (408, 409, 429) or error.status_code >= 500
+    return False
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    Opens after `failure_threshold` retryable failures in a row and rejects
+    calls for `recovery_timeout` seconds, then lets a single trial call through
+    (half-open) to decide whether to close again.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+                self.state = self.HALF_OPEN
+                self._trial_running = False
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info("Circuit %s closed", self.name)
+            self.state = self.CLOSED
+            self._failures = 0
+            self._trial_running = False
+
+    def record_neutral(self):
+        """End a trial call without judging upstream health."""
+        with self._lock:
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning("Circuit %s opened after %d consecutive failures", self.name, self._failures)
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._trial_running = False
+
+class ResilientCaller:
+    """
+    Wraps upstream calls with a deadline, jittered exponential retries, optional
+    hedging and a circuit breaker.
+
+    `func` is called with the absolute monotonic deadline of the whole call so it
+    can pass the remaining time on as the scheduler's queue timeout and the
+    request timeout (see `time_left`). Latency samples start when the scheduler
+    admits the call, so queueing does not inflate them. When hedging is enabled
+    and enough latencies have been observed, a duplicate request is started if
+    the first has not answered within the recent p95 latency and the scheduler
+    has a free slot, and whichever succeeds first wins.
+    """
+
+    _hedge_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="upstream-hedge")
+
+    def __init__(self, name: str, deadline: float = 30.0, max_attempts: int = 3, backoff_base: float = 0.25,
+                 backoff_max: float = 4.0, hedge: bool = False, hedge_min_samples: int = 20,
+                 breaker: Optional[CircuitBreaker] = None, latency_samples: int = 200):
+        self.name = name
+        self.deadline = deadline
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge = hedge
+        self.hedge_min_samples = hedge_min_samples
+        self.breaker = breaker or CircuitBreaker(name)
+        self._latencies = deque(maxlen=latency_samples)
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "retries": 0, "hedged": 0, "hedge_wins": 0, "failures": 0}
+
+    @classmethod
+    def from_config(cls, name: str, deadline: float):
+        return cls(
+            name,
+            deadline=deadline,
+            max_attempts=Config.UPSTREAM_MAX_ATTEMPTS,
+            backoff_base=Config.UPSTREAM_BACKOFF_BASE,
+            backoff_max=Config.UPSTREAM_BACKOFF_MAX,
+            hedge=Config.UPSTREAM_HEDGE_ENABLED,
+            hedge_min_samples=Config.UPSTREAM_HEDGE_MIN_SAMPLES,
+            breaker=CircuitBreaker(
+                name,
+                failure_threshold=Config.CIRCUIT_FAILURE_THRESHOLD,
+                recovery_timeout=Config.CIRCUIT_RECOVERY_SECONDS
+            )
+        )
+
+    def call(self, func: Callable[[float], object]):
+        """Call `func(deadline)` under the resilience policy and return its result."""
+        self._count("calls")
+        deadline = time.monotonic() + self.deadline
+        last_error = None
+
+        for attempt in range(self.max_attempts):
+            if not self.breaker.allow():
+                raise CircuitOpenError(f"{self.name} circuit is open; failing fast")
+            try:
+                result = self._attempt(func, deadline)
+            except Exception as e:
+                last_error = e
+                if not is_retryable(e):
+                    # Caller-side errors say nothing about upstream health
+                    self.breaker.record_neutral()
+                    raise
+                self.breaker.record_failure()
+                delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+                if attempt + 1 >= self.max_attempts or time.monotonic() + delay >= deadline:
+                    break
+                logger.warning(f"{self.name} attempt {attempt + 1} failed ({e}); retrying in {delay:.2f}s")
+                self._count("retries")
+                time.sleep(delay)
+            else:
+                self.breaker.record_success()
+                return result
+
+        self._count("failures")
+        if time.monotonic() >= deadline:
+            raise DeadlineExceeded(f"{self.name} call exceeded its {self.deadline}s deadline") from last_error
+        raise last_error
+
+    def _attempt(self, func, deadline):
+        hedge_delay = self._hedge_delay()
+        if hedge_delay is None:
+            return self._timed(func, deadline)
+
+        # Both requests run on worker threads, carrying the caller's context (scheduler priority)
+        primary = self._hedge_executor.submit(contextvars.copy_context().run, self._timed, func, deadline)
+        done, _ = wait([primary], timeout=min(hedge_delay, time_left(deadline, 0)))
+        if not done and not upstream_scheduler.has_capacity():
+            # Under contention a hedge would only join the same queue
+            done, _ = wait([primary], timeout=time_left(deadline, 0))
+            if not done:
+                raise DeadlineExceeded(f"{self.name} call exceeded its {self.deadline}s deadline")
+        if done:
+            return primary.result()
+
+        self._count("hedged")
+        hedge = self._hedge_executor.submit(contextvars.copy_context().run, self._timed, func, deadline)
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, timeout=time_left(deadline, 0), return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        self._count("hedge_wins")
+                    return future.result()
+                error = future.exception()
+        raise error or DeadlineExceeded(f"{self.name} hedged attempt timed out")
+
+    def _timed(self, func, deadline):
+        if time.monotonic() >= deadline:
+            raise DeadlineExceeded(f"{self.name} call exceeded its {self.deadline}s deadline")
+        start = time.monotonic()
+        result = func(deadline)
+        # Calls that went through the scheduler are timed from admission; an older admission means they did not
+        with self._lock:
+            self._latencies.append(time.monotonic() - max(start, admitted_at()))
+        return result
+
+    def _hedge_delay(self) -> Optional[float]:
+        if not self.hedge:
+            return None
+        with self._lock:
+            if len(self._latencies) < self.hedge_min_samples:
+                return None
+            ordered = sorted(self._latencies)
+        return ordered[max(0, math.ceil(len(ordered) * 0.95) - 1)]
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    def get_stats(self) -> dict:
+        """Return call, retry and hedging counters along with the breaker state."""
+        with self._lock:
+            stats = dict(self.stats)
+        stats["circuit_state"] = self.breaker.state
+        stats["circuit_rejections"] = self.breaker.rejected
+        return stats
+
+# Shared policies so every service instance sees the same upstream health
+embedding_resilience = ResilientCaller.from_config("embeddings", deadline=Config.EMBEDDING_DEADLINE_SECONDS)
+chat_resilience = ResilientCaller.from_config("chat", deadline=Config.CHAT_DEADLINE_SECONDS)
@@ -1,10 +1,13 @@
-from openai import OpenAI
 import logging
 import numpy as np
 import os
 import torch  # Import PyTorch for GPU compatibility
-from typing import Optional
+from typing import Dict, Optional
 from dotenv import load_dotenv
+from services.nvidia_embeddings import NvidiaEmbeddingService
+from services.analysis_context import AnalysisContext
+from services.resume_sections import ResumeSectionSegmenter
+from config import Config
 
 # Load environment variables from .env file
 load_dotenv()
@@ -12,16 +15,23 @@ load_dotenv()
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Relative importance of each resume section in section-weighted scoring
+SECTION_WEIGHTS = {"skills": 0.35, "experience": 0.35, "projects": 0.1, "education": 0.1, "summary": 0.1}
+
 class ResumeMatchingService:
     def __init__(self, device=None):
-        """Initialize the OpenAI client for NVIDIA API with the provided API key."""
+        """Initialize the NVIDIA embedding client with the API key from the environment."""
         try:
-            self.client = OpenAI(
-                api_key=os.getenv("NVIDIA_API_KEY"),  # Load API key from environment
-                base_url="https://integrate.api.nvidia.com/v1"
-            )
             self.model_name = "nvidia/nv-embedqa-e5-v5"
             self.device = device or torch.device("cuda" if torch.cuda.is_available() else "cpu")
+            # Shared embedding service so concurrent submissions are batched together
+            self.embedding_service = NvidiaEmbeddingService(
+                api_key=os.getenv("NVIDIA_API_KEY"),  # Load API key from environment
+                model_name=self.model_name,
+                device=self.device
+            )
+            self.segmenter = ResumeSectionSegmenter()
+            self.scoring_mode = Config.RESUME_SCORING_MODE
             logger.info("ResumeMatchingService initialized on device: %s", self.device)
         except Exception as e:
             logger.error(f"Error initializing ResumeMatchingService: {e}")
@@ -33,32 +43,23 @@ class ResumeMatchingService:
 
     def get_embedding(self, text: str) -> Optional[torch.Tensor]:
         """Generate embeddings for a given text using NVIDIA's model."""
-        try:
-            truncated_text = self.truncate_text(text)
-            response = self.client.embeddings.create(
-                input=[truncated_text],
-                model=self.model_name,
-                encoding_format="float",
-                extra_body={"input_type": "query", "truncate": "NONE"}
-            )
-            # Accessing the embedding from the correct response structure
-            embedding = response.data[0].embedding
-            # Convert the embedding to a PyTorch tensor and move to the specified device
-            return torch.tensor(embedding, dtype=torch.float32).to(self.device)
-        except Exception as e:
-            logger.error(f"Failed to get embedding for text: {e}")
-            return None
+        truncated_text = self.truncate_text(text)
+        return self.embedding_service.get_embedding(truncated_text)
 
-    def calculate_match_score(self, job_description: str, resume_text: str) -> float:
+    def new_analysis(self) -> AnalysisContext:
+        """Create a per-request analysis context that embeds text the way this matcher does."""
+        return AnalysisContext(self.embedding_service, prepare=self.truncate_text)
+
+    def calculate_match_score(self, job_description: str, resume_text: str, analysis: AnalysisContext = None) -> float:
         """Calculate the similarity score between job description and resume using NVIDIA embeddings."""
         try:
-            # Get embeddings for both texts
-            job_embedding = self.get_embedding(job_description)
-            resume_embedding = self.get_embedding(resume_text)
-
-            if job_embedding is None or resume_embedding is None:
+            # Get embeddings for both texts in a single batch, shared through the request's analysis context
+            analysis = analysis or self.new_analysis()
+            embeddings = analysis.embeddings([job_description, resume_text])
+            if embeddings is None:
                 logger.error("One or both embeddings could not be retrieved.")
                 return 0.0
+            job_embedding, resume_embedding = embeddings[0], embeddings[1]
 
             # Calculate cosine similarity using PyTorch (on GPU if available)
             similarity = torch.dot(job_embedding, resume_embedding) / (
@@ -68,3 +69,41 @@ class ResumeMatchingService:
         except Exception as e:
             logger.error(f"Error in calculating match score: {e}")
             return 0.0
+
+    def calculate_section_scores(self, job_description: str, resume_text: str,
+                                 analysis: AnalysisContext = None) -> Dict:
+        """
+        Score the whole resume and each of its sections against the job description.
+
+        The JD, the whole resume and every section are embedded in one batch and
+        compared in a single vectorized step. `match_score` is the section-weighted
+        score when RESUME_SCORING_MODE is "section_weighted" (and sections were
+        found), otherwise the whole-document score.
+        """
+        result = {"match_score": 0.0, "document_score": 0.0, "section_scores": {}}
+        try:
+            sections = self.segmenter.segment(resume_text)
+            names = list(sections)
+            analysis = analysis or self.new_analysis()
+            embeddings = analysis.embeddings([job_description, resume_text] + [sections[name] for name in names])
+            if embeddings is None:
+                logger.error("Embeddings for section scoring could not be retrieved.")
+                return result
+
+            job_embedding = embeddings[0].unsqueeze(0)
+            candidates = torch.stack(embeddings[1:])
+            similarities = torch.nn.functional.cosine_similarity(candidates, job_embedding, dim=1)
+            scores = [round(value * 100, 2) for value in similarities.tolist()]
+
+            result["document_score"] = scores[0]
+            result["section_scores"] = dict(zip(names, scores[1:]))
+            result["match_score"] = scores[0]
+            if self.scoring_mode == "section_weighted" and names:
+                weights = torch.tensor([SECTION_WEIGHTS.get(name, 0.0) for name in names], device=similarities.device)
+                if weights.sum() > 0:
+                    weighted = (similarities[1:] * weights).sum() / weights.sum()
+                    result["match_score"] = round(weighted.item() * 100, 2)
+            return result
+        except Exception as e:
+            logger.error(f"Error in calculating section scores: {e}")
+            return result
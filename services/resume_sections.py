@@ -0,0 +1,49 @@
+# resume_sections.py
+import logging
+import re
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+# Heading variants for each section, matched against a whole line (optionally ending in ":")
+SECTION_HEADINGS = {
+    "summary": ["summary", "professional summary", "career summary", "profile", "professional profile",
+                "objective", "career objective", "about me"],
+    "skills": ["skills", "technical skills", "key skills", "core skills", "core competencies", "competencies",
+               "technologies", "tools and technologies", "skills and tools", "technical proficiencies"],
+    "experience": ["experience", "work experience", "professional experience", "relevant experience",
+                   "employment", "employment history", "work history", "career history"],
+    "education": ["education", "academic background", "education and training", "qualifications",
+                  "certifications", "education and certifications", "licenses and certifications"],
+    "projects": ["projects", "personal projects", "selected projects", "key projects", "academic projects"],
+}
+
+SECTIONS = tuple(SECTION_HEADINGS)
+
+class ResumeSectionSegmenter:
+    """Splits resume text into its summary, skills, experience, education and projects sections."""
+
+    def __init__(self, headings: Dict[str, list] = None):
+        headings = headings or SECTION_HEADINGS
+        self._lookup = {alias: section for section, aliases in headings.items() for alias in aliases}
+        alternatives = "|".join(sorted((re.escape(alias) for alias in self._lookup), key=len, reverse=True))
+        # A heading line, possibly decorated ("EXPERIENCE", "Skills:", "## Projects"), with
+        # optional inline content after a colon ("Skills: Python, SQL")
+        self._heading = re.compile(rf"^[\W_]*({alternatives})\s*(?:[:\-–—|]\s*(.*))?$", re.IGNORECASE)
+
+    def segment(self, text: str) -> Dict[str, str]:
+        """Return the text of each section found; text before the first heading counts as the summary."""
+        sections: Dict[str, list] = {}
+        current = "summary"
+        for line in (text or "").splitlines():
+            stripped = line.strip()
+            match = self._heading.match(stripped) if len(stripped) <= 60 else None
+            if match:
+                current = self._lookup[match.group(1).lower()]
+                inline = match.group(2)
+                if inline:
+                    sections.setdefault(current, []).append(inline)
+                continue
+            if stripped:
+                sections.setdefault(current, []).append(stripped)
+        return {section: "\n".join(lines) for section, lines in sections.items() if lines}
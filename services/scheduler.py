@@ -0,0 +1,267 @@
+# scheduler.py
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Callable, Optional
+
+from config import Config
+from utils.metrics import metrics_collector
+
+logger = logging.getLogger(__name__)
+
+upstream_queue_seconds = metrics_collector.histogram(
+    "upstream_queue_seconds", "Time upstream calls waited for a scheduler slot.", ("priority",)
+)
+upstream_request_seconds = metrics_collector.histogram(
+    "upstream_request_duration_seconds", "Latency of upstream API requests.", ("api", "outcome")
+)
+upstream_tokens = metrics_collector.counter(
+    "upstream_tokens_total", "Tokens used by upstream API requests, as reported by the API.", ("api", "kind")
+)
+
+class Priority(IntEnum):
+    """Priority classes for upstream calls; lower values are served first."""
+    INTERACTIVE = 0  # Chat replies a user is waiting on
+    SUBMIT = 1       # Scoring a single submitted application
+    BULK = 2         # Bulk ingestion and re-scoring
+
+class SchedulerTimeout(Exception):
+    """Raised when a call waits longer than its queue timeout for an upstream slot."""
+    pass
+
+_current_priority: ContextVar[Priority] = ContextVar("upstream_priority", default=Priority.SUBMIT)
+_current_session: ContextVar[Optional[str]] = ContextVar("upstream_session", default=None)
+_admitted_at: ContextVar[float] = ContextVar("upstream_admitted_at", default=0.0)
+
+def current_context():
+    """Return the (priority, session_id) that upstream calls from this context run under."""
+    return _current_priority.get(), _current_session.get()
+
+def admitted_at() -> float:
+    """Monotonic time the latest call run from this context was admitted (0.0 if none was)."""
+    return _admitted_at.get()
+
+def _percentile(sorted_values, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence."""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(0, math.ceil(len(sorted_values) * fraction) - 1)]
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate used for budgeting (about four characters per token)."""
+    return max(1, len(text or "") // 4)
+
+class TokenBucket:
+    """Refilling budget; a rate of 0 disables the limit."""
+
+    def __init__(self, rate_per_minute: float):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(rate_per_minute)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def can_take(self, amount: float) -> bool:
+        if not self.rate:
+            return True
+        self._refill()
+        # A request bigger than the whole bucket is admitted once the bucket is full
+        return self.tokens >= min(amount, self.capacity)
+
+    def take(self, amount: float):
+        if self.rate:
+            self.tokens -= amount
+
+    def seconds_until(self, amount: float) -> float:
+        if not self.rate:
+            return 0.0
+        self._refill()
+        missing = min(amount, self.capacity) - self.tokens
+        return max(0.0, missing / self.rate)
+
+class _Ticket:
+    __slots__ = ("priority", "session_id", "cost", "enqueued_at", "granted")
+
+    def __init__(self, priority, session_id, cost):
+        self.priority = priority
+        self.session_id = session_id
+        self.cost = cost
+        self.enqueued_at = time.monotonic()
+        self.granted = threading.Event()
+
+class UpstreamScheduler:
+    """
+    Admission control for calls to the NVIDIA API.
+
+    Enforces a global concurrency cap plus request and token budgets. Waiting
+    calls are served strictly by priority class and round-robin across
+    sessions within a class, so one busy session cannot starve the others.
+    Calls still run on the caller's thread once admitted.
+    """
+
+    def __init__(self, max_concurrency: int = 8, requests_per_minute: float = 0,
+                 tokens_per_minute: float = 0, queue_timeout: float = 120.0, wait_samples: int = 1024):
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self._request_budget = TokenBucket(requests_per_minute)
+        self._token_budget = TokenBucket(tokens_per_minute)
+        self._queues = {priority: OrderedDict() for priority in Priority}  # session -> deque of tickets
+        self._lock = threading.Lock()
+        self._active = 0
+        self._completed = 0
+        self._timeouts = 0
+        self._wait_times = {priority: deque(maxlen=wait_samples) for priority in Priority}
+
+    @classmethod
+    def from_config(cls):
+        return cls(
+            max_concurrency=Config.UPSTREAM_MAX_CONCURRENCY,
+            requests_per_minute=Config.UPSTREAM_REQUESTS_PER_MINUTE,
+            tokens_per_minute=Config.UPSTREAM_TOKENS_PER_MINUTE,
+            queue_timeout=Config.UPSTREAM_QUEUE_TIMEOUT
+        )
+
+    @staticmethod
+    @contextmanager
+    def context(priority: Priority, session_id: Optional[str] = None):
+        """Set the priority class and session for upstream calls made inside the block."""
+        priority_token = _current_priority.set(priority)
+        session_token = _current_session.set(session_id)
+        try:
+            yield
+        finally:
+            _current_priority.reset(priority_token)
+            _current_session.reset(session_token)
+
+    def run(self, func: Callable, cost: int = 1, priority: Optional[Priority] = None,
+            session_id: Optional[str] = None, api: str = "upstream", timeout: Optional[float] = None):
+        """
+        Wait for an upstream slot, then call `func()` and return its result; `api` labels its metrics.
+
+        `timeout` caps the wait below the scheduler's queue timeout, e.g. at the time left
+        before the caller's deadline.
+        """
+        priority = _current_priority.get() if priority is None else priority
+        session_id = _current_session.get() if session_id is None else session_id
+        ticket = self._acquire(priority, session_id, cost, timeout)
+        _admitted_at.set(time.monotonic())
+        upstream_queue_seconds.observe(time.monotonic() - ticket.enqueued_at, priority=priority.name.lower())
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            result = func()
+            outcome = "ok"
+        finally:
+            upstream_request_seconds.observe(time.perf_counter() - start, api=api, outcome=outcome)
+            self._release(ticket)
+
+        usage = getattr(result, "usage", None)
+        for kind in ("prompt_tokens", "completion_tokens"):
+            tokens = getattr(usage, kind, None)
+            if tokens:
+                upstream_tokens.inc(tokens, api=api, kind=kind.split("_")[0])
+        return result
+
+    def _acquire(self, priority, session_id, cost, timeout: Optional[float] = None) -> _Ticket:
+        ticket = _Ticket(priority, session_id, cost)
+        timeout = self.queue_timeout if timeout is None else min(timeout, self.queue_timeout)
+        deadline = ticket.enqueued_at + timeout
+        with self._lock:
+            self._queues[priority].setdefault(session_id, deque()).append(ticket)
+            self._dispatch()
+
+        while not ticket.granted.is_set():
+            with self._lock:
+                retry_in = self._dispatch()
+            if ticket.granted.wait(timeout=min(max(retry_in, 0.01), 0.25)):
+                break
+            if time.monotonic() > deadline:
+                with self._lock:
+                    if ticket.granted.is_set():
+                        break
+                    self._remove(ticket)
+                    self._timeouts += 1
+                raise SchedulerTimeout(f"Timed out after {timeout:.1f}s waiting for an upstream slot")
+        return ticket
+
+    def has_capacity(self) -> bool:
+        """True when a new call would be admitted without queueing."""
+        with self._lock:
+            return self._active < self.max_concurrency and self._next_ticket() is None
+
+    def _release(self, ticket: _Ticket):
+        with self._lock:
+            self._active -= 1
+            self._completed += 1
+            self._dispatch()
+
+    def _dispatch(self) -> float:
+        """Admit waiting tickets while capacity allows; returns seconds until the budget refills."""
+        while self._active < self.max_concurrency:
+            ticket = self._next_ticket()
+            if ticket is None:
+                return 0.25
+            if not (self._request_budget.can_take(1) and self._token_budget.can_take(ticket.cost)):
+                return max(self._request_budget.seconds_until(1), self._token_budget.seconds_until(ticket.cost))
+            self._pop(ticket)
+            self._request_budget.take(1)
+            self._token_budget.take(ticket.cost)
+            self._active += 1
+            self._wait_times[ticket.priority].append(time.monotonic() - ticket.enqueued_at)
+            ticket.granted.set()
+        return 0.25
+
+    def _next_ticket(self) -> Optional[_Ticket]:
+        for priority in Priority:
+            sessions = self._queues[priority]
+            if sessions:
+                return next(iter(sessions.values()))[0]
+        return None
+
+    def _pop(self, ticket: _Ticket):
+        sessions = self._queues[ticket.priority]
+        tickets = sessions.pop(ticket.session_id)
+        tickets.popleft()
+        if tickets:
+            sessions[ticket.session_id] = tickets  # Re-append so the next session goes first
+
+    def _remove(self, ticket: _Ticket):
+        sessions = self._queues[ticket.priority]
+        tickets = sessions.get(ticket.session_id)
+        if tickets and ticket in tickets:
+            tickets.remove(ticket)
+            if not tickets:
+                del sessions[ticket.session_id]
+
+    def get_stats(self) -> dict:
+        """Return queue depth, concurrency and wait-time figures per priority class."""
+        with self._lock:
+            classes = {}
+            for priority in Priority:
+                waits = sorted(self._wait_times[priority])
+                classes[priority.name.lower()] = {
+                    "queue_depth": sum(len(tickets) for tickets in self._queues[priority].values()),
+                    "waiting_sessions": len(self._queues[priority]),
+                    "wait_ms_avg": round(sum(waits) / len(waits) * 1000, 2) if waits else 0.0,
+                    "wait_ms_p95": round(_percentile(waits, 0.95) * 1000, 2),
+                    "wait_ms_max": round(waits[-1] * 1000, 2) if waits else 0.0
+                }
+            return {
+                "active": self._active,
+                "max_concurrency": self.max_concurrency,
+                "completed": self._completed,
+                "timeouts": self._timeouts,
+                "classes": classes
+            }
+
+# Shared scheduler used by every upstream client in the process
+upstream_scheduler = UpstreamScheduler.from_config()
@@ -0,0 +1,181 @@
+# skills.py
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict, deque
+from typing import Callable, Dict, List, Tuple
+
+from config import Config
+from database.models import get_document_skills, save_document_skills
+from utils.text_normalizer import NormalizedText, text_normalizer
+from utils.metrics import record_cache_lookup
+
+logger = logging.getLogger(__name__)
+
+def skill_tokens(normalized: NormalizedText) -> List[str]:
+    """
+    The tokens the skill automaton runs over: the normalizer's tokens, which keep
+    "c++", "c#" and "node.js" whole, with a leading dot re-attached where the text
+    has one (".net"). "revenue. net" and "safety net" stay plain "net".
+    """
+    tokens = normalized.tokens
+    if "." not in tokens:
+        return tokens
+    offsets = normalized.offsets
+    merged = []
+    index = 0
+    while index < len(tokens):
+        if (tokens[index] == "." and index + 1 < len(tokens) and tokens[index + 1][0].isalnum()
+                and offsets[index][1] == offsets[index + 1][0]
+                and (index == 0 or offsets[index - 1][1] < offsets[index][0])):
+            merged.append("." + tokens[index + 1])
+            index += 2
+            continue
+        merged.append(tokens[index])
+        index += 1
+    return merged
+
+class SkillAutomaton:
+    """
+    Aho-Corasick automaton over word tokens.
+
+    All phrases are compiled into one trie with failure links, so a document is
+    matched against the whole taxonomy in a single pass over its tokens.
+    """
+
+    def __init__(self, phrases: Dict[Tuple[str, ...], str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, str]]] = [[]]  # (phrase length, canonical skill)
+
+        for tokens, canonical in phrases.items():
+            state = 0
+            for token in tokens:
+                next_state = self._goto[state].get(token)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][token] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = next_state
+            self._out[state].append((len(tokens), canonical))
+
+        # Breadth-first pass to set failure links and merge outputs of suffixes;
+        # depth-one states keep the root as their failure link
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(token, 0)
+                self._out[next_state] = self._out[next_state] + self._out[self._fail[next_state]]
+
+    def find(self, tokens: List[str]) -> List[Tuple[int, int, str]]:
+        """Return (start, end, canonical) for every phrase occurrence, overlapping ones included."""
+        matches = []
+        state = 0
+        for index, token in enumerate(tokens):
+            while state and token not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(token, 0)
+            for length, canonical in self._out[state]:
+                matches.append((index - length + 1, index + 1, canonical))
+        return matches
+
+class SkillExtractor:
+    """
+    Extracts canonical skills from documents using the skills taxonomy.
+
+    Aliases are tokenized with the same `text_normalizer` pipeline as
+    documents, and overlapping matches resolve to the leftmost-longest phrase
+    (so "sql server" is not also counted as "sql"). Results are stored per
+    document hash and taxonomy version for reuse.
+    """
+
+    def __init__(self, taxonomy_path: str = None, cache_size: int = 512):
+        taxonomy_path = taxonomy_path or Config.SKILLS_TAXONOMY_PATH
+        with open(taxonomy_path, "rb") as f:
+            raw = f.read()
+        # Stored results depend on the taxonomy and on how documents are normalized
+        self.taxonomy_version = hashlib.sha256(raw + text_normalizer.signature.encode()).hexdigest()[:16]
+        taxonomy = json.loads(raw)
+
+        phrases = {}
+        for canonical, entry in taxonomy.items():
+            # Entries are an alias list, or {"aliases": [...], "ambiguous": true} for skills named by an
+            # ordinary word ("react", "swift", "sales"), which only match through their qualified aliases
+            if isinstance(entry, dict):
+                aliases = list(entry.get("aliases", []))
+                names = aliases if entry.get("ambiguous") else [canonical] + aliases
+            else:
+                names = [canonical] + list(entry)
+            for alias in names:
+                tokens = tuple(skill_tokens(text_normalizer.normalize(alias)))
+                # A single-character alias would match noise
+                if not tokens or (len(tokens) == 1 and len(tokens[0]) < 2):
+                    continue
+                phrases.setdefault(tokens, canonical)
+        self.automaton = SkillAutomaton(phrases)
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        logger.info("SkillExtractor compiled %d phrases for %d skills", len(phrases), len(taxonomy))
+
+    def extract_from_normalized(self, normalized: NormalizedText) -> List[str]:
+        """Canonical skills in a normalized document, in order of first appearance."""
+        matches = self.automaton.find(skill_tokens(normalized))
+        matches.sort(key=lambda match: (match[0], -(match[1] - match[0])))
+
+        skills = []
+        seen = set()
+        covered_until = 0
+        for start, end, canonical in matches:
+            if start < covered_until:
+                continue
+            covered_until = end
+            if canonical not in seen:
+                seen.add(canonical)
+                skills.append(canonical)
+        return skills
+
+    def extract(self, text: str, normalize: Callable[[str], NormalizedText] = None) -> List[str]:
+        """
+        Canonical skills in a raw document, reusing stored results for documents seen before.
+
+        `normalize` may supply an already-computed normalization (e.g. from an AnalysisContext).
+        """
+        if not text:
+            return []
+        doc_hash = hashlib.sha256(text.encode("utf-8", errors="replace")).hexdigest()
+        with self._lock:
+            skills = self._cache.get(doc_hash)
+            if skills is not None:
+                self._cache.move_to_end(doc_hash)
+        record_cache_lookup("skills", skills is not None)
+        if skills is not None:
+            return skills
+
+        try:
+            stored = get_document_skills(doc_hash, self.taxonomy_version)
+            skills = json.loads(stored) if stored is not None else None
+            record_cache_lookup("skills_store", skills is not None)
+        except Exception as e:
+            logger.error(f"Failed to load stored skills: {e}")
+
+        if skills is None:
+            skills = self.extract_from_normalized((normalize or text_normalizer.normalize)(text))
+            try:
+                save_document_skills(doc_hash, self.taxonomy_version, json.dumps(skills))
+            except Exception as e:
+                logger.error(f"Failed to store extracted skills: {e}")
+
+        with self._lock:
+            self._cache[doc_hash] = skills
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return skills
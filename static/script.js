@@ -127,6 +127,9 @@ document.addEventListener("DOMContentLoaded", function () {
         }
 
         feedbackDiv.innerHTML = result.feedback ? formatFeedback(result.feedback) : "<p>Feedback data unavailable.</p>";
+        if (result.section_scores && Object.keys(result.section_scores).length > 0) {
+            feedbackDiv.innerHTML += formatSectionScores(result.section_scores);
+        }
         suggestionsDiv.innerHTML = result.suggestions ? formatDetailedSuggestions(result.suggestions) : "<p>No suggestions available.</p>";
     }
 
@@ -137,6 +140,19 @@ document.addEventListener("DOMContentLoaded", function () {
             feedbackHtml += `<p><strong>Missing Keywords:</strong> ${feedback.keywords_analysis.missing_keywords.join(", ")}</p>`;
         }
 
+        if (feedback.skills_analysis) {
+            if (feedback.skills_analysis.matched_skills.length > 0) {
+                feedbackHtml += `<p><strong>Matched Skills:</strong> ${feedback.skills_analysis.matched_skills.join(", ")}</p>`;
+            }
+            if (feedback.skills_analysis.missing_skills.length > 0) {
+                feedbackHtml += `<p><strong>Missing Skills:</strong> ${feedback.skills_analysis.missing_skills.join(", ")}</p>`;
+            }
+        }
+
+        if (feedback.phrase_analysis && feedback.phrase_analysis.missing_phrases.length > 0) {
+            feedbackHtml += `<p><strong>Job Phrases Not Covered:</strong> ${feedback.phrase_analysis.missing_phrases.join(", ")}</p>`;
+        }
+
         if (feedback.detailed_recommendations.length > 0) {
             feedbackHtml += `<p><strong>Detailed Recommendations:</strong></p><ul>`;
             feedback.detailed_recommendations.forEach(rec => {
@@ -148,6 +164,15 @@ document.addEventListener("DOMContentLoaded", function () {
         return feedbackHtml;
     }
 
+    function formatSectionScores(sectionScores) {
+        let sectionsHtml = `<p><strong>Section Scores:</strong></p><ul>`;
+        Object.entries(sectionScores).forEach(([section, score]) => {
+            sectionsHtml += `<li>${section.charAt(0).toUpperCase() + section.slice(1)}: ${score} / 100</li>`;
+        });
+        sectionsHtml += `</ul>`;
+        return sectionsHtml;
+    }
+
     function formatDetailedSuggestions(suggestions) {
         let suggestionsHtml = `<p><strong>Suggestions:</strong></p><ul>`;
         suggestions.forEach(suggestion => {
@@ -177,7 +202,7 @@ document.addEventListener("DOMContentLoaded", function () {
                 headers: {
                     "Content-Type": "application/json"
                 },
-                body: JSON.stringify({ query: message })
+                body: JSON.stringify({ query: message, auto_initiated: isAutoInitiated === true })
             });
 
             const data = await response.json();
@@ -0,0 +1,46 @@
+import os
+import tempfile
+
+from config import Config
+
+# app initializes the database and clients and starts the health prober at import, so point it at a
+# scratch database and an unroutable upstream first; the test replaces the clients with the
+# deterministic stub before any call
+Config.DB_PATH = os.path.join(tempfile.mkdtemp(), "test_chat_context.db")
+Config.NVIDIA_BASE_URL = "http://127.0.0.1:9/v1"
+Config.NVIDIA_API_KEY = os.environ.setdefault("NVIDIA_API_KEY", "offline-test")
+Config.NVIDIA_API_KEY_NEW = os.environ.setdefault("NVIDIA_API_KEY_NEW", "offline-test")
+
+import app as app_module
+from benchmarks import fixtures
+from benchmarks.stub_upstream import install
+
+def test_prewarmed_context_matches_live_context(monkeypatch):
+    install(app_module.embedding_service, app_module.resume_matcher.embedding_service,
+            app_module.feedback_generator.embedding_service, app_module.chat_service)
+    contexts = {}
+    schedule = app_module.opening_responses.schedule
+
+    def capture_prewarm(application_id, context, *args, **kwargs):
+        contexts["prewarmed"] = context
+        return schedule(application_id, context, *args, **kwargs)
+
+    def capture_live(user_query, context=None):
+        contexts["live"] = context
+        return "ok"
+
+    monkeypatch.setattr(app_module.opening_responses, "schedule", capture_prewarm)
+    monkeypatch.setattr(app_module.chat_service, "get_chat_response", capture_live)
+
+    client = app_module.app.test_client()
+    # Raw resume text with the casing and punctuation cleaning would remove
+    resume_text = fixtures.resume_text(fixtures.SIZES["small"]) + "\nC++ / C# & .NET — 10+ yrs!"
+    response = client.post('/submit_application', data={
+        'company': 'Acme Corp', 'job_title': 'Engineer',
+        'job_description': fixtures.job_description(), 'resume_text': resume_text
+    })
+    assert response.status_code == 200
+    assert client.post('/chat', json={'query': 'How can I improve my resume?'}).status_code == 200
+
+    assert contexts["prewarmed"] == contexts["live"]
+    assert contexts["live"]["resume_text"] == resume_text
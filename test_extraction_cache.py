@@ -0,0 +1,16 @@
+import os
+import tempfile
+
+from config import Config
+from database.models import initialize_database
+from utils.extraction_cache import ExtractionCache, PartialText
+
+def test_partial_text_is_returned_but_not_cached(monkeypatch):
+    monkeypatch.setattr(Config, "DB_PATH", os.path.join(tempfile.mkdtemp(), "test_extraction_cache.db"))
+    initialize_database()
+    cache = ExtractionCache(max_bytes=1 << 20, version="test")
+
+    assert cache.get_or_extract("scanned", lambda: PartialText("page one")) == "page one"
+    assert cache.get_or_extract("scanned", lambda: "page one\npage two") == "page one\npage two"
+    assert cache.get_or_extract("scanned", lambda: "not called") == "page one\npage two"
+    assert (cache.hits, cache.misses) == (1, 2)
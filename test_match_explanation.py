@@ -0,0 +1,33 @@
+import torch
+
+from benchmarks.stub_upstream import deterministic_embedding
+from services.match_explanation import MatchExplainer
+
+class CountingEmbeddings:
+    def __init__(self):
+        self.embedded = 0
+
+    def get_embeddings(self, texts):
+        self.embedded += len(texts)
+        return torch.tensor([deterministic_embedding(text, dim=32) for text in texts])
+
+JOB_DESCRIPTION = "Build REST APIs in Python. Operate PostgreSQL databases in production."
+RESUME = "- Built REST APIs in Python and Flask\n- Ran PostgreSQL clusters for five years"
+
+def test_rescoring_edited_resume_with_full_cache():
+    embeddings = CountingEmbeddings()
+    explainer = MatchExplainer(embeddings, cache_size=4)
+    explainer.explain(JOB_DESCRIPTION, RESUME)
+
+    edited = RESUME + "\n- Mentored three junior engineers on testing"
+    result = explainer.explain(JOB_DESCRIPTION, edited)
+
+    assert len(result["requirements"]) == 2
+    assert result["embedded"] == 1 and result["cached"] == 4
+    assert explainer.get_stats()["cached_sentences"] == 4
+
+def test_more_sentences_than_cache_size():
+    explainer = MatchExplainer(CountingEmbeddings(), cache_size=2)
+    result = explainer.explain(JOB_DESCRIPTION, RESUME)
+    assert result["embedded"] == 4
+    assert explainer.get_stats()["cached_sentences"] == 2
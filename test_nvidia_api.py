@@ -5,12 +5,15 @@ from dotenv import load_dotenv
 # Load environment variables from .env file (make sure NVIDIA_API_KEY and NVIDIA_API_KEY_NEW are set)
 load_dotenv()
 
+# NVIDIA_BASE_URL points the tests at another OpenAI-compatible endpoint, e.g. tools/upstream_stub.py
+BASE_URL = os.getenv("NVIDIA_BASE_URL", "https://integrate.api.nvidia.com/v1")
+
 def test_embedding_api():
     """Test the NVIDIA embedding API for resume matching."""
     try:
         embedding_client = OpenAI(
             api_key=os.getenv("NVIDIA_API_KEY"),
-            base_url="https://integrate.api.nvidia.com/v1"
+            base_url=BASE_URL
         )
         
         # Sample input for embedding API
@@ -35,7 +38,7 @@ def test_chat_api():
     try:
         chat_client = OpenAI(
             api_key=os.getenv("NVIDIA_API_KEY_NEW"),
-            base_url="https://integrate.api.nvidia.com/v1"
+            base_url=BASE_URL
         )
         
         # Sample input for chat API
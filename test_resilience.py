@@ -0,0 +1,45 @@
+import threading
+import time
+
+import pytest
+
+from services.resilience import ResilientCaller, time_left
+from services.scheduler import SchedulerTimeout, UpstreamScheduler
+
+def occupy(scheduler, release: threading.Event):
+    """Hold the scheduler's only slot until `release` is set."""
+    admitted = threading.Event()
+
+    def hold():
+        admitted.set()
+        release.wait()
+
+    thread = threading.Thread(target=lambda: scheduler.run(hold))
+    thread.start()
+    admitted.wait()
+    return thread
+
+def test_deadline_covers_queue_wait():
+    scheduler = UpstreamScheduler(max_concurrency=1, queue_timeout=120)
+    caller = ResilientCaller("test", deadline=0.5, max_attempts=1)
+    release = threading.Event()
+    holder = occupy(scheduler, release)
+    try:
+        start = time.monotonic()
+        with pytest.raises(SchedulerTimeout):
+            caller.call(lambda deadline: scheduler.run(lambda: "late", timeout=time_left(deadline)))
+        assert time.monotonic() - start < 2
+    finally:
+        release.set()
+        holder.join()
+
+def test_latency_sample_excludes_queue_wait():
+    scheduler = UpstreamScheduler(max_concurrency=1)
+    caller = ResilientCaller("test", deadline=5, max_attempts=1)
+    release = threading.Event()
+    holder = occupy(scheduler, release)
+    threading.Timer(0.3, release.set).start()
+
+    assert caller.call(lambda deadline: scheduler.run(lambda: "ok", timeout=time_left(deadline))) == "ok"
+    holder.join()
+    assert len(caller._latencies) == 1 and caller._latencies[0] < 0.1
@@ -0,0 +1,35 @@
+from services.skills import SkillExtractor
+from utils.text_normalizer import text_normalizer
+
+extractor = SkillExtractor()
+
+def skills(text):
+    return extractor.extract_from_normalized(text_normalizer.normalize(text))
+
+def test_cpp():
+    assert skills("Wrote low-latency services in C++.") == ["c++"]
+
+def test_csharp():
+    assert skills("Built internal tools in C#, deployed on Azure") == ["c#", "microsoft azure"]
+
+def test_dotnet():
+    assert skills(".NET developer; migrated services to .NET Core") == [".net"]
+    assert skills("Backend work with ASP.NET and dotnet") == [".net"]
+
+def test_net_in_prose_is_not_dotnet():
+    assert skills("Grew net revenue; built a safety net") == []
+    assert skills("Cut costs by 10%. Net income rose") == []
+
+def test_ambiguous_alias_is_not_matched():
+    assert skills("Acted as the team's oracle for release dates") == []
+    assert skills("Administered Oracle Database clusters") == ["oracle database"]
+
+def test_ordinary_words_are_not_skills():
+    text = "I react calmly under pressure, drink Ruby red wine, handle sales and security, and stay swift"
+    assert skills(text) == []
+    assert skills("Rust on the railings; excel at planning; took the helm") == []
+
+def test_qualified_forms_of_ambiguous_skills():
+    assert skills("Built dashboards with React.js and SwiftUI") == ["react", "swift"]
+    assert skills("Ruby developer; led enterprise sales and network security") == ["ruby", "sales", "security"]
+    assert skills("Maintained Helm charts for React Native apps") == ["helm", "react native"]
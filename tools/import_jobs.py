@@ -0,0 +1,58 @@
+# tools/import_jobs.py
+"""
+Import job postings from CSV or JSONL feeds into job_postings, with their
+embeddings precomputed.
+
+CSV files need a header row; JSONL files hold one object per line. Column or
+key names are matched case-insensitively (company/company_name/employer,
+job_title/title/position, job_description/description). Postings already
+imported, by content hash, are skipped, so re-running a feed is cheap.
+
+    python -m tools.import_jobs feeds/jobs-2024-06.csv feeds/extra.jsonl
+
+The database schema must exist (start the app once).
+"""
+import argparse
+import json
+import logging
+import sqlite3
+import sys
+
+from services.job_import import JobFeedImporter, feed_format
+from services.keywords import KeywordEngine
+from services.resume_matching import ResumeMatchingService
+
+logger = logging.getLogger(__name__)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("feeds", nargs="+", help="CSV or JSONL feed files")
+    parser.add_argument("--format", choices=("csv", "jsonl"), help="Feed format (default: from the file extension)")
+    parser.add_argument("--batch-size", type=int, help="Postings per embedding batch and transaction")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    matcher = ResumeMatchingService()
+    importer = JobFeedImporter(matcher.embedding_service, prepare=matcher.truncate_text,
+                               keyword_engine=KeywordEngine(), batch_size=args.batch_size)
+
+    results = {}
+    for path in args.feeds:
+        fmt = args.format or feed_format(path)
+        if fmt is None:
+            parser.error(f"Cannot tell the format of {path}; pass --format")
+        try:
+            with open(path, "rb") as stream:
+                results[path] = importer.import_stream(stream, fmt, source=path)
+        except sqlite3.OperationalError as e:
+            logger.error(f"Database not ready ({e}); start the app once to create the schema.")
+            sys.exit(1)
+        except RuntimeError as e:
+            logger.error(str(e))
+            sys.exit(1)
+        logger.info("Imported %s: %s", path, results[path])
+
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
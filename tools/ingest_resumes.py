@@ -0,0 +1,229 @@
+# tools/ingest_resumes.py
+"""
+Bulk-ingest a directory of resumes (PDF/DOCX/TXT) into the resumes and
+resume_embeddings tables.
+
+Files are hashed and their text extracted with TextExtractor in a process
+pool; identical files are ingested once. Texts are embedded in upstream
+batches at BULK priority, so interactive traffic in the same process is never
+starved, and the upstream rate limits (UPSTREAM_REQUESTS_PER_MINUTE,
+UPSTREAM_TOKENS_PER_MINUTE) apply. Each batch is written in one transaction
+together with its checkpoint rows, so an interrupted run picks up where it
+stopped when started again.
+
+    python -m tools.ingest_resumes /data/resumes --workers 4 --batch-size 32
+
+The database schema must exist (start the app once).
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import sqlite3
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from database.models import get_ingested_files, add_ingested_resumes
+from services.resume_matching import ResumeMatchingService
+from services.scheduler import upstream_scheduler, Priority
+from utils.utils import FileHandler, TextExtractor
+
+logger = logging.getLogger(__name__)
+
+def _init_worker():
+    # Each worker is already one process per file; keep PDF and OCR work inside it
+    from utils.pdf_extraction import pdf_extractor
+    from utils.ocr import ocr_pipeline
+    pdf_extractor.workers = 1
+    ocr_pipeline.workers = 1
+    logging.getLogger().setLevel(logging.WARNING)
+
+def _hash_file(path: str):
+    start = time.perf_counter()
+    try:
+        return path, FileHandler.get_file_hash(path), os.path.getsize(path), None, time.perf_counter() - start
+    except Exception as e:
+        return path, None, 0, str(e), time.perf_counter() - start
+
+def _extract_file(path: str):
+    start = time.perf_counter()
+    try:
+        return path, TextExtractor().extract_raw_text(path), None, time.perf_counter() - start
+    except Exception as e:
+        return path, None, str(e), time.perf_counter() - start
+
+def find_files(root: str):
+    """Resume files under `root`, in a stable order."""
+    for directory, subdirectories, filenames in os.walk(root):
+        subdirectories.sort()
+        for filename in sorted(filenames):
+            if os.path.splitext(filename)[1].lower() in FileHandler.ALLOWED_EXTENSIONS:
+                yield os.path.join(directory, filename)
+
+class StageStats:
+    """Items processed and busy time per pipeline stage."""
+
+    def __init__(self, *stages):
+        self.stages = {stage: {"items": 0, "bytes": 0, "seconds": 0.0} for stage in stages}
+
+    def add(self, stage: str, items: int, seconds: float, size: int = 0):
+        self.stages[stage]["items"] += items
+        self.stages[stage]["bytes"] += size
+        self.stages[stage]["seconds"] += seconds
+
+    def report(self) -> dict:
+        report = {}
+        for stage, stats in self.stages.items():
+            seconds = stats["seconds"]
+            report[stage] = {
+                "items": stats["items"],
+                "busy_seconds": round(seconds, 3),
+                "items_per_second": round(stats["items"] / seconds, 1) if seconds else None,
+            }
+            if stats["bytes"]:
+                report[stage]["mb_per_second"] = round(stats["bytes"] / (1024 * 1024) / seconds, 2) if seconds else None
+        return report
+
+class ResumeIngester:
+    def __init__(self, root: str, workers: int = 4, batch_size: int = 32, retry_failed: bool = False,
+                 limit: int = None):
+        self.root = root
+        self.workers = workers
+        self.batch_size = batch_size
+        self.retry_failed = retry_failed
+        self.limit = limit
+        self.matcher = ResumeMatchingService()
+        # Extraction and hashing busy time is summed over worker processes
+        self.stats = StageStats("hash", "extract", "embed", "write")
+        self.counts = {"found": 0, "already_ingested": 0, "duplicates": 0, "ingested": 0, "failed": 0}
+
+    def _flush(self, batch, failures):
+        """Embed a batch and write it with its checkpoint rows in one transaction."""
+        if batch:
+            start = time.perf_counter()
+            with upstream_scheduler.context(Priority.BULK, "bulk-ingest"):
+                embeddings = self.matcher.embedding_service.get_embeddings(
+                    [self.matcher.truncate_text(text) for _, _, text in batch]
+                )
+            self.stats.add("embed", len(batch), time.perf_counter() - start)
+            if embeddings is None:
+                # Nothing in this batch is checkpointed, so the next run retries it
+                raise RuntimeError("Embedding request failed; stopping. Run again to resume.")
+            vectors = embeddings.detach().cpu().numpy().astype(np.float32)
+        else:
+            vectors = []
+
+        rows = [
+            (file_hash, path, os.path.splitext(os.path.basename(path))[0], text, vector.tobytes())
+            for (file_hash, path, text), vector in zip(batch, vectors)
+        ]
+        start = time.perf_counter()
+        add_ingested_resumes(rows, failures)
+        self.stats.add("write", len(rows) + len(failures), time.perf_counter() - start)
+        self.counts["ingested"] += len(rows)
+        self.counts["failed"] += len(failures)
+
+    def run(self) -> dict:
+        started = time.perf_counter()
+        known = get_ingested_files()
+        skip_statuses = {"done"} if self.retry_failed else {"done", "failed"}
+        paths = list(find_files(self.root))
+        if self.limit:
+            paths = paths[:self.limit]
+        self.counts["found"] = len(paths)
+        logger.info("Found %d resume files under %s", len(paths), self.root)
+
+        # Spawned workers avoid forking a process that is already running threads
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=_init_worker) as executor:
+            # Hash everything first so duplicates and already-ingested files are never extracted
+            pending = []
+            seen = set()
+            for path, file_hash, size, error, seconds in executor.map(_hash_file, paths, chunksize=32):
+                self.stats.add("hash", 1, seconds, size)
+                if error:
+                    logger.warning("Could not read %s: %s", path, error)
+                    continue
+                if known.get(file_hash) in skip_statuses:
+                    self.counts["already_ingested"] += 1
+                elif file_hash in seen:
+                    self.counts["duplicates"] += 1
+                else:
+                    seen.add(file_hash)
+                    pending.append((path, file_hash))
+            logger.info("%d new files to ingest (%d already ingested, %d duplicates)",
+                        len(pending), self.counts["already_ingested"], self.counts["duplicates"])
+
+            # Extraction keeps a bounded number of files in flight while batches are embedded and written
+            in_flight = deque()
+            batch, failures = [], []
+            queue = iter(pending)
+            while True:
+                while len(in_flight) < self.workers * 4:
+                    item = next(queue, None)
+                    if item is None:
+                        break
+                    path, file_hash = item
+                    in_flight.append((file_hash, executor.submit(_extract_file, path)))
+                if not in_flight:
+                    break
+
+                file_hash, future = in_flight.popleft()
+                path, text, error, seconds = future.result()
+                self.stats.add("extract", 1, seconds)
+                if error or not (text or "").strip():
+                    failures.append((file_hash, path, error or "No text could be extracted."))
+                else:
+                    batch.append((file_hash, path, text))
+
+                if len(batch) >= self.batch_size or len(failures) >= self.batch_size:
+                    self._flush(batch, failures)
+                    batch, failures = [], []
+                    done = self.counts["ingested"] + self.counts["failed"]
+                    elapsed = time.perf_counter() - started
+                    logger.info("Ingested %d/%d files (%.1f files/s)", done, len(pending), done / elapsed)
+
+            if batch or failures:
+                self._flush(batch, failures)
+
+        elapsed = time.perf_counter() - started
+        return {
+            **self.counts,
+            "wall_seconds": round(elapsed, 3),
+            "files_per_second": round((self.counts["ingested"] + self.counts["failed"]) / elapsed, 1) if elapsed else None,
+            "stages": self.stats.report(),
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("directory", help="Directory to scan for resume files")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="Extraction processes")
+    parser.add_argument("--batch-size", type=int, default=32, help="Resumes per embedding batch and transaction")
+    parser.add_argument("--retry-failed", action="store_true", help="Retry files that failed in earlier runs")
+    parser.add_argument("--limit", type=int, help="Only consider the first N files found")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if not os.path.isdir(args.directory):
+        parser.error(f"{args.directory} is not a directory")
+
+    ingester = ResumeIngester(args.directory, workers=args.workers, batch_size=args.batch_size,
+                              retry_failed=args.retry_failed, limit=args.limit)
+    try:
+        results = ingester.run()
+    except sqlite3.OperationalError as e:
+        logger.error(f"Database not ready ({e}); start the app once to create the schema.")
+        sys.exit(1)
+    except RuntimeError as e:
+        logger.error(str(e))
+        print(json.dumps({**ingester.counts, "stages": ingester.stats.report()}, indent=2))
+        sys.exit(1)
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
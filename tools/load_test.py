@@ -0,0 +1,394 @@
+# tools/load_test.py
+"""
+Load generator for a running Career Launchpad instance.
+
+Replays a weighted mix of scenarios and reports latency percentiles
+(p50/p95/p99), throughput and error rate per endpoint, plus per-stage server
+time from the Server-Timing header (extract, score, feedback, store, chat, ...).
+
+Scenarios:
+    submit_pdf     submit an application with a PDF resume upload
+    submit_docx    submit an application with a DOCX resume upload
+    submit_text    submit an application with pasted resume text
+    conversation   submit_text, the auto-initiated opening chat, then --chat-turns questions
+
+With --rate, scenarios start as an open-loop arrival process (Poisson by
+default) and run on up to --concurrency workers; arrivals that cannot start
+immediately queue, and the queueing delay is reported as start_lag. Without
+--rate, --concurrency workers run scenarios back to back (closed loop).
+
+Uploads are drawn from --variants distinct generated resumes per format, so
+the extraction cache only hits once variants repeat.
+
+    python -m tools.load_test --base-url http://127.0.0.1:5000 --rate 2 --concurrency 16 --duration 60
+
+--launch starts tools/upstream_stub.py and the app on a temporary database
+first, so capacity can be measured without an API key:
+
+    python -m tools.load_test --launch --stub-latency lognormal:150,0.5 --rate 5 --duration 60
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from benchmarks import fixtures
+
+logger = logging.getLogger(__name__)
+
+# What static/script.js sends right after a submission; the server pre-generates its reply
+OPENING_QUERY = "Can you provide feedback on my resume?"
+
+FOLLOW_UP_QUERIES = [
+    "Which skills should I add to my resume for this role?",
+    "How can I rewrite my summary to fit this job?",
+    "What experience should I highlight in the interview?",
+    "Is my resume too long for this position?",
+]
+
+DEFAULT_MIX = "submit_pdf=3,submit_docx=3,submit_text=1,conversation=3"
+
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+def parse_mix(spec: str) -> dict:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in LoadTest.SCENARIOS:
+            raise ValueError(f"Unknown scenario {name!r}; choose from {', '.join(LoadTest.SCENARIOS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+def parse_server_timing(header: str) -> dict:
+    """{"extract": 0.0124, ...} in seconds, from `extract;dur=12.4, total;dur=95.0`."""
+    stages = {}
+    for entry in (header or "").split(","):
+        name, *params = [part.strip() for part in entry.split(";")]
+        for param in params:
+            key, _, value = param.partition("=")
+            if name and key == "dur":
+                try:
+                    stages[name] = float(value) / 1000.0
+                except ValueError:
+                    pass
+    return stages
+
+def percentile(values, fraction: float) -> float:
+    """Nearest-rank percentile of a sorted list."""
+    return values[max(0, math.ceil(fraction * len(values)) - 1)]
+
+def summarize(seconds) -> dict:
+    ordered = sorted(seconds)
+    if not ordered:
+        return {}
+    return {
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 1),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 1),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 1),
+        "max_ms": round(ordered[-1] * 1000, 1),
+    }
+
+class Fixtures:
+    """Pre-generated resume uploads and job descriptions, `variants` of each, so request building costs nothing."""
+
+    def __init__(self, variants: int, size: str):
+        roles = fixtures.SIZES[size]
+        self.files = {"pdf": [], "docx": [], "txt": []}
+        self.job_descriptions = [fixtures.job_description(seed=variant) for variant in range(variants)]
+        for variant in range(variants):
+            sections = fixtures.resume_sections(roles, seed=variant)
+            sections.append(("References", [f"Reference {variant}"]))
+            lines = [line for heading, body in sections for line in [heading, *body]]
+            self.files["pdf"].append(fixtures.build_pdf(lines))
+            self.files["docx"].append(fixtures.build_docx(sections))
+            self.files["txt"].append("\n".join(lines))
+
+    def pick(self, rng: random.Random, kind: str):
+        return rng.choice(self.files[kind]), rng.choice(self.job_descriptions)
+
+class LoadTest:
+    SCENARIOS = ("submit_pdf", "submit_docx", "submit_text", "conversation")
+
+    def __init__(self, base_url: str, mix: dict, fixture_set: Fixtures, chat_turns: int = 2,
+                 timeout: float = 120.0, seed: int = None):
+        self.base_url = base_url.rstrip("/")
+        self.mix = mix
+        self.fixtures = fixture_set
+        self.chat_turns = chat_turns
+        self.timeout = timeout
+        self.seed = seed
+        self.records = []  # (endpoint, status, seconds, error, stages)
+        self.start_lags = []
+        self.scenarios_run = defaultdict(int)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _rng(self) -> random.Random:
+        if not hasattr(self._local, "rng"):
+            seed = None if self.seed is None else f"{self.seed}-{threading.get_ident()}"
+            self._local.rng = random.Random(seed)
+        return self._local.rng
+
+    def _request(self, http: requests.Session, endpoint: str, method: str, path: str, **kwargs):
+        start = time.perf_counter()
+        status, error, stages, body = None, None, {}, None
+        try:
+            response = http.request(method, self.base_url + path, timeout=self.timeout, **kwargs)
+            status = response.status_code
+            stages = parse_server_timing(response.headers.get("Server-Timing"))
+            if status >= 400:
+                error = f"HTTP {status}"
+            else:
+                body = response.json()
+        except requests.RequestException as e:
+            error = type(e).__name__
+        except ValueError:
+            error = "invalid JSON"
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.records.append((endpoint, status, elapsed, error, stages))
+        return body
+
+    def _submit(self, http: requests.Session, kind: str):
+        data, job_description = self.fixtures.pick(self._rng(), kind)
+        form = {"company": "Load Test Inc", "job_title": "Software Engineer", "job_description": job_description}
+        if kind == "txt":
+            return self._request(http, "submit_application[text]", "POST", "/submit_application",
+                                 data={**form, "resume_text": data})
+        mime = "application/pdf" if kind == "pdf" else DOCX_MIME
+        return self._request(http, f"submit_application[{kind}]", "POST", "/submit_application",
+                             data=form, files={"resume_file": (f"resume.{kind}", data, mime)})
+
+    def run_scenario(self, name: str):
+        with requests.Session() as http:
+            if name == "submit_pdf":
+                self._submit(http, "pdf")
+            elif name == "submit_docx":
+                self._submit(http, "docx")
+            elif name == "submit_text":
+                self._submit(http, "txt")
+            else:
+                if self._submit(http, "txt") is not None:
+                    self._request(http, "chat[opening]", "POST", "/chat",
+                                  json={"query": OPENING_QUERY, "auto_initiated": True})
+                    for _ in range(self.chat_turns):
+                        self._request(http, "chat", "POST", "/chat",
+                                      json={"query": self._rng().choice(FOLLOW_UP_QUERIES)})
+        with self._lock:
+            self.scenarios_run[name] += 1
+
+    def _choose(self, rng: random.Random) -> str:
+        return rng.choices(list(self.mix), weights=list(self.mix.values()))[0]
+
+    def _scheduled(self, name: str, scheduled: float):
+        lag = time.perf_counter() - scheduled
+        with self._lock:
+            self.start_lags.append(lag)
+        self.run_scenario(name)
+
+    def run_open_loop(self, rate: float, concurrency: int, duration: float, arrivals: str) -> dict:
+        rng = random.Random(self.seed)
+        executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="load")
+        futures = []
+        started = time.perf_counter()
+        next_arrival = started
+        while next_arrival < started + duration:
+            delay = next_arrival - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            futures.append(executor.submit(self._scheduled, self._choose(rng), next_arrival))
+            next_arrival += rng.expovariate(rate) if arrivals == "poisson" else 1.0 / rate
+        # Arrivals still queued at the end never started; count them rather than let them run late
+        executor.shutdown(wait=True, cancel_futures=True)
+        return {"offered": len(futures), "not_started": sum(future.cancelled() for future in futures),
+                "wall_seconds": time.perf_counter() - started}
+
+    def run_closed_loop(self, concurrency: int, duration: float) -> dict:
+        started = time.perf_counter()
+        deadline = started + duration
+
+        def worker(index: int):
+            rng = random.Random(None if self.seed is None else f"{self.seed}-worker-{index}")
+            while time.perf_counter() < deadline:
+                self.run_scenario(self._choose(rng))
+
+        threads = [threading.Thread(target=worker, args=(index,), daemon=True) for index in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return {"wall_seconds": time.perf_counter() - started}
+
+    def report(self, run: dict) -> dict:
+        wall = run.pop("wall_seconds")
+        endpoints = defaultdict(list)
+        stages = defaultdict(list)
+        statuses = defaultdict(lambda: defaultdict(int))
+        for endpoint, status, seconds, error, timings in self.records:
+            endpoints[endpoint].append((seconds, error))
+            statuses[endpoint][str(status) if status is not None else "no response"] += 1
+            for stage, stage_seconds in timings.items():
+                stages[f"{endpoint}.{stage}"].append(stage_seconds)
+
+        per_endpoint = {}
+        for endpoint, samples in sorted(endpoints.items()):
+            errors = sum(1 for _, error in samples if error)
+            per_endpoint[endpoint] = {
+                "requests": len(samples),
+                "errors": errors,
+                "error_rate": round(errors / len(samples), 4),
+                "throughput_rps": round(len(samples) / wall, 2),
+                # Latency of successful requests only; failures are often fast and would flatter the percentiles
+                **summarize([seconds for seconds, error in samples if not error]),
+                "statuses": dict(statuses[endpoint]),
+            }
+
+        total = len(self.records)
+        failed = sum(1 for record in self.records if record[3])
+        report = {
+            "wall_seconds": round(wall, 2),
+            "scenarios": dict(self.scenarios_run),
+            **run,
+            "requests": total,
+            "error_rate": round(failed / total, 4) if total else None,
+            "throughput_rps": round(total / wall, 2) if wall else None,
+            "endpoints": per_endpoint,
+            "stages": {stage: {"samples": len(values), **summarize(values)} for stage, values in sorted(stages.items())},
+        }
+        if self.start_lags:
+            report["start_lag"] = summarize(self.start_lags)
+        return report
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def _wait_until_up(url: str, process: subprocess.Popen, log_path: str, timeout: float = 180.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            break
+        try:
+            requests.get(url, timeout=2)
+            return
+        except requests.RequestException:
+            time.sleep(0.5)
+    with open(log_path, errors="replace") as f:
+        tail = f.read()[-3000:]
+    raise RuntimeError(f"{url} did not come up; last output:\n{tail}")
+
+class LocalStack:
+    """The upstream stub and the app in subprocesses, on a temporary database, for --launch."""
+
+    def __init__(self, stub_args: list):
+        self.stub_args = stub_args
+        self.workdir = tempfile.TemporaryDirectory(prefix="load-test-")
+        self.processes = []
+
+    def _start(self, args: list, env: dict, name: str, ready_url: str):
+        log_path = os.path.join(self.workdir.name, f"{name}.log")
+        log = open(log_path, "wb")
+        process = subprocess.Popen(args, env=env, stdout=log, stderr=subprocess.STDOUT,
+                                   cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        log.close()
+        self.processes.append(process)
+        _wait_until_up(ready_url, process, log_path)
+
+    def __enter__(self) -> str:
+        stub_port, app_port = _free_port(), _free_port()
+        env = {**os.environ, "PYTHONUNBUFFERED": "1"}
+        self.stub_url = f"http://127.0.0.1:{stub_port}"
+        self._start([sys.executable, "-m", "tools.upstream_stub", "--port", str(stub_port), *self.stub_args],
+                    env, "stub", self.stub_url + "/v1/models")
+
+        app_env = {**env, "NVIDIA_BASE_URL": self.stub_url + "/v1", "NVIDIA_API_KEY": "load-test",
+                   "NVIDIA_API_KEY_NEW": "load-test", "DB_PATH": os.path.join(self.workdir.name, "load_test.db")}
+        app_url = f"http://127.0.0.1:{app_port}"
+        self._start([sys.executable, "-m", "flask", "--app", "app", "run", "--port", str(app_port),
+                     "--no-reload", "--with-threads"], app_env, "app", app_url + "/")
+        return app_url
+
+    def stub_stats(self) -> dict:
+        try:
+            return requests.get(self.stub_url + "/stats", timeout=5).json()
+        except requests.RequestException:
+            return {}
+
+    def __exit__(self, *exc):
+        for process in reversed(self.processes):
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        self.workdir.cleanup()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:5000", help="App to load (ignored with --launch)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Scenario weights, e.g. submit_pdf=3,conversation=1")
+    parser.add_argument("--rate", type=float, default=0, help="Scenario arrivals per second (0 = closed loop)")
+    parser.add_argument("--arrivals", choices=["poisson", "uniform"], default="poisson")
+    parser.add_argument("--concurrency", type=int, default=8, help="Scenarios in flight at most")
+    parser.add_argument("--duration", type=float, default=60, help="Seconds to generate load for")
+    parser.add_argument("--chat-turns", type=int, default=2, help="Follow-up questions per conversation")
+    parser.add_argument("--resume-size", choices=sorted(fixtures.SIZES), default="medium")
+    parser.add_argument("--variants", type=int, default=50, help="Distinct resumes per format")
+    parser.add_argument("--timeout", type=float, default=120, help="Per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, help="Seed for arrivals and scenario choice")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    parser.add_argument("--launch", action="store_true", help="Start the upstream stub and the app locally first")
+    parser.add_argument("--stub-latency", default="lognormal:150,0.5", help="Stub latency spec with --launch")
+    parser.add_argument("--stub-args", default="", help="Extra tools.upstream_stub arguments with --launch")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    logger.info("Generating %d fixture variants per format", args.variants)
+    fixture_set = Fixtures(args.variants, args.resume_size)
+
+    def run(base_url: str) -> dict:
+        test = LoadTest(base_url, mix, fixture_set, chat_turns=args.chat_turns, timeout=args.timeout, seed=args.seed)
+        logger.info("Loading %s for %.0fs (%s)", base_url, args.duration,
+                    f"{args.rate}/s open loop" if args.rate else f"{args.concurrency} workers closed loop")
+        if args.rate:
+            result = test.run_open_loop(args.rate, args.concurrency, args.duration, args.arrivals)
+        else:
+            result = test.run_closed_loop(args.concurrency, args.duration)
+        return test.report(result)
+
+    if args.launch:
+        stack = LocalStack(["--latency", args.stub_latency, *args.stub_args.split()])
+        with stack as base_url:
+            report = run(base_url)
+            report["upstream_stub"] = stack.stub_stats()
+    else:
+        report = run(args.base_url)
+
+    report["config"] = {key: value for key, value in vars(args).items() if key != "output"}
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    print(output)
+
+if __name__ == "__main__":
+    main()
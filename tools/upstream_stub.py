@@ -0,0 +1,285 @@
+# tools/upstream_stub.py
+"""
+Local stand-in for the NVIDIA OpenAI-compatible API, for offline development,
+benchmarks and load tests.
+
+Serves /v1/embeddings and /v1/chat/completions (including SSE streaming) with
+the deterministic vectors and replies of benchmarks.stub_upstream, so the same
+input always gets the same answer. Latency, injected errors and rate limits
+are configurable; point the app at it with NVIDIA_BASE_URL:
+
+    python -m tools.upstream_stub --port 8001 --latency lognormal:150,0.5 --error-rate 0.02
+    NVIDIA_BASE_URL=http://127.0.0.1:8001/v1 NVIDIA_API_KEY=x NVIDIA_API_KEY_NEW=x python app.py
+
+Latency specs (milliseconds): fixed:MS, uniform:LOW,HIGH, normal:MEAN,SD,
+lognormal:MEDIAN,SIGMA, exponential:MEAN. Embedding calls add --per-input-ms
+per input; streamed replies add --token-ms between chunks. Requests over the
+--rpm / --tpm budgets get 429 with Retry-After, as the real API does.
+"""
+import argparse
+import base64
+import json
+import logging
+import math
+import random
+import threading
+import time
+import uuid
+
+import numpy as np
+from flask import Flask, Response, jsonify, request
+
+from benchmarks.stub_upstream import deterministic_embedding, deterministic_reply
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODELS = ["nvidia/nv-embedqa-e5-v5", "nvidia/llama-3.1-nemotron-70b-instruct"]
+
+ERROR_MESSAGES = {
+    429: ("rate_limit_exceeded", "Too many requests."),
+    500: ("server_error", "Internal server error."),
+    502: ("bad_gateway", "Bad gateway."),
+    503: ("service_unavailable", "The model is overloaded; try again later."),
+    504: ("timeout", "Upstream model timed out."),
+}
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+class LatencyModel:
+    """Samples a delay in seconds from a spec such as "lognormal:150,0.5" (milliseconds)."""
+
+    KINDS = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2, "exponential": 1}
+
+    def __init__(self, spec: str = "fixed:0"):
+        kind, _, params = spec.partition(":")
+        try:
+            values = [float(value) for value in params.split(",")] if params else []
+        except ValueError:
+            raise ValueError(f"Invalid latency parameters in {spec!r}")
+        if kind not in self.KINDS or len(values) != self.KINDS[kind]:
+            raise ValueError(f"Invalid latency spec {spec!r}; expected one of fixed:MS, uniform:LOW,HIGH, "
+                             "normal:MEAN,SD, lognormal:MEDIAN,SIGMA, exponential:MEAN")
+        self.spec = spec
+        self.kind = kind
+        self.values = values
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "fixed":
+            ms = self.values[0]
+        elif self.kind == "uniform":
+            ms = rng.uniform(*self.values)
+        elif self.kind == "normal":
+            ms = rng.gauss(*self.values)
+        elif self.kind == "lognormal":
+            ms = self.values[0] * math.exp(rng.gauss(0.0, self.values[1]))
+        else:
+            ms = rng.expovariate(1.0 / self.values[0]) if self.values[0] > 0 else 0.0
+        return max(0.0, ms) / 1000.0
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute token buckets (0 disables one)."""
+
+    def __init__(self, requests_per_minute: float = 0, tokens_per_minute: float = 0):
+        self.limits = {"requests": requests_per_minute, "tokens": tokens_per_minute}
+        self.levels = dict(self.limits)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int) -> float:
+        """Take one request and `tokens` from the buckets; returns 0, or the seconds to wait if over budget."""
+        costs = {"requests": 1, "tokens": tokens}
+        with self._lock:
+            now = time.monotonic()
+            elapsed, self.updated = now - self.updated, now
+            wait = 0.0
+            for name, limit in self.limits.items():
+                if limit <= 0:
+                    continue
+                self.levels[name] = min(limit, self.levels[name] + elapsed * limit / 60.0)
+                # A single request larger than the whole budget can only ever wait for a full bucket
+                needed = min(costs[name], limit)
+                if self.levels[name] < needed:
+                    wait = max(wait, (needed - self.levels[name]) * 60.0 / limit)
+            if wait:
+                return wait
+            for name, limit in self.limits.items():
+                if limit > 0:
+                    self.levels[name] -= min(costs[name], limit)
+            return 0.0
+
+class UpstreamStub:
+    def __init__(self, dim: int = 1024, latency: str = "fixed:0", per_input_ms: float = 0.0, token_ms: float = 0.0,
+                 error_rate: float = 0.0, error_statuses=(503,), requests_per_minute: float = 0,
+                 tokens_per_minute: float = 0, seed: int = None):
+        self.dim = dim
+        self.latency = LatencyModel(latency)
+        self.per_input = per_input_ms / 1000.0
+        self.token_delay = token_ms / 1000.0
+        self.error_rate = error_rate
+        self.error_statuses = list(error_statuses)
+        self.rate_limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        self.models = set(DEFAULT_MODELS)
+        self.stats = {"embeddings": 0, "chat": 0, "chat_streams": 0, "injected_errors": 0, "rate_limited": 0,
+                      "bad_requests": 0}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _draw(self):
+        """Latency and whether to inject an error for one request, from the seeded generator."""
+        with self._lock:
+            delay = self.latency.sample(self._rng)
+            status = self._rng.choice(self.error_statuses) if self._rng.random() < self.error_rate else None
+        return delay, status
+
+    @staticmethod
+    def error(status: int, message: str = None, retry_after: float = None):
+        code, default = ERROR_MESSAGES.get(status, ("invalid_request_error", "Invalid request."))
+        response = jsonify({"error": {"message": message or default, "type": code, "code": status}})
+        response.status_code = status
+        if retry_after is not None:
+            response.headers["Retry-After"] = str(max(1, math.ceil(retry_after)))
+        return response
+
+    def _admit(self, tokens: int):
+        """Apply rate limits and error injection; returns (error response or None, latency to add)."""
+        wait = self.rate_limiter.acquire(tokens)
+        if wait:
+            self._count("rate_limited")
+            return self.error(429, retry_after=wait), 0.0
+        delay, status = self._draw()
+        if status is not None:
+            self._count("injected_errors")
+            time.sleep(delay)
+            return self.error(status, retry_after=1 if status in (429, 503) else None), 0.0
+        return None, delay
+
+    def embeddings(self):
+        body = request.get_json(silent=True) or {}
+        texts = body.get("input")
+        if isinstance(texts, str):
+            texts = [texts]
+        if not texts or not all(isinstance(text, str) for text in texts):
+            self._count("bad_requests")
+            return self.error(400, "'input' must be a string or a list of strings.")
+        model = body.get("model") or DEFAULT_MODELS[0]
+        self.models.add(model)
+
+        tokens = sum(estimate_tokens(text) for text in texts)
+        error, delay = self._admit(tokens)
+        if error is not None:
+            return error
+        self._count("embeddings")
+        time.sleep(delay + self.per_input * len(texts))
+
+        data = []
+        for index, text in enumerate(texts):
+            vector = deterministic_embedding(text, self.dim)
+            if body.get("encoding_format") == "base64":
+                # The OpenAI client asks for base64 float32 unless told otherwise
+                vector = base64.b64encode(np.asarray(vector, dtype=np.float32).tobytes()).decode("ascii")
+            data.append({"object": "embedding", "index": index, "embedding": vector})
+        return jsonify({"object": "list", "data": data, "model": model,
+                        "usage": {"prompt_tokens": tokens, "total_tokens": tokens}})
+
+    def chat_completions(self):
+        body = request.get_json(silent=True) or {}
+        messages = body.get("messages")
+        if not isinstance(messages, list) or not messages:
+            self._count("bad_requests")
+            return self.error(400, "'messages' must be a non-empty list.")
+        model = body.get("model") or DEFAULT_MODELS[1]
+        self.models.add(model)
+
+        prompt_tokens = sum(estimate_tokens(str(message.get("content", ""))) for message in messages)
+        error, delay = self._admit(prompt_tokens + int(body.get("max_tokens") or 0))
+        if error is not None:
+            return error
+
+        content = deterministic_reply(messages)
+        if body.get("max_tokens"):
+            content = content[:int(body["max_tokens"]) * 4]
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": estimate_tokens(content),
+                 "total_tokens": prompt_tokens + estimate_tokens(content)}
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+
+        if not body.get("stream"):
+            self._count("chat")
+            time.sleep(delay)
+            return jsonify({
+                "id": completion_id, "object": "chat.completion", "created": created, "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                             "finish_reason": "stop"}],
+                "usage": usage,
+            })
+
+        self._count("chat_streams")
+        include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+
+        def chunk(delta: dict, finish_reason=None) -> str:
+            payload = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                       "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+            return f"data: {json.dumps(payload)}\n\n"
+
+        def stream():
+            # The sampled latency is the time to first token
+            time.sleep(delay)
+            yield chunk({"role": "assistant", "content": ""})
+            for piece in content.split(" "):
+                yield chunk({"content": piece + " "})
+                if self.token_delay:
+                    time.sleep(self.token_delay)
+            yield chunk({}, finish_reason="stop")
+            if include_usage:
+                yield "data: " + json.dumps({"id": completion_id, "object": "chat.completion.chunk",
+                                             "created": created, "model": model, "choices": [],
+                                             "usage": usage}) + "\n\n"
+            yield "data: [DONE]\n\n"
+
+        return Response(stream(), mimetype="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+    def create_app(self) -> Flask:
+        app = Flask(__name__)
+        app.add_url_rule("/v1/embeddings", "embeddings", self.embeddings, methods=["POST"])
+        app.add_url_rule("/v1/chat/completions", "chat_completions", self.chat_completions, methods=["POST"])
+        app.add_url_rule("/v1/models", "models", lambda: jsonify({
+            "object": "list",
+            "data": [{"id": model, "object": "model", "owned_by": "stub"} for model in sorted(self.models)]
+        }))
+        app.add_url_rule("/stats", "stats", lambda: jsonify(self.stats))
+        return app
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--dim", type=int, default=1024, help="Embedding dimensions")
+    parser.add_argument("--latency", default="fixed:0", help="Per-request latency distribution (see above)")
+    parser.add_argument("--per-input-ms", type=float, default=0.0, help="Extra latency per embedding input")
+    parser.add_argument("--token-ms", type=float, default=0.0, help="Delay between streamed chunks")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail")
+    parser.add_argument("--error-statuses", type=int, nargs="+", default=[503],
+                        help="HTTP statuses injected failures are drawn from")
+    parser.add_argument("--rpm", type=float, default=0, help="Requests per minute before 429s (0 = unlimited)")
+    parser.add_argument("--tpm", type=float, default=0, help="Tokens per minute before 429s (0 = unlimited)")
+    parser.add_argument("--seed", type=int, help="Seed for latency and error sampling")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    try:
+        stub = UpstreamStub(dim=args.dim, latency=args.latency, per_input_ms=args.per_input_ms,
+                            token_ms=args.token_ms, error_rate=args.error_rate, error_statuses=args.error_statuses,
+                            requests_per_minute=args.rpm, tokens_per_minute=args.tpm, seed=args.seed)
+    except ValueError as e:
+        parser.error(str(e))
+    logger.info("Serving stub upstream on http://%s:%d/v1 (latency %s, error rate %.3f)",
+                args.host, args.port, args.latency, args.error_rate)
+    stub.create_app().run(host=args.host, port=args.port, threaded=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+# docx_extraction.py
+import logging
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import BinaryIO, Iterator, List, Union
+
+logger = logging.getLogger(__name__)
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+
+# Subtrees without document text: VML fallback copies of text boxes and
+# paragraph properties (whose w:tab elements are tab-stop definitions)
+SKIPPED = {MC_FALLBACK, W + "pPr"}
+
+# Uncompressed size cap per XML part, so a zip bomb cannot exhaust memory or time
+MAX_PART_BYTES = 64 * 1024 * 1024
+
+HEADER_PART = re.compile(r"^word/header\d*\.xml$")
+FOOTER_PART = re.compile(r"^word/footer\d*\.xml$")
+
+def _part_order(name: str) -> str:
+    # header1, header2, ..., header10 in numeric order
+    return re.sub(r"\d+", lambda match: match.group().zfill(4), name)
+
+class DocxExtractor:
+    """
+    Text of a .docx file, streamed out of the zip with an incremental XML parser.
+
+    Reads the header parts, `word/document.xml` and the footer parts in that
+    order without building an object model. Paragraphs become lines, table
+    cells in a row are tab-separated, and text boxes are included once (their
+    VML fallback copies are skipped), so content laid out in tables or boxes
+    is not lost.
+    """
+
+    def parts(self, archive: zipfile.ZipFile) -> List[str]:
+        names = archive.namelist()
+        headers = sorted((name for name in names if HEADER_PART.match(name)), key=_part_order)
+        footers = sorted((name for name in names if FOOTER_PART.match(name)), key=_part_order)
+        return headers + ["word/document.xml"] + footers
+
+    def _iter_text(self, stream) -> Iterator[str]:
+        """Text fragments of one WordprocessingML part, in document order."""
+        skip_depth = 0  # > 0 while inside a SKIPPED subtree
+        cell_depth = 0  # > 0 while inside a table cell
+        run_depth = 0  # > 0 while inside a run
+        for event, elem in ET.iterparse(stream, events=("start", "end")):
+            tag = elem.tag
+            if event == "start":
+                if tag in SKIPPED:
+                    skip_depth += 1
+                elif skip_depth:
+                    pass
+                elif tag == W + "tc":
+                    cell_depth += 1
+                elif tag == W + "r":
+                    run_depth += 1
+                continue
+
+            if tag in SKIPPED:
+                skip_depth -= 1
+            elif skip_depth:
+                pass
+            elif tag == W + "t":
+                if elem.text:
+                    yield elem.text
+            elif tag == W + "tab" and run_depth:
+                yield "\t"
+            elif tag in (W + "br", W + "cr") and run_depth:
+                yield "\n"
+            elif tag == W + "r":
+                run_depth -= 1
+            elif tag == W + "p":
+                # Paragraphs inside a cell stay on the row's line
+                yield " " if cell_depth else "\n"
+            elif tag == W + "tc":
+                cell_depth -= 1
+                yield "\t"
+            elif tag == W + "tr":
+                yield "\n"
+
+            # Runs, paragraphs and rows are the big repeated elements; drop them once read
+            if tag in (W + "r", W + "p", W + "tr"):
+                elem.clear()
+
+    def extract(self, source: Union[str, BinaryIO]) -> str:
+        """Extract the text of a .docx file given as a path or a seekable file-like object."""
+        if hasattr(source, "seek"):
+            source.seek(0)
+        with zipfile.ZipFile(source) as archive:
+            members = set(archive.namelist())
+            if "word/document.xml" not in members:
+                raise ValueError("Not a Word document: word/document.xml is missing.")
+
+            parts = []
+            for name in self.parts(archive):
+                if archive.getinfo(name).file_size > MAX_PART_BYTES:
+                    raise ValueError(f"{name} is larger than {MAX_PART_BYTES // (1024 * 1024)}MB uncompressed.")
+                with archive.open(name) as stream:
+                    parts.append("".join(self._iter_text(stream)))
+
+        text = "\n".join(parts)
+        # Tidy the separators emitted for cells and paragraphs
+        text = re.sub(r" +\t", "\t", text)
+        text = re.sub(r"[ \t]+\n", "\n", text)
+        text = re.sub(r"\n{3,}", "\n\n", text)
+        return text.strip()
+
+# Initialize global instance
+docx_extractor = DocxExtractor()
@@ -0,0 +1,90 @@
+# extraction_cache.py
+import hashlib
+import json
+import logging
+import threading
+from typing import Callable, Dict
+
+from config import Config
+from database.models import get_extracted_text, save_extracted_text, get_extracted_text_usage
+from utils.metrics import record_cache_lookup
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever extraction code changes in a way that alters its output
+EXTRACTOR_VERSION = "2"
+
+def extractor_version() -> str:
+    """EXTRACTOR_VERSION combined with the settings that shape extracted text."""
+    settings = [Config.PDF_MAX_PAGES, Config.PDF_MAX_CHARS, Config.OCR_DPI, Config.OCR_MAX_WIDTH,
+                Config.OCR_BINARIZE_THRESHOLD]
+    return f"{EXTRACTOR_VERSION}-{hashlib.sha256(json.dumps(settings).encode()).hexdigest()[:8]}"
+
+class PartialText(str):
+    """Extracted text known to be incomplete (e.g. OCR failed on some pages); returned but never cached."""
+    pass
+
+class ExtractionCache:
+    """
+    Extracted text of uploaded files, keyed by file hash and extractor version.
+
+    Entries live in SQLite so they survive restarts; the table is kept under
+    `max_bytes` of text by evicting the least recently used entries. A hit
+    skips parsing (and OCR) of the file entirely.
+    """
+
+    def __init__(self, max_bytes: int = None, version: str = None):
+        self.max_bytes = max_bytes or Config.EXTRACTION_CACHE_MAX_BYTES
+        self.version = version or extractor_version()
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0  # size of the source files whose parsing was skipped
+        self._lock = threading.Lock()
+
+    def get_or_extract(self, file_hash: str, extract: Callable[[], str], source_size: int = 0) -> str:
+        """Return the cached text for `file_hash`, or run `extract` and cache its result unless it is PartialText."""
+        try:
+            text = get_extracted_text(file_hash, self.version)
+        except Exception as e:
+            logger.error(f"Failed to read the extraction cache: {e}")
+            text = None
+
+        record_cache_lookup("extracted_text", text is not None)
+        if text is not None:
+            with self._lock:
+                self.hits += 1
+                self.bytes_saved += source_size
+            return text
+
+        with self._lock:
+            self.misses += 1
+        text = extract()
+        if isinstance(text, PartialText):
+            # Retried on the next upload instead of persisting the gaps
+            logger.warning("Not caching incomplete text extracted from %s", file_hash[:12])
+        elif text:
+            try:
+                save_extracted_text(file_hash, self.version, text, self.max_bytes)
+            except Exception as e:
+                logger.error(f"Failed to write the extraction cache: {e}")
+        return text
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {
+                "version": self.version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "bytes_saved": self.bytes_saved,
+                "max_bytes": self.max_bytes
+            }
+        try:
+            stats.update(get_extracted_text_usage())
+        except Exception as e:
+            logger.error(f"Failed to read extraction cache usage: {e}")
+        return stats
+
+# Initialize global instance
+extraction_cache = ExtractionCache()
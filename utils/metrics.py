@@ -0,0 +1,333 @@
+# metrics.py
+import atexit
+import bisect
+import glob
+import json
+import logging
+import math
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Sequence
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; spans fast database calls up to slow chat completions
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+class _Metric:
+    type = None
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            # Metrics without labels are reported (as zero) before anything is recorded
+            self._values = {} if self.labelnames else {(): self._initial()}
+
+    def _initial(self):
+        return 0.0
+
+    def _key(self, labels: Dict) -> tuple:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _copy(self, value):
+        return value
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            samples = [[list(key), self._copy(value)] for key, value in self._values.items()]
+        return {"type": self.type, "help": self.documentation, "labelnames": list(self.labelnames),
+                "samples": samples}
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+class Gauge(_Metric):
+    """
+    A value that goes up and down. Across processes, gauges of live processes
+    are combined with `mode` ("sum", "max" or "min").
+    """
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), mode: str = "sum"):
+        if mode not in ("sum", "max", "min"):
+            raise ValueError(f"Unknown gauge mode {mode!r}")
+        self.mode = mode
+        super().__init__(name, documentation, labelnames)
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def snapshot(self) -> Dict:
+        return {**super().snapshot(), "mode": self.mode}
+
+class Histogram(_Metric):
+    """Observations counted into fixed buckets, plus their sum and count."""
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(float(bound) for bound in buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _initial(self):
+        # Per-bucket (not cumulative) counts, the +Inf bucket last, then sum and count
+        return [0] * (len(self.buckets) + 1) + [0.0, 0]
+
+    def _copy(self, value):
+        return list(value)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = self._initial()
+            state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the wall time of the `with` block, whether or not it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self) -> Dict:
+        return {**super().snapshot(), "buckets": list(self.buckets)}
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _empty(families: Dict) -> bool:
+    """True while nothing has been recorded (every sample is still zero)."""
+    for family in families.values():
+        for _, value in family["samples"]:
+            if (value[-1] if family["type"] == "histogram" else value) != 0:
+                return False
+    return True
+
+def _labels(names, values, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class MetricsCollector:
+    """
+    Registry of counters, gauges and histograms, rendered in the Prometheus
+    text format for the /metrics endpoint.
+
+    Recording is a dict update under a per-metric lock. When several worker
+    processes serve the app, set METRICS_MULTIPROC_DIR to a directory they
+    share (emptied on deploy): each process writes a snapshot of its metrics
+    there every METRICS_SNAPSHOT_INTERVAL seconds and at exit, and rendering
+    merges all snapshots. Counters and histograms are summed, including those
+    of processes that have exited; gauges only count processes whose snapshot
+    is fresh.
+    """
+
+    def __init__(self, directory: str = None, snapshot_interval: float = None):
+        self.directory = Config.METRICS_MULTIPROC_DIR if directory is None else directory
+        self.snapshot_interval = snapshot_interval or Config.METRICS_SNAPSHOT_INTERVAL
+        self._metrics = {}
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._writer = None
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+        self._start_process()
+        if self.directory:
+            atexit.register(self._write_snapshot)
+            if hasattr(os, "register_at_fork"):
+                os.register_at_fork(after_in_child=self._after_fork)
+
+    def _register(self, cls, name: str, documentation: str, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            elif type(metric) is not cls or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {name} is already registered as a different {metric.type}")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Register (or fetch, if this module was imported before) a counter."""
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = (), mode: str = "sum") -> Gauge:
+        return self._register(Gauge, name, documentation, labelnames, mode=mode)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    # Per-process snapshots
+
+    def _start_process(self):
+        self._pid = os.getpid()
+        self._token = uuid.uuid4().hex[:12]
+        self._written = False  # processes that never record anything (e.g. pool workers) write no file
+        if self.directory:
+            self._stop = threading.Event()
+            self._writer = threading.Thread(target=self._write_periodically, name="metrics-snapshot", daemon=True)
+            self._writer.start()
+
+    def _after_fork(self):
+        # A forked worker starts from zero, or it would report its parent's values as its own.
+        # Locks are replaced too, in case another thread held one at the moment of the fork.
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        for metric in self._metrics.values():
+            metric._lock = threading.Lock()
+            metric.reset()
+        self._start_process()
+
+    def _snapshot(self) -> Dict:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {metric.name: metric.snapshot() for metric in metrics}
+
+    def _snapshot_path(self) -> str:
+        return os.path.join(self.directory, f"metrics-{self._pid}-{self._token}.json")
+
+    def _write_snapshot(self, families: Dict = None):
+        if not self.directory:
+            return
+        families = self._snapshot() if families is None else families
+        with self._write_lock:
+            if not self._written and _empty(families):
+                return
+            self._written = True
+            path = self._snapshot_path()
+            try:
+                with open(path + ".tmp", "w", encoding="utf-8") as f:
+                    json.dump({"pid": self._pid, "written_at": time.time(), "metrics": families}, f)
+                os.replace(path + ".tmp", path)
+            except OSError as e:
+                logger.error(f"Failed to write metrics snapshot {path}: {e}")
+
+    def _write_periodically(self):
+        while not self._stop.wait(self.snapshot_interval):
+            self._write_snapshot()
+
+    def _read_snapshots(self, own_path: str):
+        for path in glob.glob(os.path.join(self.directory, "metrics-*.json")):
+            if path == own_path:
+                continue
+            try:
+                with open(path, encoding="utf-8") as f:
+                    yield json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping unreadable metrics snapshot {path}: {e}")
+
+    # Rendering
+
+    def collect(self) -> Dict:
+        """All families with their samples, merged across processes when METRICS_MULTIPROC_DIR is set."""
+        own = self._snapshot()
+        snapshots = [(own, True)]
+        if self.directory:
+            self._write_snapshot(own)
+            # Gauges are only trusted from processes that wrote recently, i.e. are still alive
+            fresh_after = time.time() - 3 * self.snapshot_interval - 1
+            snapshots += [(snapshot.get("metrics", {}), snapshot.get("written_at", 0) >= fresh_after)
+                          for snapshot in self._read_snapshots(self._snapshot_path())]
+
+        merged = {}
+        for families, live in snapshots:
+            for name, family in families.items():
+                target = merged.setdefault(name, {**family, "samples": {}})
+                if target["type"] != family["type"] or target.get("buckets") != family.get("buckets"):
+                    continue  # written by a different version of the code
+                if family["type"] == "gauge" and not live:
+                    continue
+                for key, value in family["samples"]:
+                    key = tuple(key)
+                    current = target["samples"].get(key)
+                    if current is None:
+                        target["samples"][key] = list(value) if isinstance(value, list) else value
+                    elif family["type"] == "histogram":
+                        target["samples"][key] = [a + b for a, b in zip(current, value)]
+                    elif family["type"] == "gauge" and family.get("mode") == "max":
+                        target["samples"][key] = max(current, value)
+                    elif family["type"] == "gauge" and family.get("mode") == "min":
+                        target["samples"][key] = min(current, value)
+                    else:
+                        target["samples"][key] = current + value
+        return merged
+
+    def render(self) -> str:
+        """The metrics in the Prometheus text exposition format."""
+        lines = []
+        for name, family in sorted(self.collect().items()):
+            documentation = family["help"].replace("\\", "\\\\").replace("\n", "\\n")
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {family['type']}")
+            labelnames = family["labelnames"]
+            for key, value in sorted(family["samples"].items()):
+                if family["type"] != "histogram":
+                    lines.append(f"{name}{_labels(labelnames, key)} {_format_value(value)}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(family["buckets"] + [math.inf], value[:-2]):
+                    cumulative += count
+                    le = 'le="' + _format_value(bound) + '"'
+                    lines.append(f"{name}_bucket{_labels(labelnames, key, le)} {cumulative}")
+                lines.append(f"{name}_sum{_labels(labelnames, key)} {_format_value(value[-2])}")
+                lines.append(f"{name}_count{_labels(labelnames, key)} {_format_value(value[-1])}")
+        return "\n".join(lines) + "\n"
+
+# Initialize global instance
+metrics_collector = MetricsCollector()
+
+# Hits and misses of the in-process and SQLite caches; hit rate = hits / (hits + misses)
+cache_lookups = metrics_collector.counter(
+    "cache_lookups_total", "Cache lookups by cache and result (hit or miss).", ("cache", "result")
+)
+
+def record_cache_lookup(cache: str, hit: bool, count: int = 1):
+    if count:
+        cache_lookups.inc(count, cache=cache, result="hit" if hit else "miss")
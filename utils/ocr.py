@@ -0,0 +1,182 @@
+# ocr.py
+import atexit
+import hashlib
+import logging
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import pytesseract
+from pdf2image import convert_from_bytes, convert_from_path
+from PIL import Image
+
+from config import Config
+from utils.metrics import record_cache_lookup
+
+logger = logging.getLogger(__name__)
+
+def _preprocess(image: Image.Image, max_width: int, threshold: int) -> Image.Image:
+    """Grayscale, downscale to `max_width` and binarize a rasterized page."""
+    image = image.convert("L")
+    if image.width > max_width:
+        height = round(image.height * max_width / image.width)
+        image = image.resize((max_width, height), Image.LANCZOS)
+    return image.point([0 if value < threshold else 255 for value in range(256)], mode="1")
+
+def _ocr_page(image: Image.Image, max_width: int, threshold: int, tesseract_config: str) -> str:
+    """Preprocess and OCR one page; runs in worker processes."""
+    try:
+        return pytesseract.image_to_string(_preprocess(image, max_width, threshold), config=tesseract_config)
+    except Exception as e:
+        # pytesseract's exceptions cannot be unpickled and would break the pool
+        raise RuntimeError(f"{type(e).__name__}: {e}") from None
+
+def _contiguous_runs(pages: Sequence[int]) -> List[tuple]:
+    """(first, last) of each run of consecutive numbers in sorted `pages`."""
+    runs = []
+    for page in pages:
+        if runs and page == runs[-1][1] + 1:
+            runs[-1] = (runs[-1][0], page)
+        else:
+            runs.append((page, page))
+    return runs
+
+class OcrPipeline:
+    """
+    OCR for PDF pages without a text layer.
+
+    Each contiguous run of pages that need OCR is rasterized in one pdf2image
+    pass, so pages with a text layer are never rendered; the images are
+    preprocessed and recognised by tesseract on a bounded process pool. Output is cached per
+    (file hash, page number), so a resume uploaded again is not re-OCR'd.
+    """
+
+    def __init__(self, dpi: int = None, max_width: int = None, threshold: int = None,
+                 workers: int = None, cache_size: int = None, tesseract_config: str = None):
+        self.dpi = dpi or Config.OCR_DPI
+        self.max_width = max_width or Config.OCR_MAX_WIDTH
+        self.threshold = threshold or Config.OCR_BINARIZE_THRESHOLD
+        self.workers = workers or Config.OCR_WORKERS
+        self.cache_size = cache_size or Config.OCR_CACHE_SIZE
+        # A resume page is one uniform block of text
+        self.tesseract_config = tesseract_config if tesseract_config is not None else "--psm 6"
+        self._executor = None
+        self._cache = OrderedDict()  # (file hash, page number) -> text
+        self._lock = threading.Lock()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Spawned workers avoid forking a process that is already running threads
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+                atexit.register(self._executor.shutdown, wait=False, cancel_futures=True)
+            return self._executor
+
+    def _rasterize(self, source: Union[str, bytes], first: int, last: int) -> List[Image.Image]:
+        """Rasterize pages first..last (0-based, inclusive) in grayscale in one pass."""
+        options = dict(dpi=self.dpi, first_page=first + 1, last_page=last + 1, grayscale=True)
+        if isinstance(source, (bytes, bytearray)):
+            return convert_from_bytes(bytes(source), **options)
+        return convert_from_path(source, **options)
+
+    def ocr_pages(self, source: Union[str, bytes], page_numbers: Sequence[int],
+                  file_hash: str = None) -> Dict[int, Optional[str]]:
+        """
+        OCR text for each 0-based page number of a PDF given by path or bytes.
+
+        Pages that cannot be OCR'd (e.g. poppler or tesseract missing) come back
+        as None and are not cached.
+        """
+        if not page_numbers:
+            return {}
+        if file_hash is None:
+            if isinstance(source, (bytes, bytearray)):
+                file_hash = hashlib.sha256(source).hexdigest()
+            else:
+                hasher = hashlib.sha256()
+                with open(source, "rb") as f:
+                    for chunk in iter(lambda: f.read(65536), b""):
+                        hasher.update(chunk)
+                file_hash = hasher.hexdigest()
+
+        results = {}
+        with self._lock:
+            for page in page_numbers:
+                if (file_hash, page) in self._cache:
+                    self._cache.move_to_end((file_hash, page))
+                    results[page] = self._cache[(file_hash, page)]
+        pending = sorted(set(page_numbers) - set(results))
+        record_cache_lookup("ocr_pages", True, len(results))
+        record_cache_lookup("ocr_pages", False, len(pending))
+        if not pending:
+            return results
+
+        images = {}
+        for first, last in _contiguous_runs(pending):
+            try:
+                for offset, image in enumerate(self._rasterize(source, first, last)):
+                    images[first + offset] = image
+            except Exception as e:
+                logger.warning(f"Rasterizing PDF pages {first}-{last} for OCR failed: {e}")
+        if not images:
+            results.update({page: None for page in pending})
+            return results
+
+        try:
+            executor = self._pool()
+            futures = {
+                page: executor.submit(_ocr_page, images[page], self.max_width,
+                                      self.threshold, self.tesseract_config)
+                for page in pending if page in images
+            }
+        except BrokenProcessPool as e:
+            logger.error(f"OCR worker pool broke: {e}")
+            with self._lock:
+                self._executor = None
+            futures = {}
+
+        for page in pending:
+            if page not in futures:
+                results[page] = None
+                continue
+            try:
+                text = futures[page].result()
+            except BrokenProcessPool as e:
+                logger.error(f"OCR worker pool broke: {e}")
+                with self._lock:
+                    self._executor = None
+                results[page] = None
+                continue
+            except Exception as e:
+                logger.warning(f"OCR failed for page {page}: {e}")
+                results[page] = None
+                continue
+            results[page] = text
+            with self._lock:
+                self._cache[(file_hash, page)] = text
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return results
+
+    def fill_blank_pages(self, source: Union[str, bytes], pages: List[str],
+                         file_hash: str = None) -> Tuple[List[str], List[int]]:
+        """
+        Replace pages without extractable text by their OCR text.
+
+        Returns the pages and the numbers of those OCR failed on, which stay blank.
+        """
+        blank = [index for index, text in enumerate(pages) if not text.strip()]
+        if not blank:
+            return pages, []
+        ocr_text = self.ocr_pages(source, blank, file_hash=file_hash)
+        failed = [index for index in blank if ocr_text.get(index) is None]
+        return [ocr_text.get(index) or text for index, text in enumerate(pages)], failed
+
+# Initialize global instance
+ocr_pipeline = OcrPipeline()
@@ -0,0 +1,137 @@
+# pdf_extraction.py
+import atexit
+import io
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import BinaryIO, Dict, List, Union
+
+import PyPDF2
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+def _read_source(source: Union[str, bytes, BinaryIO]) -> bytes:
+    """Raw PDF bytes from a path, bytes, or a file-like object (e.g. an upload)."""
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source)
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            return f.read()
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return source.read()
+
+def _extract_page_range(data: bytes, start: int, end: int) -> List[str]:
+    """Text of pages [start, end); runs in worker processes, so it opens its own reader."""
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    texts = []
+    for index in range(start, end):
+        try:
+            texts.append(reader.pages[index].extract_text() or "")
+        except Exception as e:
+            logger.warning(f"Text extraction failed for PDF page {index}: {e}")
+            texts.append("")
+    return texts
+
+class PdfExtractor:
+    """
+    Page-level PDF text extraction within a page and character budget.
+
+    Each page is extracted once. Documents with more pages than
+    `parallel_min_pages` are split into page ranges spread over a process pool;
+    ranges are consumed in order and the remaining ones are cancelled as soon
+    as the budget is met, since scoring only uses the leading text anyway.
+    """
+
+    def __init__(self, max_pages: int = None, max_chars: int = None, workers: int = None,
+                 parallel_min_pages: int = None, pages_per_task: int = None):
+        self.max_pages = max_pages or Config.PDF_MAX_PAGES
+        self.max_chars = max_chars or Config.PDF_MAX_CHARS
+        self.workers = workers or Config.PDF_WORKERS
+        self.parallel_min_pages = parallel_min_pages or Config.PDF_PARALLEL_MIN_PAGES
+        self.pages_per_task = pages_per_task or Config.PDF_PAGES_PER_TASK
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Spawned workers avoid forking a process that is already running threads
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+                atexit.register(self._executor.shutdown, wait=False, cancel_futures=True)
+            return self._executor
+
+    def _within_budget(self, pages: List[str]) -> bool:
+        return sum(len(text) for text in pages) < self.max_chars
+
+    def _extract_serial(self, reader: PyPDF2.PdfReader, page_count: int) -> List[str]:
+        pages = []
+        for index in range(page_count):
+            try:
+                pages.append(reader.pages[index].extract_text() or "")
+            except Exception as e:
+                logger.warning(f"Text extraction failed for PDF page {index}: {e}")
+                pages.append("")
+            if not self._within_budget(pages):
+                break
+        return pages
+
+    def _extract_parallel(self, data: bytes, page_count: int) -> List[str]:
+        executor = self._pool()
+        futures = [
+            executor.submit(_extract_page_range, data, start, min(start + self.pages_per_task, page_count))
+            for start in range(0, page_count, self.pages_per_task)
+        ]
+        pages = []
+        try:
+            for future in futures:
+                pages.extend(future.result())
+                if not self._within_budget(pages):
+                    break
+        finally:
+            for future in futures:
+                future.cancel()
+        return pages
+
+    def extract_pages(self, source: Union[str, bytes, BinaryIO]) -> Dict:
+        """
+        Extract page texts up to the budget.
+
+        Returns `pages` (text per extracted page, "" for pages without a text
+        layer), the document's `page_count`, and whether the budget `truncated` it.
+        """
+        data = _read_source(source)
+        reader = PyPDF2.PdfReader(io.BytesIO(data))
+        page_count = len(reader.pages)
+        budget_pages = min(page_count, self.max_pages)
+
+        pages = None
+        if budget_pages >= self.parallel_min_pages and self.workers > 1:
+            try:
+                pages = self._extract_parallel(data, budget_pages)
+            except BrokenProcessPool as e:
+                # A worker died; extract serially now and start a fresh pool next time
+                logger.error(f"PDF worker pool broke: {e}")
+                with self._lock:
+                    self._executor = None
+        if pages is None:
+            pages = self._extract_serial(reader, budget_pages)
+
+        return {"pages": pages, "page_count": page_count, "truncated": len(pages) < page_count}
+
+    def extract(self, source: Union[str, bytes, BinaryIO]) -> str:
+        """Extract the text of a PDF, one line break between pages."""
+        result = self.extract_pages(source)
+        if result["truncated"]:
+            logger.info("PDF text budget reached after %d of %d pages", len(result["pages"]), result["page_count"])
+        return "\n".join(text for text in result["pages"] if text.strip())
+
+# Initialize global instance
+pdf_extractor = PdfExtractor()
@@ -0,0 +1,45 @@
+# server_timing.py
+import time
+from contextlib import contextmanager
+
+from flask import g
+
+class ServerTiming:
+    """
+    Wall time of the named stages of one request, reported to the client in a
+    Server-Timing header (e.g. `extract;dur=12.4, score;dur=80.1, total;dur=95.0`)
+    so load tests and browser dev tools can see where a request spent its time.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {}  # name -> seconds, in first-seen order; repeated stages add up
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name: str, seconds: float):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def header(self) -> str:
+        entries = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.stages.items()]
+        entries.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ", ".join(entries)
+
+def request_timing() -> ServerTiming:
+    """The ServerTiming of the current request, created on first use."""
+    if "server_timing" not in g:
+        g.server_timing = ServerTiming()
+    return g.server_timing
+
+def add_server_timing_header(response):
+    """after_request hook: attach the header when the request recorded any stages."""
+    timing = g.get("server_timing")
+    if timing is not None:
+        response.headers["Server-Timing"] = timing.header()
+    return response
@@ -0,0 +1,102 @@
+# text_normalizer.py
+import hashlib
+import logging
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import List, Tuple
+
+from config import Config
+from utils.metrics import record_cache_lookup
+
+logger = logging.getLogger(__name__)
+
+# Words, keeping the symbols that matter in skill names (c++, c#, node.js, ci-cd), plus
+# the punctuation that ends a phrase so bigrams never span it
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:[.\-/][a-z0-9+#]+)*|[.,;:!?()\[\]|•]")
+
+class NormalizedText:
+    """Cleaned text and tokens of one document; token offsets are computed on first access."""
+
+    __slots__ = ("cleaned", "tokens", "_prepared", "_pattern", "_offsets")
+
+    def __init__(self, cleaned: str, tokens: List[str], prepared: str, pattern: re.Pattern):
+        self.cleaned = cleaned
+        self.tokens = tokens
+        self._prepared = prepared
+        self._pattern = pattern
+        self._offsets = None
+
+    @property
+    def offsets(self) -> List[Tuple[int, int]]:
+        """(start, end) of each token in the Unicode-normalized, lowercased text."""
+        if self._offsets is None:
+            self._offsets = [match.span() for match in self._pattern.finditer(self._prepared)]
+        return self._offsets
+
+class TextNormalizer:
+    """
+    Unicode-normalizes and lowercases a document once, and derives from that
+    both the cleaned text (`TextExtractor.clean_text` output) and the keyword
+    token stream, with token offsets into the normalized text on demand.
+
+    Cleaning is one regex deletion and a split/join instead of a chain of
+    full-string substitutions, and already-normalized text skips the Unicode
+    pass. Results are cached by document hash, so the skill extractor and
+    keyword analysis share one normalization of each document.
+    """
+
+    def __init__(self, unicode_form: str = None, lowercase: bool = True, keep_chars: str = ".,!?-",
+                 collapse_dots: bool = True, token_pattern: re.Pattern = TOKEN_PATTERN, cache_size: int = None):
+        self.unicode_form = Config.TEXT_UNICODE_FORM if unicode_form is None else unicode_form
+        self.lowercase = lowercase
+        self.collapse_dots = collapse_dots
+        self.token_pattern = token_pattern
+        self.cache_size = cache_size or Config.TEXT_NORMALIZER_CACHE_SIZE
+        self._strip = re.compile(rf"[^\w\s{re.escape(keep_chars)}]+")
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        # Part of cache keys elsewhere (e.g. stored skills), so changed rules invalidate them
+        self.signature = f"{self.unicode_form}|{lowercase}|{keep_chars}|{collapse_dots}|{token_pattern.pattern}"
+
+    def _prepare(self, text: str) -> str:
+        if self.unicode_form and not unicodedata.is_normalized(self.unicode_form, text):
+            text = unicodedata.normalize(self.unicode_form, text)
+        return text.lower() if self.lowercase else text
+
+    def _clean(self, prepared: str) -> str:
+        cleaned = " ".join(self._strip.sub("", prepared).split())
+        if self.collapse_dots and ".." in cleaned:
+            cleaned = re.sub(r"\.{2,}", ".", cleaned)
+        return cleaned
+
+    def normalize(self, text: str) -> NormalizedText:
+        """Cleaned text, tokens and offsets of `text`, from cache when the document was seen before."""
+        text = text or ""
+        key = hashlib.sha256(text.encode("utf-8", errors="replace")).hexdigest()
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+        record_cache_lookup("normalized_text", cached is not None)
+        if cached is not None:
+            return cached
+
+        prepared = self._prepare(text)
+        result = NormalizedText(self._clean(prepared), self.token_pattern.findall(prepared), prepared, self.token_pattern)
+
+        with self._lock:
+            self._cache[key] = result
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    def clean(self, text: str) -> str:
+        return self.normalize(text).cleaned
+
+    def tokenize(self, text: str) -> List[str]:
+        return self.normalize(text).tokens
+
+# Initialize global instance
+text_normalizer = TextNormalizer()
@@ -0,0 +1,81 @@
+# uploads.py
+import hashlib
+import logging
+import tempfile
+
+from flask import Request
+from werkzeug.exceptions import RequestEntityTooLarge
+
+from config import Config
+from utils.utils import FileHandler
+
+logger = logging.getLogger(__name__)
+
+class HashingSpooledFile(tempfile.SpooledTemporaryFile):
+    """
+    Upload buffer that hashes and counts bytes as the multipart parser writes them.
+
+    Kept in memory up to `spool_bytes` and rolled over to disk beyond that.
+    Writing past `max_bytes` aborts the upload with 413 as soon as the limit
+    is crossed, so the rest of the body is never buffered.
+    """
+
+    def __init__(self, max_bytes: int, spool_bytes: int):
+        super().__init__(max_size=spool_bytes)
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._hasher = hashlib.sha256()
+
+    def write(self, data):
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            logger.warning("Rejected upload over %d bytes", self.max_bytes)
+            raise RequestEntityTooLarge(f"Uploaded files are limited to {self.max_bytes // (1024 * 1024)}MB.")
+        self._hasher.update(data)
+        return super().write(data)
+
+    @property
+    def sha256(self) -> str:
+        """SHA-256 of everything written so far (the whole file once parsing is done)."""
+        return self._hasher.hexdigest()
+
+# Allowance for the non-file form fields of a request to an endpoint with its own file limit
+FORM_FIELDS_BYTES = 1024 * 1024
+
+class StreamingUploadRequest(Request):
+    """
+    Request class whose file uploads are parsed into HashingSpooledFile buffers.
+
+    Files are limited to FileHandler.MAX_FILE_SIZE, except on endpoints listed
+    in `endpoint_file_limits` (e.g. bulk job feeds), whose limit also raises
+    the whole-request limit for them.
+    """
+
+    endpoint_file_limits = {}  # endpoint name -> max bytes per uploaded file
+
+    @property
+    def max_file_bytes(self) -> int:
+        return self.endpoint_file_limits.get(self.endpoint, FileHandler.MAX_FILE_SIZE)
+
+    @property
+    def max_content_length(self):
+        limit = self.endpoint_file_limits.get(self.endpoint)
+        return super().max_content_length if limit is None else limit + FORM_FIELDS_BYTES
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        max_bytes = self.max_file_bytes
+        if content_length is not None and content_length > max_bytes:
+            raise RequestEntityTooLarge(f"Uploaded files are limited to {max_bytes // (1024 * 1024)}MB.")
+        return HashingSpooledFile(max_bytes=max_bytes, spool_bytes=Config.UPLOAD_SPOOL_BYTES)
+
+def upload_hash(file) -> str:
+    """SHA-256 of an uploaded file, taken from its buffer when it was hashed while streaming."""
+    return getattr(file.stream, "sha256", None) or FileHandler.get_stream_hash(file.stream)
+
+def upload_size(file) -> int:
+    """Size in bytes of an uploaded file."""
+    size = getattr(file.stream, "size", None)
+    if size is None:
+        size = file.stream.seek(0, 2)
+        file.stream.seek(0)
+    return size
@@ -1,20 +1,22 @@
 # utils.py
 import os
-import re
+import codecs
 import logging
 import hashlib
 from datetime import datetime
 from typing import Optional, Set, Dict, Union, List
-import docx2txt
-import PyPDF2
-from pdf2image import convert_from_path
-import pytesseract
 from PIL import Image
 import magic
 import chardet
 from collections import Counter
 import numpy as np
 
+from utils.pdf_extraction import pdf_extractor
+from utils.ocr import ocr_pipeline
+from utils.docx_extraction import docx_extractor
+from utils.text_normalizer import text_normalizer
+from utils.metrics import metrics_collector
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -22,6 +24,21 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+extraction_seconds = metrics_collector.histogram(
+    "extraction_duration_seconds", "Time to extract the text of a resume file, by format.", ("format",)
+)
+
+DOCX_MIME_TYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+
+# Checked longest first so UTF-32 LE is not mistaken for UTF-16 LE
+BYTE_ORDER_MARKS = [
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
 class FileProcessingError(Exception):
     """Custom exception for file processing errors."""
     pass
@@ -30,6 +47,9 @@ class FileHandler:
     """Handles file operations such as hashing, MIME type detection, and encoding."""
     ALLOWED_EXTENSIONS = {'.txt', '.pdf', '.docx', '.doc'}
     MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+    SNIFF_BYTES = 8 * 1024
+    ENCODING_CHUNK_BYTES = 1024 * 1024
+    ENCODING_SAMPLE_BYTES = 64 * 1024
 
     @staticmethod
     def get_file_hash(file_path: str) -> str:
@@ -44,22 +64,99 @@ class FileHandler:
             logger.error(f"Error calculating hash for {file_path}: {e}")
             raise FileProcessingError(f"Hash calculation failed: {e}")
 
+    @staticmethod
+    def get_stream_hash(stream) -> str:
+        """Generate SHA-256 hash of a seekable file-like object, leaving it rewound."""
+        hasher = hashlib.sha256()
+        try:
+            stream.seek(0)
+            for chunk in iter(lambda: stream.read(65536), b''):
+                hasher.update(chunk)
+            stream.seek(0)
+            return hasher.hexdigest()
+        except Exception as e:
+            logger.error(f"Error calculating hash for stream: {e}")
+            raise FileProcessingError(f"Hash calculation failed: {e}")
+
+    @staticmethod
+    def sniff_mime_type(head: bytes) -> str:
+        """Detect file type from the first few KB of a file (signatures first, python-magic otherwise)."""
+        if head.startswith(b'%PDF-'):
+            return 'application/pdf'
+        if head.startswith(b'PK\x03\x04') and (b'word/' in head or b'[Content_Types].xml' in head):
+            # The first local header of a .docx names its parts; python-magic often only sees a zip
+            return DOCX_MIME_TYPE
+        if head.startswith(b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'):
+            return 'application/msword'
+        return magic.from_buffer(head, mime=True)
+
+    @staticmethod
+    def get_stream_mime_type(stream) -> str:
+        """Detect real file type of a seekable file-like object from its head, leaving it rewound."""
+        try:
+            stream.seek(0)
+            head = stream.read(FileHandler.SNIFF_BYTES)
+            stream.seek(0)
+            return FileHandler.sniff_mime_type(head)
+        except Exception as e:
+            logger.error(f"Error detecting MIME type for stream: {e}")
+            raise FileProcessingError(f"MIME type detection failed: {e}")
+
     @staticmethod
     def get_mime_type(file_path: str) -> str:
-        """Detect real file type using python-magic."""
+        """Detect real file type from the head of the file."""
         try:
-            return magic.from_file(file_path, mime=True)
+            with open(file_path, 'rb') as f:
+                return FileHandler.get_stream_mime_type(f)
         except Exception as e:
             logger.error(f"Error detecting MIME type for {file_path}: {e}")
             raise FileProcessingError(f"MIME type detection failed: {e}")
 
+    @staticmethod
+    def detect_stream_encoding(stream) -> str:
+        """
+        Detect character encoding of a seekable binary stream, leaving it rewound.
+
+        A BOM decides directly. Otherwise the stream is validated as strict UTF-8
+        chunk by chunk, which covers nearly every upload at C speed; only when
+        that fails is chardet run, on a sample starting just before the first
+        invalid byte instead of the whole file.
+        """
+        try:
+            stream.seek(0)
+            head = stream.read(4)
+            stream.seek(0)
+            for bom, encoding in BYTE_ORDER_MARKS:
+                if head.startswith(bom):
+                    return encoding
+
+            decoder = codecs.getincrementaldecoder('utf-8')('strict')
+            offset = 0
+            try:
+                for chunk in iter(lambda: stream.read(FileHandler.ENCODING_CHUNK_BYTES), b''):
+                    decoder.decode(chunk)
+                    offset += len(chunk)
+                decoder.decode(b'', final=True)
+                stream.seek(0)
+                return 'utf-8'
+            except UnicodeDecodeError as e:
+                # e.start is relative to the chunk being decoded (plus any buffered partial character)
+                failed_at = max(0, offset + e.start - 4)
+
+            stream.seek(max(0, failed_at - 1024))
+            sample = stream.read(FileHandler.ENCODING_SAMPLE_BYTES)
+            stream.seek(0)
+            return chardet.detect(sample)['encoding'] or 'utf-8'
+        except Exception as e:
+            logger.error(f"Error detecting encoding for stream: {e}")
+            raise FileProcessingError(f"Encoding detection failed: {e}")
+
     @staticmethod
     def detect_encoding(file_path: str) -> str:
-        """Detect character encoding of text file using chardet."""
+        """Detect character encoding of text file."""
         try:
             with open(file_path, 'rb') as f:
-                raw_data = f.read()
-            return chardet.detect(raw_data)['encoding']
+                return FileHandler.detect_stream_encoding(f)
         except Exception as e:
             logger.error(f"Error detecting encoding for {file_path}: {e}")
             raise FileProcessingError(f"Encoding detection failed: {e}")
@@ -72,11 +169,15 @@ class TextExtractor:
             '.txt': self._extract_from_txt,
             '.pdf': self._extract_from_pdf,
             '.docx': self._extract_from_docx,
-            '.doc': self._extract_from_docx  # Assuming .doc files can be handled by docx2txt
+            '.doc': self._extract_from_docx  # Only .doc files that are really Office Open XML
         }
 
     def extract_text(self, file_path: str) -> str:
         """Main method to extract text based on file type."""
+        return self.clean_text(self.extract_raw_text(file_path))
+
+    def extract_raw_text(self, file_path: str) -> str:
+        """Extract text based on file type, keeping its case and line structure."""
         try:
             file_ext = os.path.splitext(file_path)[1].lower()
             if file_ext not in self.supported_formats:
@@ -87,8 +188,8 @@ class TextExtractor:
                 raise FileProcessingError("File size exceeds maximum limit")
 
             # Extract text using appropriate method
-            text = self.supported_formats[file_ext](file_path)
-            return self.clean_text(text)
+            with extraction_seconds.time(format=file_ext.lstrip('.')):
+                return self.supported_formats[file_ext](file_path)
 
         except Exception as e:
             logger.error(f"Error processing file {file_path}: {str(e)}")
@@ -108,36 +209,22 @@ class TextExtractor:
     def _extract_from_pdf(self, file_path: str) -> str:
         """Extract text from PDF files with OCR fallback for images."""
         try:
-            text = ""
-            with open(file_path, "rb") as file:
-                reader = PyPDF2.PdfReader(file)
-                for page in reader.pages:
-                    page_text = page.extract_text()
-                    if not page_text.strip():
-                        # If no text extracted, try OCR
-                        text += self._ocr_pdf_page(file_path, reader.pages.index(page))
-                    else:
-                        text += page_text
-            return text
+            pages = pdf_extractor.extract_pages(file_path)["pages"]
+            # Pages without a text layer are likely scanned; OCR those
+            pages, ocr_failed = ocr_pipeline.fill_blank_pages(
+                file_path, pages, file_hash=FileHandler.get_file_hash(file_path)
+            )
+            if ocr_failed:
+                logger.warning(f"OCR failed for pages {ocr_failed} of {file_path}")
+            return "\n".join(text for text in pages if text.strip())
         except Exception as e:
             logger.error(f"Error extracting text from PDF: {str(e)}")
             raise FileProcessingError(f"PDF extraction failed: {str(e)}")
 
-    def _ocr_pdf_page(self, pdf_path: str, page_number: int) -> str:
-        """Perform OCR on a PDF page."""
-        try:
-            images = convert_from_path(pdf_path, first_page=page_number + 1, last_page=page_number + 1)
-            if images:
-                return pytesseract.image_to_string(images[0])
-            return ""
-        except Exception as e:
-            logger.warning(f"OCR failed for page {page_number}: {str(e)}")
-            return ""
-
     def _extract_from_docx(self, file_path: str) -> str:
         """Extract text from DOCX files."""
         try:
-            return docx2txt.process(file_path)
+            return docx_extractor.extract(file_path)
         except Exception as e:
             logger.error(f"Error extracting text from DOCX: {str(e)}")
             raise FileProcessingError(f"DOCX extraction failed: {str(e)}")
@@ -145,19 +232,10 @@ class TextExtractor:
     @staticmethod
     def clean_text(text: str) -> str:
         """Clean and normalize extracted text."""
-        text = text.lower()
-        text = re.sub(r'[^\w\s.,!?-]', '', text)
-        text = re.sub(r'\s+', ' ', text)
-        text = re.sub(r'\.+', '.', text)
-        return text.strip()
-
-# Other utility classes (FileManager, CacheManager, TextAnalyzer, MetricsCollector, TextSummarizer) remain unchanged.
+        return text_normalizer.clean(text)
 
 # Initialize global instances
 text_extractor = TextExtractor()
-file_manager = FileManager(upload_folder='uploads')
-cache_manager = CacheManager()
-metrics_collector = MetricsCollector()
 
 def validate_file(file, max_size: int = FileHandler.MAX_FILE_SIZE) -> bool:
     """Validate file before processing."""
@@ -165,7 +243,10 @@ def validate_file(file, max_size: int = FileHandler.MAX_FILE_SIZE) -> bool:
         return False
     
     filename = file.filename
-    file_size = file.content_length if hasattr(file, 'content_length') else 0
+    # Streamed uploads know their size; content_length is often 0 for multipart parts
+    file_size = getattr(file.stream, 'size', None) if hasattr(file, 'stream') else None
+    if file_size is None:
+        file_size = file.content_length if hasattr(file, 'content_length') else 0
 
     return (
         '.' in filename and